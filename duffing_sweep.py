@@ -0,0 +1,146 @@
+# Пакетний інтегратор осцилятора Дуффінга для біфуркаційних діаграм.
+# Винесено в окремий модуль, бо функції для пулу процесів мають імпортуватися
+# у дочірніх процесах, а сторінки Streamlit звичайними модулями не є.
+#
+# m x'' + b x' + k x + β x³ = F₀ cos(ω_d t)
+
+import os
+import math
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def duffing_acceleration(x, v, force, m, k, b, beta):
+    return (force - b * v - k * x - beta * x**3) / m
+
+
+# Найбільший крок ω·dt для найшвидшої частоти системи: межа стійкості RK4 ≈ 2.8,
+# беремо із запасом (~13 кроків на період власних коливань)
+MAX_OMEGA_DT = 0.5
+
+
+def fastest_omega(F0, m, k, beta):
+    # Найшвидша частота системи: власна з урахуванням кубічної жорсткості 3βx²
+    # (оцінюємо її для амплітуди, за якої β x³ = F₀)
+    x_scale = np.cbrt(F0 / beta) if beta > 0 else 0.0
+    return np.sqrt((k + 3 * beta * x_scale**2) / m)
+
+
+def steps_per_drive_period(omega_d, F0, m, k, beta, steps_per_period):
+    # Ціле число кроків на період сили: steps_per_period для точності на частоті сили, але не менше,
+    # ніж потрібно для стійкості на найшвидшій частоті. Інакше при ω_d ≪ ω₀ розв'язок розбігається.
+    omega_fast = fastest_omega(F0, m, k, beta)
+    stable = np.ceil(2 * np.pi * omega_fast / (omega_d * MAX_OMEGA_DT)).astype(int)
+    return np.maximum(steps_per_period, stable)
+
+
+def poincare_batch(omega_d, F0, m, k, b, beta, n_transient, n_record, steps_per_period=100, refine=2):
+    # omega_d, F0 - масиви однакової форми (P,): кожен елемент - окремий осцилятор.
+    # Кожен осцилятор робить свою цілу кількість кроків n на період сили (dt = T/n), тож
+    # перетин Пуанкаре - зміщення рівно через кожні n кроків (без інтерполяції).
+    # Рядки, що розбіглися, перераховуємо з удвічі меншим кроком (до refine разів);
+    # ті, що розбіглися й тоді, лишаються NaN.
+    omega_d, F0 = np.broadcast_arrays(np.asarray(omega_d, dtype=float), np.asarray(F0, dtype=float))
+    n_steps = steps_per_drive_period(omega_d, F0, m, k, beta, steps_per_period)
+    dt = 2 * np.pi / omega_d / n_steps
+    x = np.zeros(omega_d.shape)
+    v = np.zeros(omega_d.shape)
+    section = np.full(omega_d.shape + (n_record,), np.nan)
+
+    phase = 2 * np.pi / n_steps
+    n_periods = n_transient + n_record
+    check_every = int(n_steps.min())
+    for s in range(int(n_steps.max()) * n_periods):
+        # Класичний RK4; фаза сили своя для кожного осцилятора
+        a1 = duffing_acceleration(x, v, F0 * np.cos(phase * s), m, k, b, beta)
+        x2, v2 = x + 0.5 * dt * v, v + 0.5 * dt * a1
+        force_mid = F0 * np.cos(phase * (s + 0.5))
+        a2 = duffing_acceleration(x2, v2, force_mid, m, k, b, beta)
+        x3, v3 = x + 0.5 * dt * v2, v + 0.5 * dt * a2
+        a3 = duffing_acceleration(x3, v3, force_mid, m, k, b, beta)
+        x4, v4 = x + dt * v3, v + dt * a3
+        a4 = duffing_acceleration(x4, v4, F0 * np.cos(phase * (s + 1)), m, k, b, beta)
+        x = x + dt / 6 * (v + 2 * v2 + 2 * v3 + v4)
+        v = v + dt / 6 * (a1 + 2 * a2 + 2 * a3 + a4)
+
+        period, step = np.divmod(s + 1, n_steps)
+        record = (step == 0) & (period > n_transient) & (period <= n_periods)
+        if record.any():
+            section[record, period[record] - n_transient - 1] = x[record]
+        if (s + 1) % check_every == 0:
+            # Розбіжні траєкторії далі не рахуємо
+            escaped = ~(np.abs(x) < 1e6)
+            x[escaped], v[escaped] = np.nan, np.nan
+
+    diverged = ~np.isfinite(section).all(axis=-1)
+    if refine > 0 and diverged.any():
+        section[diverged] = poincare_batch(omega_d[diverged], F0[diverged], m, k, b, beta, n_transient, n_record,
+                                           2 * steps_per_period, refine - 1)
+    return section
+
+
+def duffing_windows(m, k, b, beta, F0, omega_d, y0, t_max, window, dt, record_every=1):
+    # Один осцилятор на довгому інтервалі: генератор (t, [x, v]) вікно за вікном, як
+    # streaming_integration.linear_windows. Векторизувати по часу нелінійну систему не можна, тож це
+    # скалярний RK4 на числах Python, але з підставленою правою частиною (без виклику функції на кожну
+    # стадію) і з силою через поворот (cos, sin) на ω_d·dt/2 замість math.cos - ~10⁶ кроків/с.
+    # На початку вікна (cos, sin) беремо точно, тож похибка округлення повороту не накопичується.
+    # Усе - звичайні float: арифметика зі скалярами numpy (np.float64) у циклі в рази повільніша
+    x, v = float(y0[0]), float(y0[1])
+    m, dt, omega_d = float(m), float(dt), float(omega_d)
+    km, bm, gm, fm = float(k) / m, float(b) / m, float(beta) / m, float(F0) / m
+    ch, sh = math.cos(0.5 * omega_d * dt), math.sin(0.5 * omega_d * dt)
+    h2, h6 = 0.5 * dt, dt / 6
+    t0 = 0.0
+    steps_per_window = max(1, int(round(window / dt)))
+    while t0 < t_max - 0.5 * dt:
+        n_steps = min(steps_per_window, int(round((t_max - t0) / dt)))
+        xs, vs = [x], [v]
+        c, s = math.cos(omega_d * t0), math.sin(omega_d * t0)
+        for i in range(1, n_steps + 1):
+            f1 = fm * c
+            c, s = c * ch - s * sh, s * ch + c * sh
+            f2 = fm * c
+            c, s = c * ch - s * sh, s * ch + c * sh
+            a1 = f1 - bm * v - (km + gm * x * x) * x
+            x2, v2 = x + h2 * v, v + h2 * a1
+            a2 = f2 - bm * v2 - (km + gm * x2 * x2) * x2
+            x3, v3 = x + h2 * v2, v + h2 * a2
+            a3 = f2 - bm * v3 - (km + gm * x3 * x3) * x3
+            x4, v4 = x + dt * v3, v + dt * a3
+            a4 = fm * c - bm * v4 - (km + gm * x4 * x4) * x4
+            x += h6 * (v + 2 * (v2 + v3) + v4)
+            v += h6 * (a1 + 2 * (a2 + a3) + a4)
+            if i % record_every == 0:
+                xs.append(x)
+                vs.append(v)
+        ts = t0 + np.arange(len(xs)) * (record_every * dt)
+        t0 += n_steps * dt
+        yield ts, np.array((xs, vs))
+
+
+def _poincare_chunk(args):
+    return poincare_batch(*args)
+
+
+def bifurcation_sweep(omega_d, F0, m, k, b, beta, n_transient, n_record, steps_per_period=100, workers=None):
+    # Розбиваємо масив параметрів на порції та рахуємо їх паралельно.
+    # Дочірні процеси запускаються через 'spawn': fork із багатопотокового сервера Streamlit
+    # може успадкувати заблоковані м'ютекси. Для одного ядра рахуємо в цьому ж процесі -
+    # інтегратор і так векторизований по всіх точках.
+    omega_d, F0 = np.broadcast_arrays(np.asarray(omega_d, dtype=float), np.asarray(F0, dtype=float))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return poincare_batch(omega_d, F0, m, k, b, beta, n_transient, n_record, steps_per_period), 1
+
+    # Кілька порцій на процес - щоб швидкі порції не чекали повільних
+    n_chunks = min(omega_d.size, 4 * workers)
+    chunks = [
+        (w, f, m, k, b, beta, n_transient, n_record, steps_per_period)
+        for w, f in zip(np.array_split(omega_d, n_chunks), np.array_split(F0, n_chunks))
+    ]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        results = list(pool.map(_poincare_chunk, chunks))
+    return np.concatenate(results, axis=0), workers
@@ -1,6 +1,7 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
+import time
 
 # --- Заголовок та опис програми ---
 st.set_page_config(layout="wide") # Робимо сторінку ширшою
@@ -8,6 +9,14 @@ st.title("🚀 Інтерактивний симулятор балістики"
 st.write("Дозволяє змоделювати траєкторію тіла, кинутого під кутом до горизонту. Змінюйте параметри на бічній панелі!")
 
 # --- Бічна панель (сайдбар) для вводу даних ---
+st.sidebar.header("Режим")
+mode = st.sidebar.radio(
+    "Модель руху",
+    ("Вакуум (аналітично)", "З опором повітря", "Монте-Карло розсіювання"),
+    help="З опором повітря траєкторії рахуються чисельно, пакетом для тисяч запусків одночасно. "
+         "Монте-Карло показує розкид точок падіння при похибках параметрів запуску."
+)
+
 st.sidebar.header("Параметри запуску")
 
 # Створюємо слайдери для зміни параметрів
@@ -35,6 +44,42 @@ h0 = st.sidebar.slider(
     step=1.0
 )
 
+if mode == "З опором повітря":
+    st.sidebar.header("Опір повітря")
+    k_drag = st.sidebar.slider(
+        "Коефіцієнт опору (k), 1/м",
+        min_value=0.0,
+        max_value=0.05,
+        value=0.005,
+        step=0.0005,
+        format="%.4f",
+        help="k = ρ·C_d·S / (2m). Квадратичний опір: a = -k·|v|·v. Для м'яча ~0.005, для кулі ~0.0005."
+    )
+
+if mode == "Монте-Карло розсіювання":
+    st.sidebar.header("Похибки запуску (σ)")
+    sigma_v0 = st.sidebar.slider("σ швидкості (v₀), м/с", 0.0, 10.0, 1.0, 0.1)
+    sigma_angle = st.sidebar.slider("σ кута (α), градуси", 0.0, 10.0, 1.0, 0.1)
+    sigma_h0 = st.sidebar.slider("σ висоти (h₀), м", 0.0, 5.0, 0.0, 0.1)
+    sigma_azimuth = st.sidebar.slider("σ напрямку (азимут), градуси", 0.0, 5.0, 0.5, 0.1,
+                                      help="Бічне відхилення від лінії прицілювання.")
+    n_samples = st.sidebar.select_slider(
+        "Кількість вибірок (N)",
+        options=[10_000, 100_000, 300_000, 1_000_000],
+        value=100_000
+    )
+    seed = st.sidebar.number_input("Зерно генератора (seed)", min_value=0, value=42, step=1)
+
+    use_wind = st.sidebar.checkbox(
+        "Врахувати вітер",
+        help="Вітер діє лише через опір повітря, тому вмикає чисельний інтегратор з опором."
+    )
+    if use_wind:
+        wind_mean = st.sidebar.slider("Вітер уздовж траси (w), м/с", -20.0, 20.0, 5.0, 0.5,
+                                      help="w > 0: попутний, w < 0: зустрічний.")
+        sigma_wind = st.sidebar.slider("σ поривів вітру, м/с", 0.0, 10.0, 2.0, 0.5)
+        k_drag = st.sidebar.slider("Коефіцієнт опору (k), 1/м", 0.0, 0.05, 0.005, 0.0005, format="%.4f")
+
 # Гравітаційна стала
 g = 9.81
 
@@ -43,28 +88,212 @@ g = 9.81
 # Переводимо кут в радіани
 angle_rad = np.deg2rad(angle_degrees)
 
-# Розрахунок часу польоту (розв'язуємо квадратне рівняння y(t) = 0)
-# y(t) = h0 + v0*sin(a)*t - g*t^2 / 2
-# a*t^2 + b*t + c = 0, де a = -g/2, b = v0*sin(a), c = h0
-a = -g / 2
-b = v0 * np.sin(angle_rad)
-c = h0
-discriminant = b**2 - 4*a*c
-t_flight = (-b - np.sqrt(discriminant)) / (2 * a) # Беремо додатний корінь
+# Формули працюють і для чисел, і для масивів NumPy (потрібно для Монте-Карло)
+def vacuum_flight(v0, angle_rad, h0):
+    # Розрахунок часу польоту (розв'язуємо квадратне рівняння y(t) = 0)
+    # y(t) = h0 + v0*sin(a)*t - g*t^2 / 2
+    # a*t^2 + b*t + c = 0, де a = -g/2, b = v0*sin(a), c = h0
+    a = -g / 2
+    b = v0 * np.sin(angle_rad)
+    c = h0
+    discriminant = b**2 - 4*a*c
+    t_flight = (-b - np.sqrt(discriminant)) / (2 * a) # Беремо додатний корінь
 
-# Розрахунок максимальної дальності
-x_max = v0 * np.cos(angle_rad) * t_flight
+    # Розрахунок максимальної дальності
+    x_max = v0 * np.cos(angle_rad) * t_flight
+    return t_flight, x_max
+
+t_flight, x_max = vacuum_flight(v0, angle_rad, h0)
 
 # Розрахунок максимальної висоти
 t_peak = v0 * np.sin(angle_rad) / g
 y_max = h0 + v0 * np.sin(angle_rad) * t_peak - g * t_peak**2 / 2
 
+# --- Пакетний інтегратор з опором повітря ---
+# Рівняння руху з квадратичним опором:
+# x'' = -k * |v| * vx
+# y'' = -k * |v| * vy - g
+# Аналітичного розв'язку немає, тому інтегруємо RK4, але не для одного кидка,
+# а для всього масиву (v0, α, h0) одночасно: кожен крок - кілька операцій NumPy над масивами.
+# Крок dt свій для кожного кидка (частка від вакуумного часу польоту),
+# тому точність однакова і для коротких, і для довгих траєкторій.
+# Кидки, що вже впали, викидаються з активного набору, а інтегруємо, доки не впадуть усі:
+# з опором політ може бути довшим за вакуумний (кидок з висоти під малим кутом або вниз
+# падає з граничною швидкістю √(g/k)). Кидки, що не впали й за MAX_FLIGHT_FACTOR вакуумних
+# часів польоту, отримують NaN.
+MAX_FLIGHT_FACTOR = 100
+
+# Вітер (w, уздовж траси) входить через швидкість відносно повітря: (vx - w, vy).
+
+def drag_acceleration(vx, vy, k_drag, wind=0.0):
+    ux = vx - wind
+    speed = np.sqrt(ux**2 + vy**2)
+    return -k_drag * speed * ux, -k_drag * speed * vy - g
+
+def simulate_drag_batch(v0, angle_rad, h0, k_drag, n_steps=400, record=False, wind=0.0):
+    v0, angle_rad, h0, wind = np.broadcast_arrays(
+        np.asarray(v0, dtype=float), np.asarray(angle_rad, dtype=float),
+        np.asarray(h0, dtype=float), np.asarray(wind, dtype=float)
+    )
+    shape = v0.shape
+    v0, angle_rad, h0, wind = v0.ravel(), angle_rad.ravel(), h0.ravel(), wind.ravel()
+
+    # Вакуумний час польоту задає масштаб кроку
+    vy0 = v0 * np.sin(angle_rad)
+    t_vac = (vy0 + np.sqrt(vy0**2 + 2 * g * h0)) / g
+    dt_all = t_vac / n_steps
+
+    x = np.zeros_like(v0)
+    y = h0.copy()
+    vx = v0 * np.cos(angle_rad)
+    vy = vy0.copy()
+
+    t_land = np.full_like(v0, np.nan)
+    x_land = np.full_like(v0, np.nan)
+    y_peak = h0.copy()
+
+    # Кидки з нульовим часом польоту (α=0, h0=0) вже "приземлились"
+    grounded = t_vac <= 0
+    t_land[grounded], x_land[grounded] = 0.0, 0.0
+    active = np.flatnonzero(~grounded)
+    t_now = np.zeros_like(v0)
+    path = [(x.copy(), y.copy())] if record else None
+
+    for _ in range(MAX_FLIGHT_FACTOR * n_steps):
+        if active.size == 0:
+            break
+        xa, ya, vxa, vya = x[active], y[active], vx[active], vy[active]
+        dt = dt_all[active]
+        w = wind[active]
+
+        # Класичний RK4 для стану (x, y, vx, vy)
+        ax1, ay1 = drag_acceleration(vxa, vya, k_drag, w)
+        vx2, vy2 = vxa + 0.5 * dt * ax1, vya + 0.5 * dt * ay1
+        ax2, ay2 = drag_acceleration(vx2, vy2, k_drag, w)
+        vx3, vy3 = vxa + 0.5 * dt * ax2, vya + 0.5 * dt * ay2
+        ax3, ay3 = drag_acceleration(vx3, vy3, k_drag, w)
+        vx4, vy4 = vxa + dt * ax3, vya + dt * ay3
+        ax4, ay4 = drag_acceleration(vx4, vy4, k_drag, w)
+
+        x_new = xa + dt / 6 * (vxa + 2 * vx2 + 2 * vx3 + vx4)
+        y_new = ya + dt / 6 * (vya + 2 * vy2 + 2 * vy3 + vy4)
+        vx[active] = vxa + dt / 6 * (ax1 + 2 * ax2 + 2 * ax3 + ax4)
+        vy[active] = vya + dt / 6 * (ay1 + 2 * ay2 + 2 * ay3 + ay4)
+        x[active], y[active] = x_new, y_new
+        y_peak[active] = np.maximum(y_peak[active], y_new)
+
+        # Перетин землі: лінійна інтерполяція всередині останнього кроку
+        landed = y_new <= 0
+        if np.any(landed):
+            idx = active[landed]
+            frac = ya[landed] / (ya[landed] - y_new[landed])
+            x_land[idx] = xa[landed] + frac * (x_new[landed] - xa[landed])
+            t_land[idx] = t_now[idx] + frac * dt[landed]
+        t_now[active] += dt
+        if record:
+            path.append((x.copy(), np.maximum(y, 0.0)))
+        active = active[~landed]
+
+    result = {
+        "range": x_land.reshape(shape),
+        "t_flight": t_land.reshape(shape),
+        "y_max": y_peak.reshape(shape),
+    }
+    if record:
+        result["path_x"] = np.array([p[0] for p in path]).reshape((-1,) + shape)
+        result["path_y"] = np.array([p[1] for p in path]).reshape((-1,) + shape)
+    return result
+
+@st.cache_data(ttl=3600) # Кешуємо пакетні розрахунки
+def range_vs_angle(v0, h0, k_drag):
+    angles_deg = np.linspace(0.0, 90.0, 361)
+    res = simulate_drag_batch(v0, np.deg2rad(angles_deg), h0, k_drag)
+    return angles_deg, res["range"]
+
+@st.cache_data(ttl=3600)
+def optimal_angle_curve(h0, k_drag):
+    # Сітка (v0 × α) = 100 × 361 кидків за один виклик інтегратора
+    v0_grid = np.linspace(1.0, 100.0, 100)
+    angles_deg = np.linspace(0.0, 90.0, 361)
+    V, A = np.meshgrid(v0_grid, angles_deg, indexing="ij")
+    ranges = simulate_drag_batch(V, np.deg2rad(A), h0, k_drag)["range"]
+    best = np.nanargmax(np.where(np.isfinite(ranges), ranges, -np.inf), axis=1)
+    return v0_grid, angles_deg[best], ranges[np.arange(len(v0_grid)), best]
+
+# --- Монте-Карло: розсіювання точок падіння ---
+# Усі N кидків рахуються тими ж формулами vacuum_flight, але над масивами.
+# Назад повертаємо лише гістограми та статистики, а не мільйон точок,
+# тому і кеш, і дані для браузера залишаються малими.
+
+@st.cache_data(ttl=3600, max_entries=20)
+def monte_carlo_dispersion(v0, angle_deg, h0, sigma_v0, sigma_angle, sigma_h0, sigma_azimuth,
+                           n_samples, seed, wind_mean=0.0, sigma_wind=0.0, k_drag=0.0, bins=150):
+    rng = np.random.default_rng(seed)
+    v0_s = np.abs(rng.normal(v0, sigma_v0, n_samples))
+    angle_s = np.deg2rad(np.clip(rng.normal(angle_deg, sigma_angle, n_samples), 0.0, 90.0))
+    h0_s = np.maximum(rng.normal(h0, sigma_h0, n_samples), 0.0)
+    azimuth_s = np.deg2rad(rng.normal(0.0, sigma_azimuth, n_samples))
+
+    if k_drag > 0 or wind_mean != 0 or sigma_wind > 0:
+        wind_s = rng.normal(wind_mean, sigma_wind, n_samples)
+        res = simulate_drag_batch(v0_s, angle_s, h0_s, k_drag, n_steps=100, wind=wind_s)
+        ranges, times = res["range"], res["t_flight"]
+        # Кидки, що не впали (NaN), у статистику не входять
+        landed = np.isfinite(ranges)
+        not_landed = int(np.count_nonzero(~landed))
+        ranges, times, azimuth_s = ranges[landed], times[landed], azimuth_s[landed]
+        if ranges.size == 0:
+            # Жоден кидок не впав - статистики немає
+            return None, None, None, None, None, {"not_landed": not_landed}
+    else:
+        not_landed = 0
+        times, ranges = vacuum_flight(v0_s, angle_s, h0_s)
+
+    # Точка падіння на площині: уздовж траси (x) та бічне відхилення (z)
+    x_impact = ranges * np.cos(azimuth_s)
+    z_impact = ranges * np.sin(azimuth_s)
+
+    hist, x_edges, z_edges = np.histogram2d(x_impact, z_impact, bins=bins)
+    range_hist, range_edges = np.histogram(ranges, bins=bins)
+
+    x_mean, z_mean = x_impact.mean(), z_impact.mean()
+    miss = np.hypot(x_impact - x_mean, z_impact - z_mean)
+    stats = {
+        "mean": ranges.mean(),
+        "std": ranges.std(),
+        "ci95": np.percentile(ranges, [2.5, 97.5]),
+        "ci68": np.percentile(ranges, [16.0, 84.0]),
+        "cep50": np.percentile(miss, 50.0), # Кругове ймовірне відхилення
+        "cep90": np.percentile(miss, 90.0),
+        "t_mean": times.mean(),
+        "center": (x_mean, z_mean),
+        "not_landed": not_landed,
+    }
+    return hist, x_edges, z_edges, range_hist, range_edges, stats
+
 # --- Відображення розрахункових даних ---
 st.header("Результати симуляції")
-col1, col2, col3 = st.columns(3) # Розділяємо на 3 колонки
-col1.metric("Макс. дальність (L)", f"{x_max:.2f} м")
-col2.metric("Макс. висота (H)", f"{y_max:.2f} м")
-col3.metric("Час польоту (T)", f"{t_flight:.2f} с")
+
+if mode in ("Вакуум (аналітично)", "Монте-Карло розсіювання"):
+    col1, col2, col3 = st.columns(3) # Розділяємо на 3 колонки
+    col1.metric("Макс. дальність (L)", f"{x_max:.2f} м")
+    col2.metric("Макс. висота (H)", f"{y_max:.2f} м")
+    col3.metric("Час польоту (T)", f"{t_flight:.2f} с")
+else:
+    drag = simulate_drag_batch(v0, angle_rad, h0, k_drag, record=True)
+    x_max_drag = float(drag["range"])
+    y_max_drag = float(drag["y_max"])
+    t_flight_drag = float(drag["t_flight"])
+    if not np.isfinite(x_max_drag):
+        st.warning(f"Тіло не впало за {MAX_FLIGHT_FACTOR}× вакуумний час польоту; дальність і час невідомі.")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Макс. дальність (L)", f"{x_max_drag:.2f} м",
+                delta=f"{x_max_drag - x_max:.2f} м відносно вакууму")
+    col2.metric("Макс. висота (H)", f"{y_max_drag:.2f} м",
+                delta=f"{y_max_drag - y_max:.2f} м відносно вакууму")
+    col3.metric("Час польоту (T)", f"{t_flight_drag:.2f} с",
+                delta=f"{t_flight_drag - t_flight:.2f} с відносно вакууму")
 
 # --- Графік траєкторії (з Plotly) ---
 st.header("Графік траєкторії")
@@ -80,13 +309,23 @@ fig.add_trace(go.Scatter(
     x=x_values, 
     y=y_values, 
     mode='lines', 
-    name='Траєкторія',
-    line=dict(color='royalblue', width=4)
+    name='Траєкторія (вакуум)' if mode == "З опором повітря" else 'Траєкторія',
+    line=dict(color='royalblue', width=2 if mode == "З опором повітря" else 4,
+              dash='dot' if mode == "З опором повітря" else 'solid')
 ))
 
+if mode == "З опором повітря":
+    fig.add_trace(go.Scatter(
+        x=drag["path_x"],
+        y=drag["path_y"],
+        mode='lines',
+        name='Траєкторія (з опором)',
+        line=dict(color='darkorange', width=4)
+    ))
+
 # Додаємо точку старту і фінішу
 fig.add_trace(go.Scatter(
-    x=[0, x_max], 
+    x=[0, x_max_drag] if mode == "З опором повітря" else [0, x_max], 
     y=[h0, 0], 
     mode='markers', 
     name='Старт/Фініш',
@@ -108,3 +347,111 @@ fig.update_yaxes(scaleanchor="x", scaleratio=1)
 
 # Відображаємо графік у Streamlit
 st.plotly_chart(fig, use_container_width=True)
+
+# --- Криві дальності та оптимального кута (тільки з опором) ---
+if mode == "З опором повітря":
+    st.header("Дальність залежно від кута")
+    st.write("Кожна крива - 361 кидок, розрахований одним пакетним викликом інтегратора.")
+
+    angles_curve, ranges_drag = range_vs_angle(v0, h0, k_drag)
+    _, ranges_vac = range_vs_angle(v0, h0, 0.0)
+    best = np.nanargmax(ranges_drag)
+
+    fig_range = go.Figure()
+    fig_range.add_trace(go.Scatter(x=angles_curve, y=ranges_vac, mode='lines', name='Вакуум',
+                                   line=dict(color='royalblue', width=2, dash='dot')))
+    fig_range.add_trace(go.Scatter(x=angles_curve, y=ranges_drag, mode='lines', name='З опором',
+                                   line=dict(color='darkorange', width=3)))
+    fig_range.add_trace(go.Scatter(x=[angles_curve[best]], y=[ranges_drag[best]], mode='markers',
+                                   name=f'Оптимум: {angles_curve[best]:.2f}°',
+                                   marker=dict(color='red', size=10)))
+    fig_range.add_vline(x=angle_degrees, line=dict(color='gray', dash='dash'))
+    fig_range.update_layout(
+        xaxis_title="Кут кидка (α), градуси",
+        yaxis_title="Дальність (L), м",
+        title=f"L(α) при v₀ = {v0:.0f} м/с, h₀ = {h0:.0f} м"
+    )
+    st.plotly_chart(fig_range, use_container_width=True)
+
+    st.header("Оптимальний кут залежно від швидкості")
+    v0_grid, best_angles, best_ranges = optimal_angle_curve(h0, k_drag)
+    fig_opt = go.Figure()
+    fig_opt.add_trace(go.Scatter(x=v0_grid, y=best_angles, mode='lines', name='Оптимальний кут',
+                                 line=dict(color='darkorange', width=3)))
+    fig_opt.add_trace(go.Scatter(x=v0_grid, y=best_ranges, mode='lines', name='Макс. дальність',
+                                 line=dict(color='green', width=2), yaxis='y2'))
+    fig_opt.update_layout(
+        xaxis_title="Початкова швидкість (v₀), м/с",
+        yaxis=dict(title="Оптимальний кут, градуси"),
+        yaxis2=dict(title="Макс. дальність, м", overlaying='y', side='right'),
+        title="α_opt(v₀): з опором оптимальний кут менший за 45°",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_opt, use_container_width=True)
+
+# --- Розсіювання точок падіння (Монте-Карло) ---
+if mode == "Монте-Карло розсіювання":
+    st.header("Розсіювання точок падіння")
+
+    mc_args = dict(v0=v0, angle_deg=angle_degrees, h0=h0, sigma_v0=sigma_v0, sigma_angle=sigma_angle,
+                   sigma_h0=sigma_h0, sigma_azimuth=sigma_azimuth, n_samples=n_samples, seed=int(seed))
+    if use_wind:
+        # Чисельний інтегратор повільніший за формули, тому обмежуємо N
+        mc_args.update(wind_mean=wind_mean, sigma_wind=sigma_wind, k_drag=k_drag,
+                       n_samples=min(n_samples, 100_000))
+
+    t_start = time.perf_counter()
+    hist, x_edges, z_edges, range_hist, range_edges, stats = monte_carlo_dispersion(**mc_args)
+    elapsed_ms = (time.perf_counter() - t_start) * 1000
+    if hist is None:
+        st.error(f"Жоден з {stats['not_landed']:,} кидків не впав за {MAX_FLIGHT_FACTOR}× вакуумний час польоту - "
+                 "розсіювання порахувати не можна. Зменште опір або зустрічний вітер.")
+        st.stop()
+    if stats["not_landed"]:
+        st.warning(f"{stats['not_landed']:,} кидків не впали за {MAX_FLIGHT_FACTOR}× вакуумний час польоту "
+                   "і не враховані в статистиці.")
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Середня дальність", f"{stats['mean']:.2f} м", help=f"σ = {stats['std']:.2f} м")
+    col2.metric("95% інтервал дальності", f"{stats['ci95'][0]:.1f} – {stats['ci95'][1]:.1f} м")
+    col3.metric("Кругове ймовірне відхилення (CEP)", f"{stats['cep50']:.2f} м",
+                help=f"У колі цього радіуса навколо середньої точки падає 50% тіл. Для 90%: {stats['cep90']:.2f} м.")
+    st.caption(f"{mc_args['n_samples']:,} вибірок, {elapsed_ms:.0f} мс "
+               f"(68% інтервал: {stats['ci68'][0]:.1f} – {stats['ci68'][1]:.1f} м, "
+               f"середній час польоту {stats['t_mean']:.2f} с)")
+
+    # Одна теплова карта замість мільйона маркерів
+    x_centers = 0.5 * (x_edges[:-1] + x_edges[1:])
+    z_centers = 0.5 * (z_edges[:-1] + z_edges[1:])
+    fig_mc = go.Figure(go.Heatmap(
+        x=x_centers, y=z_centers, z=np.where(hist.T > 0, hist.T, np.nan),
+        colorscale='Viridis', colorbar=dict(title="Кількість")
+    ))
+    cx, cz = stats["center"]
+    phi = np.linspace(0, 2 * np.pi, 100)
+    for radius, label in ((stats["cep50"], "CEP 50%"), (stats["cep90"], "CEP 90%")):
+        fig_mc.add_trace(go.Scatter(x=cx + radius * np.cos(phi), y=cz + radius * np.sin(phi),
+                                    mode='lines', name=label, line=dict(color='white', dash='dash')))
+    fig_mc.update_layout(
+        xaxis_title="Дальність уздовж траси (x), м",
+        yaxis_title="Бічне відхилення (z), м",
+        title="Густина точок падіння",
+        height=500,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    fig_mc.update_yaxes(scaleanchor="x", scaleratio=1)
+    st.plotly_chart(fig_mc, use_container_width=True)
+
+    fig_hist = go.Figure(go.Bar(
+        x=0.5 * (range_edges[:-1] + range_edges[1:]), y=range_hist,
+        marker_color='royalblue', name='Дальність'
+    ))
+    for edge in stats["ci95"]:
+        fig_hist.add_vline(x=edge, line=dict(color='red', dash='dash'))
+    fig_hist.update_layout(
+        xaxis_title="Дальність (L), м",
+        yaxis_title="Кількість кидків",
+        title="Розподіл дальності (червоні лінії - 95% інтервал)",
+        bargap=0
+    )
+    st.plotly_chart(fig_hist, use_container_width=True)
@@ -2,11 +2,23 @@ import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
 from scipy.integrate import solve_ivp # Нам потрібен розв'язувач диференціальних рівнянь
+from scipy.linalg import eigh_tridiagonal
+import time
+from streaming_integration import linear_windows, rk4_step_matrix, StreamingStats
 
 st.title("🌀 Симулятор гармонічного осцилятора")
 st.write("Моделює рух пружинного маятника з можливим затуханням.")
 
 # --- Бічна панель ---
+st.sidebar.header("Режим")
+page_mode = st.sidebar.radio(
+    "Що моделюємо",
+    ("Один осцилятор", "Ансамбль параметрів", "Ланцюжок осциляторів", "Довгий прогін (потоково)"),
+    help="Ансамбль: сотні осциляторів одночасно та карти характеристик на площині (b, k). "
+         "Ланцюжок: N мас, з'єднаних пружинами, через нормальні моди. "
+         "Довгий прогін: до 10⁶ с вікнами зі сталою пам'яттю."
+)
+
 st.sidebar.header("Параметри осцилятора")
 
 m = st.sidebar.slider("Маса (m), кг", 0.1, 10.0, 1.0)
@@ -18,7 +30,51 @@ st.sidebar.header("Початкові умови")
 x0 = st.sidebar.slider("Початкове зміщення (x₀), м", -5.0, 5.0, 2.0)
 v0 = st.sidebar.slider("Початкова швидкість (v₀), м/с", -5.0, 5.0, 0.0)
 
-t_max = st.sidebar.slider("Час симуляції (T), с", 5.0, 100.0, 20.0)
+t_max = st.sidebar.slider("Час симуляції (T), с", 5.0, 1000.0, 20.0)
+
+if page_mode == "Один осцилятор":
+    st.sidebar.header("Метод розв'язку")
+    method = st.sidebar.radio(
+        "Метод",
+        ("Аналітичний (точний)", "Чисельний solve_ivp (еталон)"),
+        help="Для лінійного осцилятора відомий точний розв'язок. solve_ivp залишено для перевірки."
+    )
+    n_points = st.sidebar.select_slider("Кількість точок графіка", options=[500, 2000, 5000, 20000], value=500)
+elif page_mode == "Ланцюжок осциляторів":
+    st.sidebar.header("Параметри ланцюжка")
+    n_chain = st.sidebar.select_slider("Кількість мас (N)", options=[10, 50, 100, 500, 1000, 5000, 10000], value=500)
+    boundary = st.sidebar.radio("Кінці ланцюжка", ("Закріплені", "Періодичні"))
+    if boundary == "Закріплені":
+        mass_ratio = st.sidebar.slider("Відношення мас m₂/m₁ (двоатомний ланцюжок)", 0.1, 5.0, 1.0, 0.1,
+                                       help="Кожна друга маса дорівнює m·(m₂/m₁). При ≠ 1 з'являється оптична гілка.")
+        n_modes = st.sidebar.slider("Кількість мод у суперпозиції (M)", 10, 1000, 200, 10,
+                                    help="Беремо M найнижчих мод. При N ≤ M розв'язок точний.")
+    else:
+        mass_ratio = 1.0
+    chain_init = st.sidebar.radio("Початкові умови ланцюжка",
+                                  ("Гауссів імпульс", "Біжучий імпульс (вправо)", "Одна нормальна мода"))
+    if chain_init == "Одна нормальна мода":
+        mode_number = st.sidebar.number_input("Номер моди (j)", min_value=1, max_value=n_chain, value=3, step=1)
+    else:
+        pulse_width = st.sidebar.slider("Ширина імпульсу, % від N", 0.2, 10.0, 2.0, 0.1)
+elif page_mode == "Довгий прогін (потоково)":
+    st.sidebar.header("Довгий прогін")
+    stream_method = st.sidebar.radio(
+        "Метод",
+        ("Аналітичний (точний)", "Чисельний RK4 (потоково)"),
+        help="RK4 з фіксованим кроком показує, як накопичується похибка інтегрування (напр. дрейф енергії при b = 0)."
+    )
+    t_long = st.sidebar.number_input("Тривалість прогону, с", min_value=100.0, max_value=1e6, value=1e4,
+                                     step=1000.0, format="%.0f")
+    n_bins = st.sidebar.select_slider("Точок на графіку", options=[500, 1000, 2000, 5000], value=1000)
+else:
+    st.sidebar.header("Параметри ансамблю")
+    b_range = st.sidebar.slider("Діапазон затухання (b)", 0.0, 10.0, (0.05, 5.0))
+    k_range = st.sidebar.slider("Діапазон жорсткості (k), Н/м", 0.1, 100.0, (0.5, 50.0))
+    n_family = st.sidebar.slider("Кількість траєкторій у сімействі", 10, 500, 100, 10)
+    n_grid = st.sidebar.slider("Роздільність карт (N×N)", 20, 200, 100, 10)
+    settle_tol = st.sidebar.slider("Допуск встановлення, %", 0.5, 10.0, 2.0, 0.5,
+                                   help="Час встановлення - коли |x| назавжди стає меншим за цей відсоток від макс. відхилення.")
 
 # --- Розрахункова частина ---
 
@@ -36,44 +92,459 @@ def model(t, y):
     dvdt = (-b * v - k * x) / m
     return [dxdt, dvdt]
 
-# Початкові умови
-y0 = [x0, v0]
+# Точний розв'язок. Позначимо γ = b/(2m), ω₀ = √(k/m):
+# γ < ω₀ - недодемпфований: x = e^(-γt) [x₀ cos(ω_d t) + (v₀ + γx₀) sin(ω_d t)/ω_d],  ω_d = √(ω₀² - γ²)
+# γ = ω₀ - критичний:       x = e^(-γt) [x₀ + (v₀ + γx₀) t]
+# γ > ω₀ - передемпфований: те саме з cosh/sinh замість cos/sin, s = √(γ² - ω₀²)
+# Гіперболічні функції рахуємо через e^(r₁t) та expm1, щоб уникнути переповнення
+# при великих t і втрати точності біля критичного режиму (r₁ = -γ + s).
+# Параметри можуть бути масивами: тоді режим визначається для кожного елемента окремо,
+# і цілий ансамбль обчислюється одним викликом (див. ensemble_solution).
 
-# Часові точки
-t_span = [0, t_max]
-t_eval = np.linspace(t_span[0], t_span[1], 500) # 500 точок для графіка
+def classify_regime(m, k, b):
+    gamma = b / (2 * m)
+    omega0 = np.sqrt(k / m)
+    if np.isclose(gamma, omega0, rtol=1e-12, atol=0.0):
+        return "критичний"
+    return "недодемпфований" if gamma < omega0 else "передемпфований"
 
-# Розв'язуємо ДР
-sol = solve_ivp(model, t_span, y0, t_eval=t_eval)
+def analytic_solution(t, m, k, b, x0, v0):
+    gamma = b / (2 * m)
+    omega0_sq = k / m
+    disc = omega0_sq - gamma**2
+    critical = np.isclose(gamma, np.sqrt(omega0_sq), rtol=1e-12, atol=0.0)
+    # Кожен режим рахуємо лише на своїх елементах: формули інших режимів на чужих
+    # параметрах переповнюються при великих t
+    t, gamma, disc, critical = np.broadcast_arrays(t, gamma, disc, critical)
+    under = (disc > 0) & ~critical
+    over = (disc < 0) & ~critical
+    even = np.empty(t.shape)
+    odd = np.empty(t.shape)
 
-x_values = sol.y[0]
-v_values = sol.y[1]
-t_values = sol.t
+    crit = ~(under | over)
+    decay = np.exp(-gamma[crit] * t[crit])
+    even[crit], odd[crit] = decay, decay * t[crit]
 
-# --- Відображення результатів ---
+    tu, gu = t[under], gamma[under]
+    omega_d = np.sqrt(disc[under])
+    decay = np.exp(-gu * tu)
+    even[under] = decay * np.cos(omega_d * tu)
+    odd[under] = decay * np.sin(omega_d * tu) / omega_d
 
-# Розрахунок параметрів для відображення
-omega0 = np.sqrt(k / m) # Власна частота
-st.metric("Власна частота (ω₀)", f"{omega0:.2f} рад/с")
+    to, go_ = t[over], gamma[over]
+    s = np.sqrt(-disc[over])
+    e1 = np.exp((-go_ + s) * to)
+    em = np.expm1(-2 * s * to) # e^(-2st) - 1
+    even[over] = e1 * (1 + 0.5 * em) # e^(-γt) cosh(st)
+    odd[over] = -e1 * em / (2 * s)   # e^(-γt) sinh(st) / s
 
-# --- Графіки ---
-st.header("Графіки руху")
+    x = x0 * even + (v0 + gamma * x0) * odd
+    v = v0 * even - (gamma * v0 + omega0_sq * x0) * odd
+    return x, v
+
+def ensemble_solution(t, m, k, b, x0, v0):
+    # Параметри - масиви однакової форми (P,) (або числа), t - масив (T,).
+    # Результат: x, v форми (P, T) - по рядку на кожен осцилятор.
+    params = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in (m, k, b, x0, v0)))
+    return analytic_solution(np.asarray(t)[None, :], *(p.reshape(-1, 1) for p in params))
+
+# --- Ансамбль: зведення траєкторій до карт характеристик ---
+# Рахуємо траєкторії невеликими порціями (chunk осциляторів за раз) і одразу зводимо кожну порцію
+# до чисел: час встановлення та перерегулювання. Пам'ять не залежить від N×N, а проміжні масиви
+# вміщаються в кеш процесора.
+# Добротність Q = √(mk)/b відома аналітично.
+
+@st.cache_data(ttl=3600, max_entries=10)
+def ensemble_maps(m, x0, v0, b_range, k_range, n_grid, t_max, settle_tol, n_t=2000, chunk=250):
+    b_grid = np.linspace(b_range[0], b_range[1], n_grid)
+    k_grid = np.linspace(k_range[0], k_range[1], n_grid)
+    B, K = np.meshgrid(b_grid, k_grid) # рядки - k, стовпці - b (як у теплової карти)
+    b_flat, k_flat = B.ravel(), K.ravel()
+    t = np.linspace(0, t_max, n_t)
+
+    settling = np.empty(b_flat.size)
+    overshoot = np.empty(b_flat.size)
+    for start in range(0, b_flat.size, chunk):
+        sl = slice(start, start + chunk)
+        x, _ = ensemble_solution(t, m, k_flat[sl], b_flat[sl], x0, v0)
+        abs_x = np.abs(x)
+        peak_idx = np.argmax(abs_x, axis=1)
+        peak = abs_x[np.arange(x.shape[0]), peak_idx]
+        side = np.sign(x[np.arange(x.shape[0]), peak_idx])
+
+        # Останній момент, коли |x| ще виходить за смугу допуску
+        outside = abs_x > (settle_tol / 100) * peak[:, None]
+        last_out = outside.shape[1] - 1 - np.argmax(outside[:, ::-1], axis=1)
+        settled = ~outside[:, -1]
+        settling[sl] = np.where(settled, t[np.minimum(last_out + 1, n_t - 1)], np.nan)
+        settling[sl][peak == 0] = 0.0 # x₀ = v₀ = 0: тіло з самого початку в рівновазі
+
+        # Перерегулювання: найбільший виліт на протилежний бік від головного відхилення
+        overshoot[sl] = 100 * np.max(-side[:, None] * x, axis=1).clip(min=0) / np.where(peak > 0, peak, 1)
+
+    with np.errstate(divide="ignore"):
+        Q = np.sqrt(m * K) / B
+    return b_grid, k_grid, settling.reshape(B.shape), Q, overshoot.reshape(B.shape)
+
+if page_mode == "Один осцилятор":
+    # Початкові умови
+    y0 = [x0, v0]
+
+    # Часові точки
+    t_span = [0, t_max]
+    t_eval = np.linspace(t_span[0], t_span[1], n_points)
+
+    if method == "Аналітичний (точний)":
+        t_values = t_eval
+        x_values, v_values = analytic_solution(t_eval, m, k, b, x0, v0)
+    else:
+        # Розв'язуємо ДР (жорсткі допуски, щоб результат можна було вважати еталоном)
+        sol = solve_ivp(model, t_span, y0, t_eval=t_eval, rtol=1e-10, atol=1e-12)
+
+        x_values = sol.y[0]
+        v_values = sol.y[1]
+        t_values = sol.t
+
+    # --- Відображення результатів ---
+
+    # Розрахунок параметрів для відображення
+    omega0 = np.sqrt(k / m) # Власна частота
+    zeta = b / (2 * np.sqrt(m * k)) # Коефіцієнт затухання (безрозмірний)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Власна частота (ω₀)", f"{omega0:.2f} рад/с")
+    col2.metric("Коефіцієнт демпфування (ζ)", f"{zeta:.3f}")
+    col3.metric("Режим", classify_regime(m, k, b).capitalize())
+
+    if method != "Аналітичний (точний)":
+        x_exact, v_exact = analytic_solution(t_values, m, k, b, x0, v0)
+        st.info(f"Макс. відхилення solve_ivp від точного розв'язку: "
+                f"|Δx| = {np.max(np.abs(x_values - x_exact)):.2e} м, "
+                f"|Δv| = {np.max(np.abs(v_values - v_exact)):.2e} м/с")
+
+    # --- Графіки ---
+    st.header("Графіки руху")
+
+    fig1 = go.Figure()
+    fig1.add_trace(go.Scatter(x=t_values, y=x_values, mode='lines', name='Зміщення (x)'))
+    fig1.update_layout(
+        title="Залежність зміщення від часу x(t)",
+        xaxis_title="Час (t), с",
+        yaxis_title="Зміщення (x), м"
+    )
+    st.plotly_chart(fig1, use_container_width=True)
+
+    fig2 = go.Figure()
+    fig2.add_trace(go.Scatter(x=x_values, y=v_values, mode='lines', name='Фазова траєкторія'))
+    fig2.update_layout(
+        title="Фазовий портрет (v(x))",
+        xaxis_title="Зміщення (x), м",
+        yaxis_title="Швидкість (v), м/с"
+    )
+    fig2.update_yaxes(scaleanchor="x", scaleratio=1)
+    st.plotly_chart(fig2, use_container_width=True)
+
+# --- Ансамбль осциляторів ---
+if page_mode == "Ансамбль параметрів":
+    t_family = np.linspace(0, t_max, 1000)
+    b_family = np.linspace(b_range[0], b_range[1], n_family)
+
+    # Усе сімейство - один виклик: x, v форми (n_family, 1000)
+    x_family, v_family = ensemble_solution(t_family, m, k, b_family, x0, v0)
+
+    st.header(f"Сімейство з {n_family} траєкторій (b від {b_range[0]:.2f} до {b_range[1]:.2f})")
+    st.write(f"m = {m:.2f} кг, k = {k:.2f} Н/м, x₀ = {x0:.2f} м, v₀ = {v0:.2f} м/с")
+
+    # Усі криві - в одному трейсі, розділені NaN (замість сотень окремих трейсів)
+    def stack_with_gaps(rows, axis_values=None):
+        pad = np.full((rows.shape[0], 1), np.nan)
+        if axis_values is not None:
+            rows = np.broadcast_to(axis_values, rows.shape)
+        return np.hstack([rows, pad]).ravel()
+
+    fig_family = go.Figure()
+    fig_family.add_trace(go.Scattergl(
+        x=stack_with_gaps(x_family, t_family), y=stack_with_gaps(x_family),
+        mode='lines', line=dict(color='rgba(65, 105, 225, 0.25)', width=1), name='Сімейство'
+    ))
+    fig_family.add_trace(go.Scatter(
+        x=t_family, y=ensemble_solution(t_family, m, k, b, x0, v0)[0][0],
+        mode='lines', line=dict(color='red', width=3), name=f'Поточне b = {b:.2f}'
+    ))
+    fig_family.update_layout(
+        title="Залежність зміщення від часу x(t) для різних b",
+        xaxis_title="Час (t), с",
+        yaxis_title="Зміщення (x), м"
+    )
+    st.plotly_chart(fig_family, use_container_width=True)
+
+    fig_family_phase = go.Figure()
+    fig_family_phase.add_trace(go.Scattergl(
+        x=stack_with_gaps(x_family), y=stack_with_gaps(v_family),
+        mode='lines', line=dict(color='rgba(65, 105, 225, 0.25)', width=1), name='Сімейство'
+    ))
+    fig_family_phase.update_layout(
+        title="Фазові портрети (v(x)) для різних b",
+        xaxis_title="Зміщення (x), м",
+        yaxis_title="Швидкість (v), м/с"
+    )
+    fig_family_phase.update_yaxes(scaleanchor="x", scaleratio=1)
+    st.plotly_chart(fig_family_phase, use_container_width=True)
+
+    st.header(f"Карти характеристик на площині (b, k), {n_grid}×{n_grid} осциляторів")
+    with st.spinner("Розрахунок ансамблю..."):
+        b_grid, k_grid, settling, Q, overshoot = ensemble_maps(
+            m, x0, v0, b_range, k_range, n_grid, t_max, settle_tol
+        )
+
+    maps = [
+        ("Час встановлення, с", settling, 'Viridis',
+         f"Білі клітинки - не встановилось за T = {t_max:.0f} с."),
+        ("log₁₀ добротності Q", np.log10(np.where(np.isfinite(Q), Q, np.nan)), 'Plasma',
+         "Q = √(mk)/b. Q > 0.5 - коливальний режим, Q < 0.5 - аперіодичний. "
+         "При b = 0 Q нескінченна (білі клітинки)."),
+        ("Перерегулювання, %", overshoot, 'Inferno',
+         "Наскільки далеко тіло перелітає положення рівноваги відносно макс. відхилення."),
+    ]
+    for title, values, colorscale, caption in maps:
+        fig_map = go.Figure(go.Heatmap(x=b_grid, y=k_grid, z=values, colorscale=colorscale,
+                                       colorbar=dict(title=title)))
+        # Лінія критичного затухання: b = 2√(mk)
+        k_line = np.linspace(k_range[0], k_range[1], 200)
+        fig_map.add_trace(go.Scatter(x=2 * np.sqrt(m * k_line), y=k_line, mode='lines',
+                                     line=dict(color='white', dash='dash'), name='Критичне затухання'))
+        fig_map.add_trace(go.Scatter(x=[b], y=[k], mode='markers', marker=dict(color='red', size=10),
+                                     name='Поточні (b, k)'))
+        fig_map.update_layout(
+            title=title,
+            xaxis_title="Коефіцієнт затухання (b)",
+            yaxis_title="Жорсткість (k), Н/м",
+            xaxis=dict(range=[b_range[0], b_range[1]]),
+            yaxis=dict(range=[k_range[0], k_range[1]]),
+            showlegend=False
+        )
+        st.plotly_chart(fig_map, use_container_width=True)
+        st.caption(caption)
+
+# --- Ланцюжок N мас: нормальні моди ---
+# Рівняння: m_i u_i'' = k (u_{i+1} - 2u_i + u_{i-1}) - b (m_i/m) u_i'
+# У масово-зважених координатах y = √m·u матриця жорсткості D = M^(-1/2) K M^(-1/2)
+# симетрична тридіагональна (для закріплених кінців), тому моди дає eigh_tridiagonal.
+# Кожна мода - незалежний осцилятор з одиничною масою та частотою ω_j,
+# отже її рух знову дає ensemble_solution, а u(t) - суперпозиція мод.
+# Для великих N беремо лише M найнижчих мод (select='i'), а не всі N×N власних векторів.
+# Періодичні кінці додають кутові елементи, і матриця вже не тридіагональна, але вона
+# циркулянтна - її власні вектори є гармоніками Фур'є, тому там використовуємо FFT.
+
+@st.cache_data(ttl=3600, max_entries=3)
+def chain_modes(n_chain, m, k, mass_ratio, n_modes):
+    masses = np.full(n_chain, m)
+    masses[1::2] *= mass_ratio
+    inv_sqrt_m = 1 / np.sqrt(masses)
+    diag = 2 * k / masses
+    off = -k * inv_sqrt_m[:-1] * inv_sqrt_m[1:]
+
+    if n_modes >= n_chain:
+        omega_sq, vectors = eigh_tridiagonal(diag, off)
+        omega_sq_all = omega_sq
+    else:
+        omega_sq, vectors = eigh_tridiagonal(diag, off, select='i', select_range=(0, n_modes - 1),
+                                             lapack_driver='stemr')
+        omega_sq_all = eigh_tridiagonal(diag, off, eigvals_only=True, lapack_driver='sterf')
+    return masses, np.sqrt(omega_sq.clip(min=0)), vectors, np.sqrt(omega_sq_all.clip(min=0))
+
+def chain_initial_state(n_chain, amplitude, sound_speed):
+    i = np.arange(n_chain)
+    if chain_init == "Одна нормальна мода":
+        j = int(mode_number)
+        if boundary == "Закріплені":
+            u0 = amplitude * np.sin(j * np.pi * (i + 1) / (n_chain + 1))
+        else:
+            u0 = amplitude * np.cos(2 * np.pi * j * i / n_chain)
+        return u0, np.zeros(n_chain)
+    width = max(pulse_width / 100 * n_chain, 1.0)
+    u0 = amplitude * np.exp(-0.5 * ((i - n_chain / 4) / width)**2)
+    if chain_init == "Біжучий імпульс (вправо)":
+        # u(x - ct): v = -c du/dx
+        return u0, sound_speed * u0 * (i - n_chain / 4) / width**2
+    return u0, np.zeros(n_chain)
+
+if page_mode == "Ланцюжок осциляторів":
+    n_frames = 300
+    t_chain = np.linspace(0, t_max, n_frames)
+    gamma_chain = b / (2 * m)
+    sound_speed = np.sqrt(k / m) # сайтів за секунду (для рівних мас)
+    u0, v0_chain = chain_initial_state(n_chain, x0, sound_speed)
+
+    # Для теплової карти беремо не більше 800 мас - рахуємо лише ці рядки
+    display_idx = np.unique(np.linspace(0, n_chain - 1, min(n_chain, 800)).astype(int))
+
+    with st.spinner("Розрахунок нормальних мод..."):
+        if boundary == "Закріплені":
+            masses, omega, vectors, omega_all = chain_modes(n_chain, m, k, mass_ratio, min(n_modes, n_chain))
+            sqrt_m = np.sqrt(masses)
+            q0 = vectors.T @ (sqrt_m * u0)
+            qd0 = vectors.T @ (sqrt_m * v0_chain)
+            q_t, _ = ensemble_solution(t_chain, 1.0, omega**2, 2 * gamma_chain, q0, qd0)
+            u_display = (vectors[display_idx] @ q_t) / sqrt_m[display_idx, None]
+
+            # Яка частка початкової енергії потрапила у взяті моди
+            diff = np.diff(np.concatenate(([0.0], u0, [0.0])))
+            energy_total = 0.5 * np.sum(masses * v0_chain**2) + 0.5 * k * np.sum(diff**2)
+            energy_modes = 0.5 * np.sum(qd0**2 + omega**2 * q0**2)
+            n_used = omega.size
+        else:
+            modes_k = np.arange(n_chain // 2 + 1)
+            omega = 2 * np.sqrt(k / m) * np.abs(np.sin(np.pi * modes_k / n_chain))
+            omega_all = omega
+            c0, cd0 = np.fft.rfft(u0), np.fft.rfft(v0_chain)
+            re_t, _ = ensemble_solution(t_chain, 1.0, omega**2, 2 * gamma_chain, c0.real, cd0.real)
+            im_t, _ = ensemble_solution(t_chain, 1.0, omega**2, 2 * gamma_chain, c0.imag, cd0.imag)
+            u_display = np.fft.irfft(re_t + 1j * im_t, n=n_chain, axis=0)[display_idx]
+            # Енергія ланцюжка напряму і за модами (рівність Парсеваля для rfft: моди 0 і N/2
+            # входять раз, решта - двічі, бо мають спряжену пару)
+            weight = np.full(modes_k.size, 2.0)
+            weight[0] = 1.0
+            if n_chain % 2 == 0:
+                weight[-1] = 1.0
+            energy_total = 0.5 * m * np.sum(v0_chain**2) + 0.5 * k * np.sum((u0 - np.roll(u0, 1))**2)
+            energy_modes = 0.5 * m * np.sum(weight * (np.abs(cd0)**2 + omega**2 * np.abs(c0)**2)) / n_chain
+            n_used = n_chain
+
+    st.header(f"Ланцюжок з {n_chain} мас ({boundary.lower()} кінці)")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Мод у суперпозиції", f"{n_used}")
+    col2.metric("Діапазон частот мод", f"{omega_all.min():.3f} – {omega_all.max():.3f} рад/с")
+    col3.metric("Енергія, охоплена модами", f"{100 * energy_modes / energy_total:.2f} %" if energy_total > 0 else "—",
+                help="Якщо помітно менше 100%, збільште M або ширину імпульсу.")
+
+    fig_st = go.Figure(go.Heatmap(
+        x=display_idx + 1, y=t_chain, z=u_display.T,
+        colorscale='RdBu', zmid=0, colorbar=dict(title="u, м")
+    ))
+    fig_st.update_layout(
+        title="Просторово-часова діаграма зміщень u(i, t)",
+        xaxis_title="Номер маси (i)",
+        yaxis_title="Час (t), с",
+        height=600
+    )
+    st.plotly_chart(fig_st, use_container_width=True)
+
+    # --- Дисперсійне співвідношення ω(k) (a = 1 - відстань між масами) ---
+    step = max(1, omega_all.size // 2000)
+    if boundary == "Закріплені":
+        n = omega_all.size
+        if mass_ratio == 1.0:
+            k_num = np.arange(1, n + 1) * np.pi / (n + 1)
+            branches = [(k_num, omega_all)]
+        else:
+            n_ac = n // 2
+            k_ac = np.arange(1, n_ac + 1) * np.pi / (2 * (n_ac + 1))
+            k_op = np.arange(n - n_ac, 0, -1) * np.pi / (2 * (n - n_ac + 1))
+            branches = [(k_ac, omega_all[:n_ac]), (k_op, omega_all[n_ac:])]
+    else:
+        branches = [(2 * np.pi * modes_k / n_chain, omega_all)]
+
+    fig_disp = go.Figure()
+    for k_vals, w_vals in branches:
+        fig_disp.add_trace(go.Scatter(x=k_vals[::step], y=w_vals[::step], mode='markers',
+                                      marker=dict(size=4, color='royalblue'), name='Власні частоти (чисельно)'))
+    if mass_ratio == 1.0:
+        k_th = np.linspace(0, np.pi, 400)
+        fig_disp.add_trace(go.Scatter(x=k_th, y=2 * np.sqrt(k / m) * np.sin(k_th / 2), mode='lines',
+                                      line=dict(color='red', dash='dash'), name='ω = 2√(k/m)·|sin(ka/2)|'))
+    else:
+        # Двоатомний ланцюжок (комірка 2a): акустична та оптична гілки
+        m1, m2 = m, m * mass_ratio
+        q_th = np.linspace(0, np.pi / 2, 400)
+        root = np.sqrt((1 / m1 + 1 / m2)**2 - 4 * np.sin(q_th)**2 / (m1 * m2))
+        for sign, label in ((-1, 'Акустична гілка (теорія)'), (1, 'Оптична гілка (теорія)')):
+            fig_disp.add_trace(go.Scatter(x=q_th, y=np.sqrt(k * (1 / m1 + 1 / m2 + sign * root)), mode='lines',
+                                          line=dict(color='red', dash='dash'), name=label))
+    fig_disp.update_layout(
+        title="Дисперсійне співвідношення ω(k)",
+        xaxis_title="Хвильове число (k·a), рад",
+        yaxis_title="Частота (ω), рад/с",
+        showlegend=False
+    )
+    st.plotly_chart(fig_disp, use_container_width=True)
+
+# --- Довгий прогін: потоково, вікнами ---
+# Рух рахуємо вікнами по ~1000 періодів. Кінцевий стан вікна - початковий для наступного,
+# а від вікна залишаються лише зведення по бінах (StreamingStats), тож пам'ять стала
+# навіть для 10⁶ с. Аналітичний метод рахує кожне вікно одним векторизованим викликом.
+# RK4 для лінійного осцилятора - множення на сталу матрицю кроку, тож вікно теж рахується
+# векторизовано (степенями цієї матриці), без циклу Python по кроках.
+def analytic_windows(t_long, window, samples_per_window, m, k, b, x_start, v_start):
+    t0 = 0.0
+    while t0 < t_long:
+        t1 = min(t0 + window, t_long)
+        tau = np.linspace(0, t1 - t0, samples_per_window)
+        x_w, v_w = analytic_solution(tau, m, k, b, x_start, v_start)
+        x_start, v_start = x_w[-1], v_w[-1]
+        yield t0 + tau, np.vstack((x_w, v_w))
+        t0 = t1
+
+if page_mode == "Довгий прогін (потоково)":
+    st.header("Довгий прогін (потокове інтегрування)")
+    period = 2 * np.pi / np.sqrt(k / m)
+    window = min(t_long, 1000 * period)
+    n_windows = int(np.ceil(t_long / window))
+    if stream_method == "Аналітичний (точний)":
+        windows = analytic_windows(t_long, window, int(20 * window / period) + 1, m, k, b, x0, v0)
+    else:
+        step = rk4_step_matrix([[0.0, 1.0], [-k / m, -b / m]], period / 60)
+        windows = linear_windows(step, [x0, v0], t_long, window, period / 60, record_every=3)
+    st.write(f"{n_windows} вікон по {window:.1f} с, ~20 точок на період. "
+             "Результат залишається на сторінці, доки не зміните параметри.")
+
+    run_params = (stream_method, m, k, b, x0, v0, t_long, n_bins)
+    if st.button("Запустити прогін"):
+        stats = StreamingStats(t_long, n_bins)
+        progress = st.progress(0.0, text="Розрахунок...")
+        t_start = time.perf_counter()
+        for i, (t_w, y_w) in enumerate(windows):
+            x_w, v_w = y_w
+            stats.update(t_w, x_w, 0.5 * m * v_w**2 + 0.5 * k * x_w**2)
+            progress.progress(min((i + 1) / n_windows, 1.0),
+                              text=f"Розрахунок... t = {t_w[-1]:.0f} / {t_long:.0f} с")
+        progress.empty()
+        st.session_state["oscillator_stream"] = (run_params, stats, time.perf_counter() - t_start)
+
+    saved = st.session_state.get("oscillator_stream")
+    if saved is not None and saved[0] == run_params:
+        _, stats, elapsed = saved
+        t_bins = stats.bin_centers()
+        energy0 = 0.5 * m * v0**2 + 0.5 * k * x0**2
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Макс. амплітуда", f"{stats.abs_max:.3f} м")
+        col2.metric("Енергія в кінці прогону", f"{stats.energy_last:.4g} Дж")
+        if energy0 > 0:
+            col3.metric("E(T) / E(0)", f"{stats.energy_last / energy0:.6f}",
+                        help="Для точного розв'язку: e^(-bT/m) у середньому. При b = 0 має бути рівно 1.")
+        st.caption(f"Оброблено {stats.n_samples:,} точок за {elapsed:.1f} с; "
+                   f"у пам'яті зберігається {stats.stored_values():,} чисел.")
+
+        fig_env = go.Figure()
+        fig_env.add_trace(go.Scatter(x=t_bins, y=stats.x_max, mode='lines', line=dict(width=0),
+                                     showlegend=False, hoverinfo='skip'))
+        fig_env.add_trace(go.Scatter(x=t_bins, y=stats.x_min, mode='lines', line=dict(width=0),
+                                     fill='tonexty', fillcolor='rgba(65, 105, 225, 0.4)', name='Діапазон x у біні'))
+        fig_env.update_layout(
+            title="Обвідна коливань x(t)",
+            xaxis_title="Час (t), с",
+            yaxis_title="Зміщення (x), м"
+        )
+        st.plotly_chart(fig_env, use_container_width=True)
+
+        fig_energy = go.Figure()
+        fig_energy.add_trace(go.Scatter(x=t_bins, y=np.where(np.isfinite(stats.energy), stats.energy, np.nan),
+                                        mode='lines', line=dict(color='darkorange', width=2), name='Енергія'))
+        fig_energy.update_layout(
+            title="Макс. механічна енергія в біні E(t)",
+            xaxis_title="Час (t), с",
+            yaxis_title="Енергія (E), Дж",
+            yaxis_type="log" if b > 0 else "linear"
+        )
+        st.plotly_chart(fig_energy, use_container_width=True)
 
-fig1 = go.Figure()
-fig1.add_trace(go.Scatter(x=t_values, y=x_values, mode='lines', name='Зміщення (x)'))
-fig1.update_layout(
-    title="Залежність зміщення від часу x(t)",
-    xaxis_title="Час (t), с",
-    yaxis_title="Зміщення (x), м"
-)
-st.plotly_chart(fig1, use_container_width=True)
-
-fig2 = go.Figure()
-fig2.add_trace(go.Scatter(x=x_values, y=v_values, mode='lines', name='Фазова траєкторія'))
-fig2.update_layout(
-    title="Фазовий портрет (v(x))",
-    xaxis_title="Зміщення (x), м",
-    yaxis_title="Швидкість (v), м/с"
-)
-fig2.update_yaxes(scaleanchor="x", scaleratio=1)
-st.plotly_chart(fig2, use_container_width=True)
\ No newline at end of file
@@ -1,68 +1,674 @@
 import streamlit as st
 import numpy as np
+import plotly.graph_objects as go
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pa_parquet
+import heapq
+import io
+import time
 
 st.title("💥 Калькулятор 1D зіткнень")
-st.write("Розраховує кінцеві швидкості для двох тіл після зіткнення.")
-
-# Використовуємо форму для групування вводу
-with st.form(key='collision_form'):
-    st.subheader("Тіло 1 (ліве)")
-    col1, col2 = st.columns(2)
-    m1 = col1.number_input("Маса (m₁), кг", min_value=0.1, value=1.0)
-    v1 = col2.number_input("Початкова швидкість (v₁), м/с", value=10.0, format="%.2f")
-
-    st.subheader("Тіло 2 (праве)")
-    col3, col4 = st.columns(2)
-    m2 = col3.number_input("Маса (m₂), кг", min_value=0.1, value=2.0)
-    v2 = col4.number_input("Початкова швидкість (v₂), м/с", value=0.0, format="%.2f")
-
-    st.subheader("Тип зіткнення")
-    collision_type = st.radio(
-        "Оберіть тип зіткнення:",
-        ('Абсолютно пружне', 'Абсолютно непружне (тіла злипаються)')
-    )
-    
-    # Кнопка для відправки форми
-    submit_button = st.form_submit_button(label='Розрахувати!')
+st.write("Розраховує кінцеві швидкості для двох тіл після зіткнення, "
+         "моделює систему з тисяч тіл на прямій між двома стінками і газ пружних дисків на площині, "
+         "а також обробляє цілі таблиці лабораторних вимірювань.")
+
+# --- Бічна панель ---
+st.sidebar.header("Режим")
+page_mode = st.sidebar.radio(
+    "Що розраховуємо",
+    ("Два тіла (формули)", "Таблиця вимірювань (CSV)", "N тіл на прямій (події)", "Газ твердих дисків (2D)"),
+    help="Таблиця: ті самі формули одразу для всіх рядків завантаженого файлу (до 10⁶ рядків). "
+         "N тіл: моделювання від зіткнення до зіткнення з чергою подій, до 10⁴ тіл і 10⁶ зіткнень. "
+         "Газ: пружні диски в 2D-коробці та релаксація до розподілу Максвелла."
+)
+
+if page_mode == "N тіл на прямій (події)":
+    st.sidebar.header("Параметри системи")
+    n_bodies = st.sidebar.select_slider("Кількість тіл (N)", options=[2, 10, 100, 1000, 10000], value=1000)
+    mass_mode = st.sidebar.radio("Маси тіл", ("Однакові (1 кг)", "Випадкові (0.5–2 кг)", "Чергування m₁ / m₂"))
+    if mass_mode == "Чергування m₁ / m₂":
+        mass_ratio = st.sidebar.slider("Відношення мас m₂/m₁", 0.1, 10.0, 3.0, 0.1)
+    restitution = st.sidebar.slider("Коефіцієнт відновлення (e)", 0.0, 1.0, 1.0, 0.01,
+                                    help="e = 1: абсолютно пружне зіткнення, e = 0: абсолютно непружне. "
+                                         "Стінки завжди пружні.")
+    v_spread = st.sidebar.slider("Розкид початкових швидкостей (σᵥ), м/с", 0.1, 10.0, 1.0, 0.1)
+    seed = st.sidebar.number_input("Зерно генератора", min_value=0, value=0, step=1)
+
+    st.sidebar.header("Тривалість")
+    t_run = st.sidebar.number_input("Час моделювання, с", min_value=1.0, max_value=1e5, value=100.0, step=10.0)
+    max_events = st.sidebar.select_slider("Макс. кількість зіткнень",
+                                          options=[10**4, 10**5, 10**6, 3 * 10**6], value=10**6)
+elif page_mode == "Газ твердих дисків (2D)":
+    st.sidebar.header("Параметри газу")
+    n_disks = st.sidebar.select_slider("Кількість дисків (N)", options=[1000, 10000, 30000, 100000], value=10000)
+    packing = st.sidebar.slider("Частка площі, зайнята дисками (φ)", 0.01, 0.5, 0.2, 0.01,
+                                help="Розмір коробки підбирається так, щоб N дисків діаметром 1 займали частку φ площі.")
+    start_mode = st.sidebar.radio("Початкові швидкості",
+                                  ("Однаковий модуль, випадкові напрямки", "Усі рухаються вздовж x"))
+    seed = st.sidebar.number_input("Зерно генератора", min_value=0, value=0, step=1)
+
+    st.sidebar.header("Тривалість")
+    n_frames = st.sidebar.slider("Кількість кадрів", 10, 200, 60, 10)
+    steps_per_frame = st.sidebar.slider("Кроків на кадр", 1, 50, 10)
+
+# --- Розрахункова частина ---
+
+def collision_velocities(m1, v1, m2, v2, e=1.0):
+    # Швидкості після центрального зіткнення з коефіцієнтом відновлення e:
+    # e = 1 - формули пружного зіткнення, e = 0 - тіла рухаються разом (злипаються).
+    # Працює як для чисел, так і для масивів NumPy.
+    p = m1 * v1 + m2 * v2
+    u1 = (p + m2 * e * (v2 - v1)) / (m1 + m2)
+    u2 = (p + m1 * e * (v1 - v2)) / (m1 + m2)
+    return u1, u2
+
+if page_mode == "Два тіла (формули)":
+    # Використовуємо форму для групування вводу
+    with st.form(key='collision_form'):
+        st.subheader("Тіло 1 (ліве)")
+        col1, col2 = st.columns(2)
+        m1 = col1.number_input("Маса (m₁), кг", min_value=0.1, value=1.0)
+        v1 = col2.number_input("Початкова швидкість (v₁), м/с", value=10.0, format="%.2f")
+
+        st.subheader("Тіло 2 (праве)")
+        col3, col4 = st.columns(2)
+        m2 = col3.number_input("Маса (m₂), кг", min_value=0.1, value=2.0)
+        v2 = col4.number_input("Початкова швидкість (v₂), м/с", value=0.0, format="%.2f")
+
+        st.subheader("Тип зіткнення")
+        collision_type = st.radio(
+            "Оберіть тип зіткнення:",
+            ('Абсолютно пружне', 'Абсолютно непружне (тіла злипаються)')
+        )
+
+        # Кнопка для відправки форми
+        submit_button = st.form_submit_button(label='Розрахувати!')
+
+    # --- Розрахунок для двох тіл (виконується після натискання кнопки) ---
+    if submit_button:
+        # Початковий імпульс та енергія
+        p_initial = m1 * v1 + m2 * v2
+        ke_initial = 0.5 * m1 * v1**2 + 0.5 * m2 * v2**2
+
+        if collision_type == 'Абсолютно пружне':
+            # Формули для пружного зіткнення (e = 1)
+            u1, u2 = collision_velocities(m1, v1, m2, v2, e=1.0)
+
+            # Кінцевий імпульс та енергія
+            p_final = m1 * u1 + m2 * u2
+            ke_final = 0.5 * m1 * u1**2 + 0.5 * m2 * u2**2
+
+            st.header("Результати (Пружне зіткнення)")
+            st.metric("Кінцева швидкість Тіла 1 (u₁)", f"{u1:.3f} м/с")
+            st.metric("Кінцева швидкість Тіла 2 (u₂)", f"{u2:.3f} м/с")
+
+        elif collision_type == 'Абсолютно непружне (тіла злипаються)':
+            # Тіла злипаються, кінцева швидкість однакова (u)
+            u = (m1 * v1 + m2 * v2) / (m1 + m2)
+            u1 = u
+            u2 = u
+
+            # Кінцевий імпульс та енергія
+            p_final = (m1 + m2) * u
+            ke_final = 0.5 * (m1 + m2) * u**2
+
+            st.header("Результати (Непружне зіткнення)")
+            st.metric("Кінцева швидкість обох тіл (u)", f"{u:.3f} м/с")
+
+        st.subheader("Перевірка законів збереження")
+        st.info(f"Початковий імпульс: {p_initial:.2f} кг·м/с\n\n"
+                f"Кінцевий імпульс: {p_final:.2f} кг·м/с")
+
+        st.warning(f"Початкова кінетична енергія: {ke_initial:.2f} Дж\n\n"
+                   f"Кінцева кінетична енергія: {ke_final:.2f} Дж")
+
+        if collision_type == 'Абсолютно непружне (тіла злипаються)':
+            st.write(f"Втрата енергії (перейшла в тепло): {ke_initial - ke_final:.2f} Дж")
+
+# --- Таблиця вимірювань: ті самі формули для всіх рядків одразу ---
+# collision_velocities працює з масивами, тож мільйон рядків - це кілька векторних операцій,
+# а не цикл по рядках. Кешуємо за вмістом файлу: повторний показ нічого не перераховує.
+COLUMNS = ["m1", "v1", "m2", "v2"]
+
+@st.cache_data(ttl=3600, max_entries=5)
+def read_measurements(file_bytes):
+    # Excel з українською локаллю зберігає CSV через «;» і з десятковою комою
+    sep, decimal = (";", ",") if b";" in file_bytes.split(b"\n", 1)[0] else (",", ".")
+    table = pd.read_csv(io.BytesIO(file_bytes), sep=sep, decimal=decimal)
+    table.columns = [str(c).strip().lower().replace("₁", "1").replace("₂", "2") for c in table.columns]
+    if not set(COLUMNS) <= set(table.columns):
+        # Файл без заголовка: перші чотири стовпці - m1, v1, m2, v2
+        table = pd.read_csv(io.BytesIO(file_bytes), sep=sep, decimal=decimal, header=None)
+        if table.shape[1] < 4:
+            raise ValueError("Потрібні стовпці m1, v1, m2, v2 (із заголовком або перші чотири без нього).")
+        table.columns = COLUMNS + [f"col{i}" for i in range(4, table.shape[1])]
+    for name in COLUMNS:
+        table[name] = pd.to_numeric(table[name], errors="coerce")
+    return table
+
+@st.cache_data(ttl=3600, max_entries=5)
+def batch_collisions(file_bytes):
+    table = read_measurements(file_bytes)
+    m1, v1, m2, v2 = (table[name].to_numpy(dtype=float) for name in COLUMNS)
+    valid = np.isfinite(m1) & np.isfinite(v1) & np.isfinite(m2) & np.isfinite(v2) & (m1 > 0) & (m2 > 0)
+    m1, m2 = np.where(valid, m1, np.nan), np.where(valid, m2, np.nan)
 
-# --- Розрахункова частина (виконується після натискання кнопки) ---
-if submit_button:
-    # Початковий імпульс та енергія
     p_initial = m1 * v1 + m2 * v2
     ke_initial = 0.5 * m1 * v1**2 + 0.5 * m2 * v2**2
 
-    if collision_type == 'Абсолютно пружне':
-        # Формули для пружного зіткнення
-        u1 = ((m1 - m2) * v1 + 2 * m2 * v2) / (m1 + m2)
-        u2 = ((m2 - m1) * v2 + 2 * m1 * v1) / (m1 + m2)
-        
-        # Кінцевий імпульс та енергія
-        p_final = m1 * u1 + m2 * u2
-        ke_final = 0.5 * m1 * u1**2 + 0.5 * m2 * u2**2
-
-        st.header("Результати (Пружне зіткнення)")
-        st.metric("Кінцева швидкість Тіла 1 (u₁)", f"{u1:.3f} м/с")
-        st.metric("Кінцева швидкість Тіла 2 (u₂)", f"{u2:.3f} м/с")
-        
-    elif collision_type == 'Абсолютно непружне (тіла злипаються)':
-        # Тіла злипаються, кінцева швидкість однакова (u)
-        u = (m1 * v1 + m2 * v2) / (m1 + m2)
-        u1 = u
-        u2 = u
-        
-        # Кінцевий імпульс та енергія
-        p_final = (m1 + m2) * u
-        ke_final = 0.5 * (m1 + m2) * u**2
-        
-        st.header("Результати (Непружне зіткнення)")
-        st.metric("Кінцева швидкість обох тіл (u)", f"{u:.3f} м/с")
-
-    st.subheader("Перевірка законів збереження")
-    st.info(f"Початковий імпульс: {p_initial:.2f} кг·м/с\n\n"
-            f"Кінцевий імпульс: {p_final:.2f} кг·м/с")
-
-    st.warning(f"Початкова кінетична енергія: {ke_initial:.2f} Дж\n\n"
-               f"Кінцева кінетична енергія: {ke_final:.2f} Дж")
-    
-    if collision_type == 'Абсолютно непружне (тіла злипаються)':
-        st.write(f"Втрата енергії (перейшла в тепло): {ke_initial - ke_final:.2f} Дж")
\ No newline at end of file
+    # Абсолютно пружне (e = 1) та абсолютно непружне (e = 0, u₁ = u₂ = u)
+    u1, u2 = collision_velocities(m1, v1, m2, v2, e=1.0)
+    u, _ = collision_velocities(m1, v1, m2, v2, e=0.0)
+    ke_elastic = 0.5 * m1 * u1**2 + 0.5 * m2 * u2**2
+    ke_inelastic = 0.5 * (m1 + m2) * u**2
+
+    result = table.copy()
+    result["u1_elastic"] = u1
+    result["u2_elastic"] = u2
+    result["dp_elastic"] = m1 * u1 + m2 * u2 - p_initial
+    result["dE_elastic"] = ke_elastic - ke_initial
+    result["u_inelastic"] = u
+    result["dp_inelastic"] = (m1 + m2) * u - p_initial
+    result["E_loss_inelastic"] = ke_initial - ke_inelastic
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result["E_loss_fraction"] = np.where(ke_initial > 0, (ke_initial - ke_inelastic) / ke_initial, 0.0)
+    return result, int((~valid).sum())
+
+# Запис через Arrow: CSV на мільйон рядків - ~2 с замість ~20 с у pandas.to_csv
+@st.cache_data(ttl=3600, max_entries=5)
+def export_results(file_bytes, file_format):
+    result, _ = batch_collisions(file_bytes)
+    table = pa.Table.from_pandas(result, preserve_index=False)
+    buffer = io.BytesIO()
+    if file_format == "csv":
+        pa_csv.write_csv(table, buffer)
+    else:
+        pa_parquet.write_table(table, buffer)
+    return buffer.getvalue()
+
+if page_mode == "Таблиця вимірювань (CSV)":
+    st.header("Обробка таблиці вимірювань")
+    st.write("Завантажте CSV зі стовпцями **m1, v1, m2, v2** (маси в кг, швидкості в м/с). "
+             "Інші стовпці (напр. group - номер групи) збережуться в результатах.")
+    st.download_button("Завантажити шаблон CSV",
+                       "group,m1,v1,m2,v2\n1,1.0,10.0,2.0,0.0\n1,0.5,4.0,0.5,-4.0\n",
+                       file_name="collisions_template.csv", mime="text/csv")
+    measurements = st.file_uploader("Файл вимірювань", type=["csv", "txt"])
+
+    if measurements is not None:
+        file_bytes = measurements.getvalue()
+        t_start = time.perf_counter()
+        try:
+            result, n_invalid = batch_collisions(file_bytes)
+        except (ValueError, pd.errors.ParserError) as err:
+            st.error(f"Не вдалося прочитати файл: {err}")
+            st.stop()
+        elapsed = time.perf_counter() - t_start
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Рядків", f"{len(result):,}")
+        col2.metric("Некоректних рядків", f"{n_invalid:,}", help="Порожні чи нечислові значення або маса ≤ 0")
+        col3.metric("Час обробки", f"{elapsed:.2f} с")
+        if n_invalid:
+            st.warning(f"Пропущено рядків: {n_invalid:,} (у результатах для них порожні значення).")
+
+        st.subheader("Перевірка законів збереження")
+        st.info(f"Пружне зіткнення: макс. |Δp| = {np.nanmax(np.abs(result['dp_elastic'])):.2e} кг·м/с, "
+                f"макс. |ΔE| = {np.nanmax(np.abs(result['dE_elastic'])):.2e} Дж (похибка округлення).\n\n"
+                f"Непружне зіткнення: макс. |Δp| = {np.nanmax(np.abs(result['dp_inelastic'])):.2e} кг·м/с, "
+                f"сумарна втрата енергії {np.nansum(result['E_loss_inelastic']):.4g} Дж.")
+
+        # Гістограму рахуємо в NumPy, у браузер ідуть лише стовпчики
+        loss = result["E_loss_fraction"].to_numpy()
+        counts, edges = np.histogram(loss[np.isfinite(loss)], bins=50, range=(0, 1))
+        fig_loss = go.Figure(go.Bar(x=100 * (edges[:-1] + edges[1:]) / 2, y=counts, width=100 / 50,
+                                    marker_color='firebrick'))
+        fig_loss.update_layout(
+            title="Частка кінетичної енергії, що перейшла в тепло (непружне зіткнення)",
+            xaxis_title="Втрата енергії, %",
+            yaxis_title="Кількість рядків"
+        )
+        st.plotly_chart(fig_loss, use_container_width=True)
+
+        if "group" in result.columns:
+            st.subheader("Підсумки за групами")
+            summary = result.groupby("group").agg(
+                rows=("m1", "size"),
+                mean_u1_elastic=("u1_elastic", "mean"),
+                mean_u2_elastic=("u2_elastic", "mean"),
+                mean_E_loss_fraction=("E_loss_fraction", "mean"),
+            )
+            st.dataframe(summary, use_container_width=True)
+
+        st.subheader("Результати")
+        st.caption("Показано перші 1000 рядків; повна таблиця - у файлах нижче.")
+        st.dataframe(result.head(1000), use_container_width=True)
+
+        # Файли формуються лише після натискання кнопки, а не при кожному перезапуску сторінки
+        col_csv, col_parquet = st.columns(2)
+        col_csv.download_button("Завантажити CSV", lambda: export_results(file_bytes, "csv"),
+                                file_name="collisions_results.csv", mime="text/csv")
+        col_parquet.download_button("Завантажити Parquet", lambda: export_results(file_bytes, "parquet"),
+                                    file_name="collisions_results.parquet", mime="application/octet-stream")
+
+# --- N тіл: моделювання від події до події ---
+# Точкові тіла на відрізку [0, L] між стінками. На прямій тіла не обганяють одне одного,
+# тому зіткнутися можуть лише сусіди (i, i+1) і крайні тіла зі стінками.
+# Черга з пріоритетом (heapq) зберігає час наступного зіткнення кожної пари. Після зіткнення
+# змінюються швидкості лише двох тіл, тож перераховуємо тільки дві сусідні пари.
+# Застарілі події не видаляємо з черги: для кожної пари пам'ятаємо час її актуальної події (due),
+# і подія з іншим часом просто пропускається.
+# Положення тіла зберігається разом із моментом, коли воно востаннє змінювало швидкість,
+# тож між подіями нічого не рухаємо - крок коштує O(log N), а не O(N).
+# Цикл працює зі списками Python, а не з масивами NumPy: для одиночних чисел вони в рази швидші.
+def simulate_line(x0, v0, masses, L, e, t_end, max_events, n_snapshots=400):
+    n = len(x0)
+    x, v, m = list(map(float, x0)), list(map(float, v0)), list(map(float, masses))
+    t_last = [0.0] * n # Момент, до якого x[i] актуальне
+    t_hit = [-np.inf] * n # Час останнього зіткнення між тілами
+    # Код події: пара (i, i+1) має код i, удар тіла 0 об ліву стінку - код -1,
+    # тіла n-1 об праву - код n-1. due[code + 1] - час актуальної події з цим кодом.
+    due = [float("inf")] * (n + 1)
+    heap = []
+    heappush, heappop = heapq.heappush, heapq.heappop
+    INF = float("inf") # Локальна змінна: звернення до np.inf у циклі помітно повільніше
+
+    # Захист від «непружного колапсу»: при e < 1 група тіл може зіткнутися нескінченно
+    # багато разів за скінченний час. Якщо тіло стикалося зовсім нещодавно (за t_c),
+    # зіткнення вважаємо пружним (TC-модель Лудінга - Макнамари).
+    t_c = 1e-9 * L / max(np.abs(v0).max(), 1e-12)
+
+    def schedule(code, now):
+        if code == -1:
+            t_ev = t_last[0] - x[0] / v[0] if v[0] < 0 else INF
+        elif code == n - 1:
+            t_ev = t_last[code] + (L - x[code]) / v[code] if v[code] > 0 else INF
+        else:
+            dv = v[code] - v[code + 1]
+            if dv > 0: # Зближуються
+                gap = (x[code + 1] + v[code + 1] * (now - t_last[code + 1])) - (x[code] + v[code] * (now - t_last[code]))
+                t_ev = now + gap / dv if gap > 0 else now
+            else:
+                t_ev = INF
+        due[code + 1] = t_ev
+        if t_ev < INF:
+            heappush(heap, (t_ev, code))
+
+    for code in range(-1, n):
+        schedule(code, 0.0)
+
+    snap_times = np.linspace(0, t_end, n_snapshots)
+    positions = np.empty((n_snapshots, n))
+    kinetic = np.empty(n_snapshots)
+    m_arr = np.asarray(m)
+    snap = 0
+    n_events = n_wall = 0
+    wall_impulse = 0.0 # Імпульс, переданий стінками (на прямій зі стінками імпульс системи не зберігається)
+    dissipated = 0.0
+
+    # Подія-сторож у нескінченності: черга ніколи не порожня, а решта знімків записується перед нею
+    heappush(heap, (INF, -2))
+    snap_list = snap_times.tolist()
+    next_snap = snap_list[0]
+
+    while True:
+        t, i = heappop(heap)
+        if t > next_snap:
+            # Знімки стану між подіями (подію t ще не застосовано)
+            while snap < n_snapshots and snap_list[snap] <= t:
+                v_arr = np.asarray(v)
+                positions[snap] = np.asarray(x) + v_arr * (snap_list[snap] - np.asarray(t_last))
+                kinetic[snap] = 0.5 * np.sum(m_arr * v_arr**2)
+                snap += 1
+            if snap == n_snapshots:
+                break
+            next_snap = snap_list[snap]
+        if due[i + 1] != t:
+            continue # Застаріла подія
+
+        if i == -1 or i == n - 1:
+            # Пружний удар об стінку
+            j = 0 if i == -1 else n - 1
+            wall_impulse -= 2 * m[j] * v[j]
+            x[j], t_last[j], v[j] = (0.0 if i == -1 else L), t, -v[j]
+            n_wall += 1
+            schedule(i, t)
+            schedule(0 if i == -1 else n - 2, t) # Сусідня пара (при n = 1 - протилежна стінка)
+            continue
+
+        j = i + 1
+        vi, vj, mi, mj = v[i], v[j], m[i], m[j]
+        x[i] = x[j] = x[i] + vi * (t - t_last[i])
+        t_last[i] = t_last[j] = t
+        e_eff = 1.0 if (t - t_hit[i] < t_c or t - t_hit[j] < t_c) else e
+        # Ті самі формули, що й collision_velocities, розписані в циклі:
+        # виклик функції на кожне з 10⁶ зіткнень помітно сповільнює моделювання
+        p, msum = mi * vi + mj * vj, mi + mj
+        ui = (p + mj * e_eff * (vj - vi)) / msum
+        uj = (p + mi * e_eff * (vi - vj)) / msum
+        dissipated += 0.5 * (mi * (vi * vi - ui * ui) + mj * (vj * vj - uj * uj))
+        v[i], v[j] = ui, uj
+        t_hit[i] = t_hit[j] = t
+        n_events += 1
+        if n_events >= max_events:
+            break
+        # Сама пара (i, j) тепер розходиться; нові події - лише для двох сусідніх пар
+        due[i + 1] = INF
+        schedule(i - 1, t)
+        schedule(j, t)
+
+    v_final = np.asarray(v)
+    return {
+        "t": snap_times[:snap],
+        "positions": positions[:snap],
+        "kinetic": kinetic[:snap],
+        "v0": np.asarray(v0, dtype=float),
+        "v": v_final,
+        "n_events": n_events,
+        "n_wall": n_wall,
+        "wall_impulse": wall_impulse,
+        "dissipated": dissipated,
+    }
+
+if page_mode == "N тіл на прямій (події)":
+    st.header("N тіл на прямій: моделювання від зіткнення до зіткнення")
+    rng = np.random.default_rng(int(seed))
+    L_line = float(n_bodies) # В середньому 1 м на тіло
+    x_init = np.sort(rng.uniform(0, L_line, n_bodies))
+    v_init = rng.normal(0, v_spread, n_bodies)
+    if mass_mode == "Однакові (1 кг)":
+        masses = np.ones(n_bodies)
+    elif mass_mode == "Випадкові (0.5–2 кг)":
+        masses = rng.uniform(0.5, 2.0, n_bodies)
+    else:
+        masses = np.where(np.arange(n_bodies) % 2 == 0, 1.0, mass_ratio)
+    st.write(f"Відрізок довжиною {L_line:.0f} м, тіла розміщені випадково. "
+             "Результат залишається на сторінці, доки не зміните параметри.")
+
+    run_params = (n_bodies, mass_mode, mass_ratio if mass_mode == "Чергування m₁ / m₂" else None,
+                  restitution, v_spread, seed, t_run, max_events)
+    if st.button("Запустити моделювання"):
+        with st.spinner("Моделювання..."):
+            t_start = time.perf_counter()
+            result = simulate_line(x_init, v_init, masses, L_line, restitution, t_run, max_events)
+            st.session_state["collision_line"] = (run_params, result, time.perf_counter() - t_start)
+
+    saved = st.session_state.get("collision_line")
+    if saved is not None and saved[0] == run_params:
+        _, result, elapsed = saved
+        t_snap, pos = result["t"], result["positions"]
+        p_initial = np.sum(masses * result["v0"])
+        p_final = np.sum(masses * result["v"])
+        ke_initial = 0.5 * np.sum(masses * result["v0"]**2)
+        ke_final = 0.5 * np.sum(masses * result["v"]**2)
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Зіткнень між тілами", f"{result['n_events']:,}")
+        col2.metric("Ударів об стінки", f"{result['n_wall']:,}")
+        col3.metric("Швидкість", f"{(result['n_events'] + result['n_wall']) / max(elapsed, 1e-9):,.0f} под./с",
+                    help=f"Час розрахунку: {elapsed:.2f} с")
+        if result["n_events"] >= max_events:
+            st.warning(f"Досягнуто ліміт зіткнень: моделювання зупинено на t = {t_snap[-1]:.2f} с "
+                       f"із запланованих {t_run:.0f} с.")
+
+        st.subheader("Перевірка законів збереження")
+        # Стінки змінюють імпульс системи, тому перевіряємо баланс: p(T) - p(0) = імпульс від стінок
+        p_error = abs(p_final - p_initial - result["wall_impulse"]) / max(np.sum(masses * np.abs(result["v0"])), 1e-300)
+        e_error = abs(ke_initial - ke_final - result["dissipated"]) / ke_initial
+        st.info(f"Імпульс: p(0) = {p_initial:.6g} кг·м/с, p(T) = {p_final:.6g} кг·м/с, "
+                f"передано стінками {result['wall_impulse']:.6g} кг·м/с. "
+                f"Відносна похибка балансу: {p_error:.2e}")
+        st.warning(f"Кінетична енергія: E(0) = {ke_initial:.6g} Дж, E(T) = {ke_final:.6g} Дж, "
+                   f"розсіяно при зіткненнях {result['dissipated']:.6g} Дж. "
+                   f"Відносна похибка балансу: {e_error:.2e}")
+
+        # Просторово-часова діаграма: густина всіх тіл + траєкторії кількох окремих тіл
+        hist = np.stack([np.histogram(row, bins=200, range=(0, L_line))[0] for row in pos])
+        x_centers = (np.arange(200) + 0.5) * L_line / 200
+        tracked = np.unique(np.linspace(0, n_bodies - 1, min(n_bodies, 60)).astype(int))
+        # Усі траєкторії - один слід, розділений NaN
+        track_x = np.vstack((pos[:, tracked], np.full(len(tracked), np.nan))).T.ravel()
+        track_t = np.tile(np.append(t_snap, np.nan), len(tracked))
+
+        fig_st = go.Figure()
+        fig_st.add_trace(go.Heatmap(x=x_centers, y=t_snap, z=hist.astype(np.float32), colorscale='Blues',
+                                    colorbar=dict(title="Тіл у біні")))
+        fig_st.add_trace(go.Scattergl(x=track_x, y=track_t, mode='lines', name=f'Траєкторії {len(tracked)} тіл',
+                                      line=dict(color='firebrick', width=1)))
+        fig_st.update_layout(
+            title="Просторово-часова діаграма",
+            xaxis_title="Позиція (x), м",
+            yaxis_title="Час (t), с",
+            height=650,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fig_st, use_container_width=True)
+
+        fig_ke = go.Figure()
+        fig_ke.add_trace(go.Scatter(x=t_snap, y=result["kinetic"], mode='lines', name='E(t)',
+                                    line=dict(color='darkorange', width=2)))
+        fig_ke.update_layout(
+            title="Кінетична енергія системи E(t)",
+            xaxis_title="Час (t), с",
+            yaxis_title="Енергія (E), Дж",
+            yaxis_type="log" if restitution < 1 else "linear"
+        )
+        st.plotly_chart(fig_ke, use_container_width=True)
+
+        fig_v = go.Figure()
+        fig_v.add_trace(go.Histogram(x=result["v0"], name='На початку', opacity=0.6, nbinsx=60))
+        fig_v.add_trace(go.Histogram(x=result["v"], name='В кінці', opacity=0.6, nbinsx=60))
+        fig_v.update_layout(
+            title="Розподіл швидкостей",
+            xaxis_title="Швидкість (v), м/с",
+            yaxis_title="Кількість тіл",
+            barmode='overlay'
+        )
+        st.plotly_chart(fig_v, use_container_width=True)
+        st.caption("Однакові маси при e = 1 лише обмінюються швидкостями, тож розподіл швидкостей не змінюється. "
+                   "Різні маси перемішують швидкості, а при e < 1 система «охолоджується» і утворює скупчення.")
+
+# --- Газ твердих дисків у 2D-коробці ---
+# Однакові пружні диски діаметром 1 і масою 1. Крок за часом dt: диски рухаються прямолінійно,
+# а пари, що перекриваються і зближуються, обмінюються імпульсом уздовж лінії центрів
+# (це 2D-версія формули пружного зіткнення з e = 1). dt вибираємо так, щоб за крок
+# жоден диск не зміщувався більше ніж на 0.1 діаметра - тоді зіткнення не пропускаються.
+#
+# Пошук пар - через список комірок: площина ділиться на комірки зі стороною ≥ діаметра,
+# і диск може торкатися лише дисків у своїй та сусідніх комірках. Диски сортуються за
+# номером комірки, тож вміст комірки - суцільний відрізок масиву. Перевіряємо свою комірку
+# та 4 сусідні «половини оболонки» (решта 4 перевіряються з іншого боку) - O(N) замість O(N²).
+# У комірці з твердими дисками помістяться лише кілька дисків, тому перебір усередині
+# комірки - короткий цикл по k, а все інше векторизовано.
+HALF_SHELL = ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+def find_contacts(pos, box, n_cells):
+    cell = box / n_cells
+    cx = np.minimum((pos[:, 0] / cell).astype(np.int64), n_cells - 1)
+    cy = np.minimum((pos[:, 1] / cell).astype(np.int64), n_cells - 1)
+    cid = cy * n_cells + cx
+    order = np.argsort(cid, kind="stable")
+    counts = np.bincount(cid, minlength=n_cells * n_cells)
+    starts = np.cumsum(counts) - counts
+    max_occ = counts.max()
+    cx, cy = cx[order], cy[order]
+    rank = np.arange(order.size)
+
+    pairs_i, pairs_j = [], []
+    for dx, dy in HALF_SHELL:
+        nx, ny = cx + dx, cy + dy
+        inside = (nx >= 0) & (nx < n_cells) & (ny < n_cells)
+        ncid = np.where(inside, ny * n_cells + nx, 0)
+        first, count = starts[ncid], np.where(inside, counts[ncid], 0)
+        for k in range(max_occ):
+            has = k < count
+            if (dx, dy) == (0, 0):
+                has &= first + k > rank # У своїй комірці кожну пару беремо один раз
+            src = np.flatnonzero(has)
+            pairs_i.append(src)
+            pairs_j.append(first[src] + k)
+    I, J = order[np.concatenate(pairs_i)], order[np.concatenate(pairs_j)]
+    d = pos[J] - pos[I]
+    close = np.einsum("ij,ij->i", d, d) < 1.0
+    return I[close], J[close]
+
+def resolve_contacts(pos, vel, I, J):
+    # Пружний обмін імпульсом для пар, що зближуються. Якщо диск торкається кількох
+    # сусідів, пари обробляються раундами, у кожному - не більше однієї пари на диск:
+    # так кожен обмін - точне двотільне зіткнення і енергія зберігається до округлення.
+    n_collisions = 0
+    while I.size:
+        r = pos[J] - pos[I]
+        b = np.einsum("ij,ij->i", vel[J] - vel[I], r)
+        approaching = b < 0
+        I, J, r, b = I[approaching], J[approaching], r[approaching], b[approaching]
+        if not I.size:
+            break
+        pair = np.arange(I.size)
+        owner = np.full(vel.shape[0], I.size)
+        np.minimum.at(owner, I, pair)
+        np.minimum.at(owner, J, pair)
+        free = (owner[I] == pair) & (owner[J] == pair)
+        dv = (b[free] / np.einsum("ij,ij->i", r[free], r[free]))[:, None] * r[free]
+        vel[I[free]] += dv
+        vel[J[free]] -= dv
+        n_collisions += int(free.sum())
+        I, J = I[~free], J[~free]
+    return n_collisions
+
+def disk_gas_frames(n_disks, packing, start_mode, seed, n_frames, steps_per_frame, max_points=20000):
+    # Генератор кадрів: стан зберігається лише поточний, а назовні віддаються компактні
+    # масиви float32 (вибірка до max_points дисків) і гістограма модулів швидкості.
+    rng = np.random.default_rng(seed)
+    box = np.sqrt(n_disks * np.pi * 0.25 / packing)
+    n_cells = max(1, int(box)) # Сторона комірки box/n_cells ≥ 1 (діаметр)
+
+    # Старт на ґратці зі зсувом - без перекриттів
+    side = int(np.ceil(np.sqrt(n_disks)))
+    spacing = (box - 1) / side
+    grid = (np.stack(np.divmod(rng.permutation(side * side)[:n_disks], side), axis=1) + 0.5) * spacing + 0.5
+    pos = grid + rng.uniform(-1, 1, (n_disks, 2)) * max(0.0, (spacing - 1) / 2)
+    if start_mode == "Усі рухаються вздовж x":
+        vel = np.column_stack((rng.choice([-1.0, 1.0], n_disks), np.zeros(n_disks)))
+    else:
+        angle = rng.uniform(0, 2 * np.pi, n_disks)
+        vel = np.column_stack((np.cos(angle), np.sin(angle)))
+    shown = np.sort(rng.choice(n_disks, min(n_disks, max_points), replace=False))
+
+    # Модуль швидкості при сталій енергії обмежений √(2E/m), тож гістограма має фіксовані межі
+    energy = 0.5 * np.sum(vel**2)
+    v_edges = np.linspace(0, min(np.sqrt(2 * energy), 5 * np.sqrt(energy / n_disks)), 61)
+    t, n_collisions = 0.0, 0
+    for frame in range(n_frames + 1):
+        if frame:
+            for _ in range(steps_per_frame):
+                dt = 0.1 / np.sqrt(np.max(np.einsum("ij,ij->i", vel, vel)))
+                pos += vel * dt
+                t += dt
+                # Пружні стінки
+                for axis in (0, 1):
+                    hit = ((pos[:, axis] < 0.5) & (vel[:, axis] < 0)) | ((pos[:, axis] > box - 0.5) & (vel[:, axis] > 0))
+                    vel[hit, axis] *= -1
+                I, J = find_contacts(pos, box, n_cells)
+                n_collisions += resolve_contacts(pos, vel, I, J)
+        speed = np.sqrt(np.einsum("ij,ij->i", vel, vel))
+        v2 = np.mean(speed**2)
+        yield {
+            "t": t,
+            "box": box,
+            "x": pos[shown, 0].astype(np.float32),
+            "y": pos[shown, 1].astype(np.float32),
+            "hist": np.histogram(speed, bins=v_edges)[0],
+            "v_edges": v_edges,
+            "v2": v2,
+            "kurtosis": np.mean(speed**4) / v2**2, # Для 2D-розподілу Максвелла = 2
+            "energy": 0.5 * np.sum(speed**2),
+            "n_collisions": n_collisions,
+        }
+
+def disk_figures(frame):
+    # Один слід Scattergl на всі диски (float32 передаються у браузер у двійковому вигляді)
+    fig_box = go.Figure(go.Scattergl(x=frame["x"], y=frame["y"], mode='markers',
+                                     marker=dict(size=3, color='royalblue')))
+    fig_box.update_layout(
+        title=f"Диски в коробці, t = {frame['t']:.2f}",
+        xaxis=dict(range=[0, frame["box"]], title="x"),
+        yaxis=dict(range=[0, frame["box"]], title="y", scaleanchor="x", scaleratio=1),
+        height=500, margin=dict(t=40)
+    )
+
+    # Гістограма вже порахована в NumPy; поряд - 2D-розподіл Максвелла з тією ж енергією
+    edges = frame["v_edges"]
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    density = frame["hist"] / (frame["hist"].sum() * np.diff(edges))
+    sigma2 = frame["v2"] / 2 # kT/m: у 2D <v²> = 2kT/m
+    v_fine = np.linspace(0, edges[-1], 300)
+    fig_hist = go.Figure()
+    fig_hist.add_trace(go.Bar(x=centers, y=density, width=np.diff(edges), name='Моделювання',
+                              marker_color='lightslategray'))
+    fig_hist.add_trace(go.Scatter(x=v_fine, y=v_fine / sigma2 * np.exp(-v_fine**2 / (2 * sigma2)), mode='lines',
+                                  name='Максвелл (2D)', line=dict(color='red', width=2)))
+    fig_hist.update_layout(
+        title="Розподіл модулів швидкості",
+        xaxis_title="|v|",
+        yaxis_title="Густина ймовірності",
+        height=500, margin=dict(t=40),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig_box, fig_hist
+
+if page_mode == "Газ твердих дисків (2D)":
+    st.header("Газ твердих дисків у 2D-коробці")
+    st.write("Пружні диски діаметром 1 і масою 1 (безрозмірні одиниці). Кадри показуються по мірі розрахунку; "
+             "результат залишається на сторінці, доки не зміните параметри.")
+
+    run_params = (n_disks, packing, start_mode, seed, n_frames, steps_per_frame)
+    if st.button("Запустити моделювання"):
+        progress = st.progress(0.0, text="Розрахунок...")
+        col_box, col_hist = st.columns(2)
+        box_slot, hist_slot = col_box.empty(), col_hist.empty()
+        history = []
+        t_start = time.perf_counter()
+        for i, frame in enumerate(disk_gas_frames(n_disks, packing, start_mode, int(seed), n_frames, steps_per_frame)):
+            history.append((frame["t"], frame["kurtosis"], frame["energy"], frame["n_collisions"]))
+            fig_box, fig_hist = disk_figures(frame)
+            box_slot.plotly_chart(fig_box, use_container_width=True, key=f"gas_box_{i}")
+            hist_slot.plotly_chart(fig_hist, use_container_width=True, key=f"gas_hist_{i}")
+            progress.progress(i / n_frames, text=f"Кадр {i} з {n_frames}, t = {frame['t']:.2f}")
+        progress.empty()
+        box_slot.empty()
+        hist_slot.empty()
+        st.session_state["collision_gas"] = (run_params, frame, np.array(history), time.perf_counter() - t_start)
+
+    saved = st.session_state.get("collision_gas")
+    if saved is not None and saved[0] == run_params:
+        _, frame, history, elapsed = saved
+        t_hist, kurtosis, energy, collisions = history.T
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Зіткнень", f"{int(collisions[-1]):,}",
+                    help=f"У середньому {2 * collisions[-1] / n_disks:.1f} на диск")
+        col2.metric("⟨v⁴⟩ / ⟨v²⟩²", f"{kurtosis[-1]:.3f}", help="Для 2D-розподілу Максвелла дорівнює 2")
+        col3.metric("Кадрів за секунду", f"{len(history) / elapsed:.1f}",
+                    help=f"Час розрахунку: {elapsed:.1f} с, {steps_per_frame} кроків на кадр")
+        st.info(f"Енергія: E(0) = {energy[0]:.6g}, E(T) = {energy[-1]:.6g}, "
+                f"відносна зміна {abs(energy[-1] - energy[0]) / energy[0]:.2e}. "
+                "Кожне зіткнення - точний пружний обмін, тож енергія зберігається до похибки округлення.")
+
+        fig_box, fig_hist = disk_figures(frame)
+        col_box, col_hist = st.columns(2)
+        col_box.plotly_chart(fig_box, use_container_width=True)
+        col_hist.plotly_chart(fig_hist, use_container_width=True)
+
+        fig_relax = go.Figure()
+        fig_relax.add_trace(go.Scatter(x=t_hist, y=kurtosis, mode='lines+markers', name='Моделювання',
+                                       line=dict(color='royalblue')))
+        fig_relax.add_hline(y=2.0, line_dash="dash", line_color="red", annotation_text="Максвелл (2D)")
+        fig_relax.update_layout(
+            title="Релаксація до рівноваги: ⟨v⁴⟩ / ⟨v²⟩²",
+            xaxis_title="Час (t)",
+            yaxis_title="⟨v⁴⟩ / ⟨v²⟩²"
+        )
+        st.plotly_chart(fig_relax, use_container_width=True)
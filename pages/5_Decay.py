@@ -1,48 +1,744 @@
 import streamlit as st
 import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from scipy.optimize import minimize
+from math import lgamma
+import io
 
 st.title("☢️ Калькулятор радіоактивного розпаду")
-st.write("Розраховує кількість речовини та активність, що залишились.")
+st.write("Розраховує кількість речовини та активність, що залишились, для одного нукліда та для цілих рядів розпаду.")
 
-st.info("Переконайтеся, що 'Період напіврозпаду' і 'Час, що минув' в однакових одиницях (напр., обидва в роках або обидва в секундах).")
+# --- Бічна панель ---
+st.sidebar.header("Режим")
+page_mode = st.sidebar.radio(
+    "Що розраховуємо",
+    ("Один нуклід", "Ряд розпаду (рівняння Бейтмана)", "Статистика розпаду (Монте-Карло)",
+     "Апроксимація вимірювань"),
+    help="Ряд розпаду: усі дочірні нукліди з розгалуженнями, активності та вікова рівновага. "
+         "Монте-Карло: випадковий процес розпаду в багатьох незалежних реалізаціях і статистика відліків. "
+         "Апроксимація: період напіврозпаду з журналу лічильника методом максимальної правдоподібності."
+)
 
-# --- Введення даних ---
-col1, col2 = st.columns(2)
-n0 = col1.number_input("Початкова кількість ядер (N₀)", min_value=1.0, value=1e20, format="%e")
-t_half = col2.number_input("Період напіврозпаду (T₁/₂)", min_value=0.001, value=10.0)
-t = st.number_input("Час, що минув (t)", min_value=0.0, value=5.0)
+if page_mode == "Ряд розпаду (рівняння Бейтмана)":
+    st.sidebar.header("Ряд розпаду")
+    chain_name = st.sidebar.selectbox("Ряд", ("Уран-238 (ряд радію)", "Торій-232", "Власний ланцюжок"))
+    n0_chain = st.sidebar.number_input("Початкова кількість ядер материнського нукліда (N₀)",
+                                       min_value=1.0, value=1e20, format="%e")
+    log_t_range = st.sidebar.slider("Діапазон часу, lg(t / рік)", -16.0, 12.0, (-14.0, 11.0), 0.5,
+                                    help="Логарифмічна шкала: -14 ≈ 0.3 мкс, 11 - сто мільярдів років.")
+    n_t_chain = st.sidebar.select_slider("Точок за часом", options=[500, 1000, 2000, 5000, 10000], value=2000)
+    eq_tol = st.sidebar.slider("Допуск вікової рівноваги, %", 0.1, 10.0, 1.0, 0.1,
+                               help="Нуклід у рівновазі, якщо його активність відрізняється від активності "
+                                    "материнського (з урахуванням розгалуження) не більше ніж на допуск.")
+elif page_mode == "Статистика розпаду (Монте-Карло)":
+    st.sidebar.header("Зразок")
+    n0_mc = st.sidebar.number_input("Початкова кількість ядер (N₀)", min_value=1.0, max_value=1e24,
+                                    value=1000.0, format="%e")
+    t_half_mc = st.sidebar.number_input("Період напіврозпаду (T₁/₂)", min_value=0.001, value=10.0,
+                                        help="У довільних одиницях часу; усі часи на графіках - у тих самих одиницях.")
+    t_end_halves = st.sidebar.slider("Тривалість, періодів напіврозпаду", 0.5, 20.0, 5.0, 0.5)
+    efficiency = st.sidebar.slider("Ефективність детектора (ε)", 0.01, 1.0, 1.0, 0.01,
+                                   help="Кожен розпад реєструється з імовірністю ε.")
+
+    st.sidebar.header("Моделювання")
+    n_real = st.sidebar.select_slider("Кількість реалізацій", options=[10, 100, 1000, 10000], value=1000)
+    n_bins_mc = st.sidebar.select_slider("Інтервалів часу", options=[20, 50, 100, 200, 500], value=100)
+    mc_method = st.sidebar.radio(
+        "Метод",
+        ("Автоматично", "Точний (час розпаду кожного ядра)", "Біноміальні кроки (tau-leaping)"),
+        help="Точний метод розігрує час розпаду кожного ядра - лише для малих N₀. "
+             "Біноміальні кроки розігрують кількість розпадів за інтервал одним числом, "
+             "тож N₀ = 10²⁰ не вимагає 10²⁰ випадкових чисел."
+    )
+    seed_mc = st.sidebar.number_input("Зерно генератора", min_value=0, value=0, step=1)
+elif page_mode == "Апроксимація вимірювань":
+    st.sidebar.header("Дані")
+    data_source = st.sidebar.radio("Джерело", ("Завантажити журнал (CSV)", "Синтетичний приклад"))
+    dt_default = st.sidebar.number_input("Ширина інтервалу, с", min_value=1e-6, value=1.0, format="%g",
+                                         help="Використовується, якщо у файлі лише стовпець відліків.")
+    st.sidebar.header("Модель")
+    n_components = st.sidebar.radio("Кількість компонент", (1, 2),
+                                    help="Дві компоненти - суміш двох нуклідів з різними T½.")
+    with_background = st.sidebar.checkbox("Сталий фон", value=True)
 
 # --- Розрахункова частина ---
-if t_half > 0:
-    # 1. Знаходимо сталу розпаду (lambda)
-    lambda_const = np.log(2) / t_half
+
+if page_mode == "Один нуклід":
+    st.info("Переконайтеся, що 'Період напіврозпаду' і 'Час, що минув' в однакових одиницях (напр., обидва в роках або обидва в секундах).")
+
+    # --- Введення даних ---
+    col1, col2 = st.columns(2)
+    n0 = col1.number_input("Початкова кількість ядер (N₀)", min_value=1.0, value=1e20, format="%e")
+    t_half = col2.number_input("Період напіврозпаду (T₁/₂)", min_value=0.001, value=10.0)
+    t = st.number_input("Час, що минув (t)", min_value=0.0, value=5.0)
+
+    # --- Розрахункова частина ---
+    if t_half > 0:
+        # 1. Знаходимо сталу розпаду (lambda)
+        lambda_const = np.log(2) / t_half
     
-    # 2. Знаходимо кількість ядер, що залишились (N(t))
-    # N(t) = N₀ * e^(-λ * t)
-    n_t = n0 * np.exp(-lambda_const * t)
+        # 2. Знаходимо кількість ядер, що залишились (N(t))
+        # N(t) = N₀ * e^(-λ * t)
+        n_t = n0 * np.exp(-lambda_const * t)
     
-    # 3. Знаходимо початкову активність (A₀)
-    # A(t) = λ * N(t)
-    a0 = lambda_const * n0
+        # 3. Знаходимо початкову активність (A₀)
+        # A(t) = λ * N(t)
+        a0 = lambda_const * n0
     
-    # 4. Знаходимо кінцеву активність (A(t))
-    a_t = lambda_const * n_t
+        # 4. Знаходимо кінцеву активність (A(t))
+        a_t = lambda_const * n_t
 
-    st.header("Результати розрахунку")
+        st.header("Результати розрахунку")
     
-    col_res1, col_res2 = st.columns(2)
-    col_res1.metric("Ядер залишилось (N(t))", f"{n_t:.3e} ядер")
-    col_res2.metric("Ядер розпалось", f"{n0 - n_t:.3e} ядер")
+        col_res1, col_res2 = st.columns(2)
+        col_res1.metric("Ядер залишилось (N(t))", f"{n_t:.3e} ядер")
+        col_res2.metric("Ядер розпалось", f"{n0 - n_t:.3e} ядер")
     
-    st.divider()
+        st.divider()
 
-    col_res3, col_res4 = st.columns(2)
-    col_res3.metric("Початкова активність (A₀)", f"{a0:.3e} Бк (розпадів/одиницю часу)")
-    col_res4.metric("Кінцева активність (A(t))", f"{a_t:.3e} Бк (розпадів/одиницю часу)")
+        col_res3, col_res4 = st.columns(2)
+        col_res3.metric("Початкова активність (A₀)", f"{a0:.3e} Бк (розпадів/одиницю часу)")
+        col_res4.metric("Кінцева активність (A(t))", f"{a_t:.3e} Бк (розпадів/одиницю часу)")
     
-    st.subheader("Додаткові параметри")
-    st.latex(f"\\lambda = \\frac{{\\ln(2)}}{{T_{{1/2}}}} = \\frac{{0.693}}{{{t_half:.2f}}} \\approx {lambda_const:.3e} \\text{{ (одиниць часу) }}^{{-1}}")
-    st.latex(f"N(t) = N_0 \\cdot e^{{-\\lambda t}} = {n0:.2e} \\cdot e^{{-{lambda_const:.2e} \\cdot {t:.2f}}}")
+        st.subheader("Додаткові параметри")
+        st.latex(f"\\lambda = \\frac{{\\ln(2)}}{{T_{{1/2}}}} = \\frac{{0.693}}{{{t_half:.2f}}} \\approx {lambda_const:.3e} \\text{{ (одиниць часу) }}^{{-1}}")
+        st.latex(f"N(t) = N_0 \\cdot e^{{-\\lambda t}} = {n0:.2e} \\cdot e^{{-{lambda_const:.2e} \\cdot {t:.2f}}}")
+
+    else:
+        st.error("Період напіврозпаду має бути > 0")
+
+# --- Ряди розпаду ---
+# Нукліди в топологічному порядку: (назва, T½ у секундах, ((материнський, частка гілки), ...)).
+# T½ = 0 - стабільний нуклід. Розгалуження з часткою < 0.1% (крім Bi-214 → Tl-210) опущено.
+SECOND, MINUTE, HOUR, DAY, YEAR = 1.0, 60.0, 3600.0, 86400.0, 365.25 * 86400.0
+
+DECAY_CHAINS = {
+    "Уран-238 (ряд радію)": (
+        ("U-238", 4.468e9 * YEAR, ()),
+        ("Th-234", 24.10 * DAY, (("U-238", 1.0),)),
+        ("Pa-234m", 1.159 * MINUTE, (("Th-234", 1.0),)),
+        ("U-234", 2.455e5 * YEAR, (("Pa-234m", 1.0),)),
+        ("Th-230", 7.538e4 * YEAR, (("U-234", 1.0),)),
+        ("Ra-226", 1600 * YEAR, (("Th-230", 1.0),)),
+        ("Rn-222", 3.8235 * DAY, (("Ra-226", 1.0),)),
+        ("Po-218", 3.098 * MINUTE, (("Rn-222", 1.0),)),
+        ("Pb-214", 26.8 * MINUTE, (("Po-218", 1.0),)),
+        ("Bi-214", 19.9 * MINUTE, (("Pb-214", 1.0),)),
+        ("Po-214", 164.3e-6 * SECOND, (("Bi-214", 0.99979),)),
+        ("Tl-210", 1.30 * MINUTE, (("Bi-214", 0.00021),)),
+        ("Pb-210", 22.2 * YEAR, (("Po-214", 1.0), ("Tl-210", 1.0))),
+        ("Bi-210", 5.012 * DAY, (("Pb-210", 1.0),)),
+        ("Po-210", 138.376 * DAY, (("Bi-210", 1.0),)),
+        ("Pb-206", 0.0, (("Po-210", 1.0),)),
+    ),
+    "Торій-232": (
+        ("Th-232", 1.405e10 * YEAR, ()),
+        ("Ra-228", 5.75 * YEAR, (("Th-232", 1.0),)),
+        ("Ac-228", 6.15 * HOUR, (("Ra-228", 1.0),)),
+        ("Th-228", 1.9116 * YEAR, (("Ac-228", 1.0),)),
+        ("Ra-224", 3.6319 * DAY, (("Th-228", 1.0),)),
+        ("Rn-220", 55.6 * SECOND, (("Ra-224", 1.0),)),
+        ("Po-216", 0.145 * SECOND, (("Rn-220", 1.0),)),
+        ("Pb-212", 10.64 * HOUR, (("Po-216", 1.0),)),
+        ("Bi-212", 60.55 * MINUTE, (("Pb-212", 1.0),)),
+        ("Po-212", 0.299e-6 * SECOND, (("Bi-212", 0.6406),)),
+        ("Tl-208", 3.053 * MINUTE, (("Bi-212", 0.3594),)),
+        ("Pb-208", 0.0, (("Po-212", 1.0), ("Tl-208", 1.0))),
+    ),
+}
+TIME_UNITS = {"с": SECOND, "хв": MINUTE, "год": HOUR, "діб": DAY, "років": YEAR}
+
+def format_duration(seconds):
+    if seconds == 0:
+        return "стабільний"
+    for unit, scale in (("років", YEAR), ("діб", DAY), ("год", HOUR), ("хв", MINUTE), ("с", SECOND)):
+        if seconds >= scale:
+            return f"{seconds / scale:.4g} {unit}"
+    return f"{seconds * 1e6:.4g} мкс"
+
+def decay_paths(chain):
+    # Усі шляхи від материнського нукліда (перший у списку) до кожного члена ряду:
+    # {індекс: [((індекс, частка гілки), ...), ...]}. Ряди - ациклічні графи з кількома гілками.
+    index = {name: i for i, (name, _, _) in enumerate(chain)}
+    paths = {0: [((0, 1.0),)]}
+    for k, (_, _, parents) in enumerate(chain[1:], start=1):
+        paths[k] = [path + ((k, branch),) for parent, branch in parents for path in paths[index[parent]]]
+    return paths
+
+# Розв'язок рівнянь Бейтмана. Уздовж одного шляху 1 → 2 → ... → d
+#   N_d(t) = N₀ · Π b_i λ_i t · exp[x_1, ..., x_d],   x_i = -λ_i t,
+# де exp[...] - розділена різниця експоненти. Формула Бейтмана у вигляді суми
+# Σ c_i e^(-λ_i t), як і розклад за власними векторами матриці розпаду чи звичайна expm,
+# втрачає всю точність, коли T½ відрізняються на 20 порядків: малі N_d виходять різницею
+# величезних доданків. Розділені різниці експоненти додатні й рахуються без такого віднімання:
+#  - вузли, розкид яких < 1, - рядом Тейлора навколо найменшого вузла (усі доданки додатні);
+#  - ширший розкид - рекурсією f[x_i..x_j] = (f[x_i+1..x_j] - f[x_i..x_j-1]) / (x_j - x_i), де
+#    віднімання безпечне, бо f[x_i..x_j-1] ≤ e^(-1)·f[x_i+1..x_j].
+# Усе в логарифмах (добутки λt до 10²¹ у степені 15 переповнили б float) і одразу для всіх t.
+def log_exp_divided_difference(x, n_terms=30):
+    # x: (d, n_t), вузли відсортовані за зростанням уздовж осі 0
+    d, n_t = x.shape
+    log_fact = np.array([lgamma(n + 1) for n in range(n_terms + d + 1)])
+    table = [[None] * d for _ in range(d)] # table[i][j] = ln f[x_i..x_j]
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for i in range(d):
+            # h_m(y_i..y_j) - повні однорідні симетричні многочлени, y = x - x_i ≥ 0
+            h = np.zeros((n_terms + 1, n_t))
+            h[0] = 1.0
+            for j in range(i, d):
+                y = np.minimum(x[j] - x[i], 2.0) # Ряд потрібен лише при розкиді < 1
+                for m in range(1, n_terms + 1):
+                    h[m] = (h[m] if j > i else 0.0) + y * h[m - 1]
+                series = np.exp(-log_fact[j - i:j - i + n_terms + 1]) @ h
+                table[i][j] = x[i] + np.log(series)
+        for span in range(1, d):
+            for i in range(d - span):
+                j = i + span
+                spread = x[j] - x[i]
+                wide = spread >= 1.0
+                if wide.any():
+                    hi, lo = table[i + 1][j], table[i][j - 1]
+                    recursion = hi + np.log1p(-np.exp(lo - hi)) - np.log(spread)
+                    table[i][j] = np.where(wide, recursion, table[i][j])
+    return table[0][d - 1]
+
+@st.cache_data(ttl=3600, max_entries=20)
+def bateman_solution(chain, n0, t):
+    lam = np.array([np.log(2) / half_life if half_life > 0 else 0.0 for _, half_life, _ in chain])
+    amounts = np.zeros((len(chain), t.size))
+    with np.errstate(divide="ignore"):
+        log_t = np.log(t)
+        for k, paths in decay_paths(chain).items():
+            for path in paths:
+                nodes = np.array([i for i, _ in path])
+                x = -np.outer(np.sort(lam[nodes])[::-1], t) # За зростанням x = -λt
+                log_prefactor = sum(np.log(branch * lam[prev]) + log_t
+                                    for (prev, _), (_, branch) in zip(path[:-1], path[1:]))
+                amounts[k] += np.exp(np.log(n0) + log_prefactor + log_exp_divided_difference(x))
+    return lam, amounts
+
+def branching_fractions(chain):
+    # Частка розпадів материнського нукліда, що доходить до кожного члена ряду
+    return np.array([sum(np.prod([b for _, b in path]) for path in paths)
+                     for _, paths in sorted(decay_paths(chain).items())])
+
+def equilibrium_onset(t, ratio, tol):
+    # Момент, після якого відношення активностей назавжди (до кінця сітки) в межах 1 ± tol.
+    # Точки, де материнський нуклід уже повністю розпався (ratio = nan/inf), не враховуємо.
+    outside = np.flatnonzero(np.isfinite(ratio) & (np.abs(ratio - 1) > tol))
+    if outside.size == 0:
+        return t[0]
+    return t[outside[-1] + 1] if outside[-1] + 1 < t.size else None
+
+if page_mode == "Ряд розпаду (рівняння Бейтмана)":
+    st.header(f"Ряд розпаду: {chain_name}")
+
+    if chain_name == "Власний ланцюжок":
+        st.write("Нукліди - в порядку розпаду: материнський має стояти вище за дочірній. "
+                 "Перший рядок - початковий нуклід; T½ = 0 означає стабільний нуклід. "
+                 "Для розгалуження додайте кілька рядків з одним материнським нуклідом.")
+        custom = st.data_editor(
+            pd.DataFrame({
+                "Нуклід": ["A", "B", "C", "D"],
+                "T½": [1e6, 10.0, 1.0, 0.0],
+                "Одиниці": ["років", "діб", "с", "с"],
+                "Материнський": ["", "A", "B", "C"],
+                "Частка гілки": [1.0, 1.0, 1.0, 1.0],
+            }),
+            num_rows="dynamic", use_container_width=True,
+            column_config={"Одиниці": st.column_config.SelectboxColumn(options=list(TIME_UNITS))},
+        )
+        custom = custom.dropna(subset=["Нуклід", "T½"])
+        names = [str(name).strip() for name in custom["Нуклід"]]
+        chain = tuple(
+            (name, float(half_life) * TIME_UNITS.get(unit, YEAR),
+             ((str(parent).strip(), float(branch)),) if i > 0 else ())
+            for i, (name, half_life, unit, parent, branch) in enumerate(zip(
+                names, custom["T½"], custom["Одиниці"], custom["Материнський"].fillna(""),
+                custom["Частка гілки"].fillna(1.0)))
+        )
+        # Рядки з однаковою назвою - це кілька материнських нуклідів одного дочірнього (напр. Pb-210)
+        merged = {}
+        for name, half_life, parents in chain:
+            old = merged.get(name)
+            merged[name] = (name, half_life, (old[2] if old else ()) + parents)
+        chain = tuple(merged.values())
+        problems = [f"{name}: материнський нуклід «{parent}» не стоїть вище в таблиці"
+                    for i, (name, _, parents) in enumerate(chain) for parent, _ in parents
+                    if parent not in [c[0] for c in chain[:i]]]
+        problems += [f"{name}: T½ не може бути від'ємним" for name, half_life, _ in chain if half_life < 0]
+        if len(chain) < 2 or chain[0][1] <= 0:
+            problems.append("Потрібно щонайменше два нукліди, і перший має бути радіоактивним (T½ > 0).")
+        if problems:
+            st.error("Ланцюжок задано некоректно:\n\n" + "\n\n".join(problems))
+            st.stop()
+    else:
+        chain = DECAY_CHAINS[chain_name]
+
+    t_years = np.logspace(log_t_range[0], log_t_range[1], n_t_chain)
+    lam, amounts = bateman_solution(chain, n0_chain, t_years * YEAR)
+    activity = lam[:, None] * amounts
+    fractions = branching_fractions(chain)
+    names = [name for name, _, _ in chain]
+    radioactive = lam > 0
+
+    # Відношення активності до активності материнського нукліда з урахуванням гілок: у віковій рівновазі = 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eq_ratio = activity / (fractions[:, None] * activity[0])
+    onsets = [equilibrium_onset(t_years, eq_ratio[k], eq_tol / 100) if radioactive[k] and k > 0 else None
+              for k in range(len(chain))]
+    members = [k for k in range(1, len(chain)) if radioactive[k]]
+    chain_onset = (max(onsets[k] for k in members)
+                   if members and all(onsets[k] is not None for k in members) else None)
+
+    half_lives = np.array([half_life for _, half_life, _ in chain])
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Нуклідів у ряду", len(chain))
+    col2.metric("Розкид T½", f"{np.log10(half_lives[radioactive].max() / half_lives[radioactive].min()):.1f} порядків")
+    col3.metric("Весь ряд у віковій рівновазі",
+                format_duration(chain_onset * YEAR) if chain_onset is not None else "не досягнуто",
+                help="Від цього моменту активність кожного радіоактивного члена ряду дорівнює "
+                     "активності материнського нукліда (помноженій на частку гілки) з точністю до допуску.")
+
+    st.dataframe(pd.DataFrame({
+        "Нуклід": names,
+        "T½": [format_duration(h) for h in half_lives],
+        "λ, 1/с": lam,
+        "Частка гілки": fractions,
+        "Рівновага з": [format_duration(o * YEAR) if o is not None else "—" for o in onsets],
+        "N / N₀ в кінці": amounts[:, -1] / n0_chain,
+        "A в кінці, Бк": activity[:, -1],
+    }), use_container_width=True, hide_index=True)
+
+    fig_n = go.Figure()
+    for k, name in enumerate(names):
+        fig_n.add_trace(go.Scattergl(x=t_years, y=np.where(amounts[k] > 0, amounts[k] / n0_chain, np.nan),
+                                     mode='lines', name=name))
+    fig_n.update_layout(
+        title="Кількість ядер кожного члена ряду N(t) / N₀",
+        xaxis=dict(title="Час (t), роки", type="log", exponentformat="power"),
+        yaxis=dict(title="N / N₀", type="log", exponentformat="power")
+    )
+    st.plotly_chart(fig_n, use_container_width=True)
+
+    fig_a = go.Figure()
+    for k in np.flatnonzero(radioactive):
+        fig_a.add_trace(go.Scattergl(x=t_years, y=np.where(activity[k] > 0, activity[k], np.nan),
+                                     mode='lines', name=names[k]))
+    fig_a.update_layout(
+        title="Активність кожного члена ряду A(t) = λN(t)",
+        xaxis=dict(title="Час (t), роки", type="log", exponentformat="power"),
+        yaxis=dict(title="Активність (A), Бк", type="log", exponentformat="power")
+    )
+    st.plotly_chart(fig_a, use_container_width=True)
+
+    fig_eq = go.Figure()
+    for k in members:
+        fig_eq.add_trace(go.Scattergl(x=t_years, y=eq_ratio[k], mode='lines', name=names[k]))
+    fig_eq.add_hrect(y0=1 - eq_tol / 100, y1=1 + eq_tol / 100, fillcolor="green", opacity=0.2, line_width=0)
+    fig_eq.update_layout(
+        title=f"Відношення A / (b·A_{names[0]}): вікова рівновага - коли крива в зеленій смузі",
+        xaxis=dict(title="Час (t), роки", type="log", exponentformat="power"),
+        yaxis=dict(title="A / (b·A₀)", range=[0, 1.5])
+    )
+    st.plotly_chart(fig_eq, use_container_width=True)
+    st.info("Розв'язок точний (рівняння Бейтмана через розділені різниці експоненти) і зберігає "
+            "відносну точність навіть для нуклідів, кількість яких у 10²⁰⁰ разів менша за N₀.")
+
+# --- Монте-Карло: розпад як випадковий процес ---
+# Кожне ядро розпадається незалежно з імовірністю p = 1 - e^(-λΔt) за інтервал Δt.
+# Малі N₀: розігруємо час розпаду кожного ядра (експоненційний розподіл) і рахуємо розпади в інтервалах.
+# Великі N₀: кількість розпадів за інтервал - одне біноміальне число Bin(N, p) (точно для чистого розпаду);
+# за N > 2⁶² (межа цілих NumPy) - нормальне наближення з тими ж середнім і дисперсією.
+# Усі реалізації рахуються разом: стан - масив N розміром «кількість реалізацій».
+EXACT_DRAWS_LIMIT = 2 * 10**7
+BINOMIAL_N_LIMIT = 2.0**62
+
+def sample_binomial(rng, n, p):
+    # Bin(n, p) для масиву n (float, може перевищувати межу int64)
+    k = np.zeros_like(n)
+    small = n < BINOMIAL_N_LIMIT
+    k[small] = rng.binomial(n[small].astype(np.int64), p)
+    if not small.all():
+        mean = n[~small] * p
+        k[~small] = np.clip(np.round(rng.normal(mean, np.sqrt(mean * (1 - p)))), 0, n[~small])
+    return k
+
+@st.cache_data(ttl=3600, max_entries=4)
+def decay_monte_carlo(n0, lam, t_end, n_bins, n_real, method, efficiency, seed):
+    rng = np.random.default_rng(seed)
+    edges = np.linspace(0, t_end, n_bins + 1)
+    if method == "Точний (час розпаду кожного ядра)":
+        n0_int = int(round(n0))
+        decays = np.zeros((n_real, n_bins))
+        # Порціями реалізацій, щоб не тримати в пам'яті всі часи розпаду одночасно
+        chunk = max(1, EXACT_DRAWS_LIMIT // (4 * n0_int))
+        for start in range(0, n_real, chunk):
+            rows = min(chunk, n_real - start)
+            times = rng.exponential(1 / lam, (rows, n0_int))
+            bins = np.minimum((times / (t_end / n_bins)).astype(np.int64), n_bins) # n_bins - «після t_end»
+            flat = (np.arange(rows)[:, None] * (n_bins + 1) + bins).ravel()
+            decays[start:start + rows] = np.bincount(flat, minlength=rows * (n_bins + 1)).reshape(rows, -1)[:, :n_bins]
+        draws = n_real * n0_int
+    else:
+        p = -np.expm1(-lam * t_end / n_bins)
+        survivors = np.full(n_real, float(n0))
+        decays = np.empty((n_real, n_bins))
+        for j in range(n_bins):
+            decays[:, j] = sample_binomial(rng, survivors, p)
+            survivors -= decays[:, j]
+        draws = n_real * n_bins
+    # Реєстрація детектором - ще одне біноміальне проріджування
+    counts = decays if efficiency >= 1 else sample_binomial(rng, decays.ravel(), efficiency).reshape(decays.shape)
+    return edges, decays, counts, draws
+
+if page_mode == "Статистика розпаду (Монте-Карло)":
+    st.header("Статистика розпаду: Монте-Карло")
+    lam_mc = np.log(2) / t_half_mc
+    t_end_mc = t_end_halves * t_half_mc
+    if mc_method == "Автоматично":
+        method = ("Точний (час розпаду кожного ядра)" if n0_mc * n_real <= EXACT_DRAWS_LIMIT
+                  else "Біноміальні кроки (tau-leaping)")
+    elif mc_method == "Точний (час розпаду кожного ядра)" and n0_mc * n_real > EXACT_DRAWS_LIMIT:
+        st.warning(f"Точний метод потребує N₀ × реалізацій = {n0_mc * n_real:.2e} випадкових чисел "
+                   f"(межа {EXACT_DRAWS_LIMIT:.0e}). Використано біноміальні кроки.")
+        method = "Біноміальні кроки (tau-leaping)"
+    else:
+        method = mc_method
+
+    edges, decays, counts, draws = decay_monte_carlo(n0_mc, lam_mc, t_end_mc, n_bins_mc, n_real,
+                                                     method, efficiency, int(seed_mc))
+    survivors = n0_mc - np.concatenate((np.zeros((n_real, 1)), np.cumsum(decays, axis=1)), axis=1)
+    mean_n, std_n = survivors.mean(axis=0), survivors.std(axis=0)
+    low_n, high_n = np.percentile(survivors, [5, 95], axis=0)
+    p_survive = np.exp(-lam_mc * edges)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Метод", "Точний" if method.startswith("Точний") else "Біноміальні кроки")
+    col2.metric("Випадкових чисел", f"{draws:.3g}", help=f"Для порівняння: N₀ × реалізацій = {n0_mc * n_real:.3g}")
+    col3.metric("σ(N) в кінці: модель / теорія",
+                f"{std_n[-1] / max(np.sqrt(n0_mc * p_survive[-1] * (1 - p_survive[-1])), 1e-300):.3f}",
+                help="Теоретично кількість ядер, що залишились, має біноміальний розподіл: σ = √(N₀·p·(1-p)), p = e^(-λt).")
+
+    fig_n = go.Figure()
+    fig_n.add_trace(go.Scatter(x=edges, y=high_n, mode='lines', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+    fig_n.add_trace(go.Scatter(x=edges, y=low_n, mode='lines', line=dict(width=0), fill='tonexty',
+                               fillcolor='rgba(65, 105, 225, 0.3)', name='5-95% реалізацій'))
+    for r in range(min(5, n_real)):
+        fig_n.add_trace(go.Scatter(x=edges, y=survivors[r], mode='lines', line=dict(width=1),
+                                   name='Окремі реалізації', legendgroup='real', showlegend=(r == 0),
+                                   opacity=0.7))
+    fig_n.add_trace(go.Scatter(x=edges, y=mean_n, mode='lines', name='Середнє по реалізаціях',
+                               line=dict(color='black', width=2)))
+    fig_n.add_trace(go.Scatter(x=edges, y=n0_mc * p_survive, mode='lines', name='N₀·e^(-λt)',
+                               line=dict(color='red', width=2, dash='dash')))
+    fig_n.update_layout(
+        title="Кількість ядер N(t): розкид реалізацій навколо закону розпаду",
+        xaxis_title="Час (t)",
+        yaxis_title="N(t)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_n, use_container_width=True)
+
+    fig_sigma = go.Figure()
+    fig_sigma.add_trace(go.Scatter(x=edges, y=std_n, mode='lines+markers', name='σ(N) по реалізаціях',
+                                   marker=dict(size=4)))
+    fig_sigma.add_trace(go.Scatter(x=edges, y=np.sqrt(n0_mc * p_survive * (1 - p_survive)), mode='lines',
+                                   name='√(N₀·p·(1-p))', line=dict(color='red', dash='dash')))
+    fig_sigma.update_layout(
+        title="Розкид кількості ядер σ(N)",
+        xaxis_title="Час (t)",
+        yaxis_title="σ(N)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_sigma, use_container_width=True)
+
+    # --- Статистика відліків в одному інтервалі ---
+    st.subheader("Статистика відліків детектора")
+    bin_index = st.slider("Інтервал часу", 1, n_bins_mc, 1,
+                          help="Номер інтервалу, для якого порівнюємо розподіл відліків з розподілом Пуассона.") - 1
+    sample = counts[:, bin_index]
+    mean_c, var_c = sample.mean(), sample.var()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Середня кількість відліків", f"{mean_c:.4g}")
+    col2.metric("Дисперсія", f"{var_c:.4g}")
+    col3.metric("Фактор Фано (D/μ)", f"{var_c / mean_c:.3f}" if mean_c > 0 else "—",
+                help="Для розподілу Пуассона = 1. Точне значення - 1 - ε·p_інтервалу: "
+                     "відліки мають біноміальний розподіл, близький до пуассонівського при малій імовірності розпаду.")
+
+    fig_counts = go.Figure()
+    if mean_c < 200:
+        # Дискретний розподіл: гістограма по цілих значеннях і розподіл Пуассона
+        k = np.arange(0, int(sample.max()) + 2)
+        freq = np.bincount(sample.astype(np.int64), minlength=k.size)[:k.size] / sample.size
+        log_pmf = k * np.log(max(mean_c, 1e-300)) - mean_c - np.array([lgamma(v + 1) for v in k])
+        fig_counts.add_trace(go.Bar(x=k, y=freq, name='Моделювання', marker_color='lightslategray'))
+        fig_counts.add_trace(go.Scatter(x=k, y=np.exp(log_pmf), mode='lines+markers', name='Пуассон(μ)',
+                                        line=dict(color='red')))
+    else:
+        # Багато відліків: Пуассон ≈ нормальний розподіл з μ і σ = √μ
+        # Гістограма відхилень від середнього: при μ ~ 10²⁰ самі значення відрізняються лише в останніх знаках
+        hist, bin_edges = np.histogram(sample - mean_c, bins=40, density=True)
+        bin_edges = bin_edges + mean_c
+        centers = 0.5 * (bin_edges[:-1] + bin_edges[1:])
+        fig_counts.add_trace(go.Bar(x=centers, y=hist, width=np.diff(bin_edges), name='Моделювання',
+                                    marker_color='lightslategray'))
+        k_fine = np.linspace(bin_edges[0], bin_edges[-1], 300)
+        fig_counts.add_trace(go.Scatter(x=k_fine, y=np.exp(-(k_fine - mean_c)**2 / (2 * mean_c)) / np.sqrt(2 * np.pi * mean_c),
+                                        mode='lines', name='Пуассон(μ) ≈ N(μ, √μ)', line=dict(color='red')))
+    fig_counts.update_layout(
+        title=f"Відліки в інтервалі [{edges[bin_index]:.3g}; {edges[bin_index + 1]:.3g}) по {n_real} реалізаціях",
+        xaxis_title="Кількість відліків",
+        yaxis_title="Частка реалізацій",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_counts, use_container_width=True)
+
+# --- Апроксимація журналу лічильника ---
+# Очікувана кількість відліків в інтервалі [t, t + Δt):
+#   μ = Σ A_k/λ_k · e^(-λ_k t) · (1 - e^(-λ_k Δt)) + B·Δt
+# (інтеграл швидкості по інтервалу, а не значення в його центрі). Відліки мають розподіл Пуассона,
+# тож мінімізуємо -ln L = Σ (μ_i - n_i ln μ_i) по ln A, ln λ, ln B (параметри лишаються додатними).
+# Σ μ_i по суцільному відрізку інтервалів [a, b) телескопується в A/λ · (e^(-λa) - e^(-λb)) + B·(b - a),
+# а n_i ln μ_i треба рахувати лише для інтервалів з n_i > 0. У довгих журналах більшість інтервалів
+# порожні, тож одна ітерація мінімізації коштує O(ненульових інтервалів), а не O(усіх).
+# Коваріація - обернена інформаційна матриця Фішера Jᵀ diag(1/μ) J (один прохід по всіх інтервалах).
+LOG_CHUNK_ROWS = 10**6
+
+@st.cache_data(ttl=3600, max_entries=3, show_spinner="Читання журналу...")
+def is_number(text):
+    # Чи це число (зокрема в експоненційному записі на кшталт 1.0e-02): так відрізняємо заголовок від даних
+    try:
+        float(text)
+        return True
+    except ValueError:
+        return False
+
+def read_count_log(file_bytes, dt_default):
+    # Читаємо порціями по LOG_CHUNK_ROWS рядків прямо в масиви NumPy (без списків Python на кожен рядок)
+    # Перший рядок, що не є коментарем (read_csv з comment="#" так само пропускає їх і для заголовка)
+    head = file_bytes[:65536].decode("utf-8", errors="replace").splitlines()
+    first_line = next((line.split("#")[0] for line in head if line.split("#")[0].strip()), "")
+    sep = ";" if ";" in first_line else ","
+    has_header = not all(is_number(field) for field in first_line.split(sep) if field.strip())
+    times, counts = [], []
+    for chunk in pd.read_csv(io.BytesIO(file_bytes), sep=sep, header=0 if has_header else None,
+                             chunksize=LOG_CHUNK_ROWS, dtype=np.float64, comment="#"):
+        values = chunk.to_numpy()
+        if values.shape[1] >= 2:
+            times.append(values[:, 0])
+            counts.append(values[:, 1])
+        else:
+            counts.append(values[:, 0])
+    n = np.concatenate(counts)
+    if times:
+        t = np.concatenate(times)
+        step = np.diff(t)
+        typical = np.median(step) if step.size else dt_default
+        # Пропуск у записі (лічильник був вимкнений) - не довгий інтервал, а звичайний, після якого розрив
+        dt = np.append(np.where(step > 1.5 * typical, typical, step), typical)
+    else:
+        t = np.arange(n.size) * dt_default
+        dt = np.full(n.size, dt_default)
+    valid = np.isfinite(t) & np.isfinite(n) & (dt > 0) & (n >= 0)
+    return t[valid], dt[valid], n[valid]
+
+@st.cache_data(ttl=3600, max_entries=1)
+def synthetic_count_log(seed=0):
+    # Суміш 10⁶ інтервалів по 0.01 с: T½ = 600 с і 60 с, фон 2 відліки/с
+    rng = np.random.default_rng(seed)
+    dt = 0.01
+    t = np.arange(10**6) * dt
+    rate_int = (200 / np.log(2) * 600 * np.exp(-np.log(2) / 600 * t) * -np.expm1(-np.log(2) / 600 * dt)
+                + 100 / np.log(2) * 60 * np.exp(-np.log(2) / 60 * t) * -np.expm1(-np.log(2) / 60 * dt)
+                + 2.0 * dt)
+    return t, np.full(t.size, dt), rng.poisson(rate_int).astype(np.float64)
+
+def expected_counts(theta, t, dt, n_components, with_background):
+    # μ та його похідні за θ = (ln A_1, ln λ_1, [ln A_2, ln λ_2], [ln B]); J має форму (n_params, n_bins)
+    mu = np.zeros_like(t)
+    jac = []
+    for k in range(n_components):
+        amplitude, lam = np.exp(theta[2 * k]), np.exp(theta[2 * k + 1])
+        decay = np.exp(-lam * t)
+        window = -np.expm1(-lam * dt)
+        part = amplitude / lam * decay * window
+        mu += part
+        jac.append(part)
+        # ∂/∂ln λ: λ·∂/∂λ від A/λ · e^(-λt) · (1 - e^(-λΔt))
+        jac.append(part * (-1 - lam * t) + amplitude / lam * decay * lam * dt * np.exp(-lam * dt))
+    if with_background:
+        background = np.exp(theta[-1]) * dt
+        mu += background
+        jac.append(background)
+    return mu, np.array(jac)
+
+def initial_guess(t, dt, n, n_components, with_background):
+    # Фон - середня швидкість в останніх 10% інтервалів; λ - нахил ln(швидкості) за першу половину
+    tail = slice(int(0.9 * t.size), None)
+    background = max(n[tail].sum() / dt[tail].sum(), 1e-6) if with_background else 0.0
+    groups = np.array_split(np.arange(t.size // 2), 20)
+    rate = np.array([n[g].sum() / dt[g].sum() for g in groups]) - background
+    t_mid = np.array([t[g].mean() for g in groups])
+    ok = rate > 0
+    slope = np.polyfit(t_mid[ok], np.log(rate[ok]), 1)[0] if ok.sum() >= 2 else -1 / max(t[-1], 1e-9)
+    lam = max(-slope, 1 / max(t[-1], 1e-9))
+    amplitude = max(rate[0] if ok[0] else n.sum() / dt.sum(), 1e-6)
+    theta = [np.log(amplitude), np.log(lam)] if n_components == 1 else \
+        [np.log(0.5 * amplitude), np.log(3 * lam), np.log(0.5 * amplitude), np.log(lam / 3)]
+    if with_background:
+        theta.append(np.log(background))
+    return np.array(theta)
+
+def segment_totals(theta, seg_start, seg_end, n_components, with_background):
+    # Σ μ по всіх інтервалах і градієнт цієї суми - через межі суцільних відрізків запису
+    total = 0.0
+    grad = []
+    for k in range(n_components):
+        amplitude, lam = np.exp(theta[2 * k]), np.exp(theta[2 * k + 1])
+        decay_a, decay_b = np.exp(-lam * seg_start), np.exp(-lam * seg_end)
+        part = amplitude / lam * np.sum(decay_a - decay_b)
+        total += part
+        grad.append(part)
+        grad.append(-part + amplitude * np.sum(seg_end * decay_b - seg_start * decay_a))
+    if with_background:
+        part = np.exp(theta[-1]) * np.sum(seg_end - seg_start)
+        total += part
+        grad.append(part)
+    return total, np.array(grad)
+
+# Апроксимація вважається збіжною, коли до мінімуму лишається зсув ≲ 0.01σ за кожним параметром
+FIT_DECREMENT_TOL = 1e-4
+FIT_NEWTON_STEPS = 20
+
+@st.cache_data(ttl=3600, max_entries=5, show_spinner="Апроксимація...")
+def fit_count_log(t, dt, n, n_components, with_background):
+    # Межі суцільних відрізків: розрив там, де наступний інтервал не починається в кінці попереднього
+    ends = t + dt
+    gap = np.flatnonzero(np.abs(t[1:] - ends[:-1]) > 1e-9 * np.maximum(np.abs(t[1:]), dt[:-1]))
+    seg_start = t[np.concatenate(([0], gap + 1))]
+    seg_end = ends[np.concatenate((gap, [t.size - 1]))]
+    hit = n > 0
+    t_hit, dt_hit, n_hit = t[hit], dt[hit], n[hit]
+
+    def nll(theta):
+        total, total_grad = segment_totals(theta, seg_start, seg_end, n_components, with_background)
+        mu, jac = expected_counts(theta, t_hit, dt_hit, n_components, with_background)
+        mu = np.maximum(mu, 1e-300)
+        return total - np.sum(n_hit * np.log(mu)), total_grad - jac @ (n_hit / mu)
+
+    def fisher_step(theta):
+        # Крок Ньютона з інформаційною матрицею Фішера F = Σ J Jᵀ/μ (метод скорингу) і декремент gᵀF⁻¹g
+        mu, jac = expected_counts(theta, t, dt, n_components, with_background)
+        covariance = np.linalg.pinv((jac / mu) @ jac.T)
+        step = covariance @ nll(theta)[1]
+        return mu, covariance, step, step @ nll(theta)[1]
+
+    theta0 = initial_guess(t, dt, n, n_components, with_background)
+    theta = minimize(nll, theta0, jac=True, method="BFGS", options=dict(maxiter=500)).x
+    # NLL має порядок 10⁴-10⁵, тож абсолютний gtol BFGS тут недосяжний через округлення.
+    # Доводимо кроками скорингу і збіжність перевіряємо за декрементом Ньютона gᵀF⁻¹g - подвоєним
+    # очікуваним зменшенням NLL до мінімуму, тобто квадратом залишкового зсуву θ в одиницях σ
+    mu, covariance, step, decrement = fisher_step(theta)
+    for _ in range(FIT_NEWTON_STEPS):
+        if decrement < FIT_DECREMENT_TOL:
+            break
+        value = nll(theta)[0]
+        scale = 1.0
+        while scale > 1e-3 and not nll(theta - scale * step)[0] < value:
+            scale /= 2
+        if scale <= 1e-3:
+            break
+        theta = theta - scale * step
+        mu, covariance, step, decrement = fisher_step(theta)
+    converged = bool(decrement < FIT_DECREMENT_TOL)
+    return theta, covariance, mu, converged
+
+def aggregate_bins(values, n_groups):
+    # Сума по суцільних групах інтервалів - для графіків (у браузер іде не більше n_groups точок)
+    edges = np.linspace(0, values.size, min(n_groups, values.size) + 1).astype(np.int64)
+    return np.add.reduceat(values, edges[:-1])
+
+if page_mode == "Апроксимація вимірювань":
+    st.header("Період напіврозпаду з журналу лічильника")
+    if data_source == "Синтетичний приклад":
+        t_log, dt_log, n_log = synthetic_count_log()
+        st.caption("Синтетичний журнал: 10⁶ інтервалів по 0.01 с, суміш T½ = 600 с і 60 с з фоном 2 відліки/с.")
+    else:
+        st.write("CSV зі стовпцями **час початку інтервалу (с), кількість відліків** або лише зі стовпцем відліків "
+                 "(тоді ширина інтервалу береться з бічної панелі). Заголовок необов'язковий.")
+        log_file = st.file_uploader("Журнал лічильника", type=["csv", "txt"])
+        if log_file is None:
+            st.stop()
+        try:
+            t_log, dt_log, n_log = read_count_log(log_file.getvalue(), dt_default)
+        except (ValueError, pd.errors.ParserError) as err:
+            st.error(f"Не вдалося прочитати файл: {err}")
+            st.stop()
+    if n_log.size < 10 * (2 * n_components + with_background):
+        st.error("Замало інтервалів для апроксимації.")
+        st.stop()
+
+    theta, covariance, mu_fit, converged = fit_count_log(t_log, dt_log, n_log, n_components, with_background)
+    n_params = theta.size
+    if not converged:
+        st.warning("Мінімізація не зійшлася повністю - перевірте модель (кількість компонент, фон).")
+
+    # Графіки і χ² - по згрупованих інтервалах: в окремих інтервалах відліків зазвичай одиниці,
+    # і χ² по них нічого не говорить про якість моделі
+    n_show = 2000
+    groups_t = aggregate_bins(t_log * dt_log, n_show) / aggregate_bins(dt_log, n_show)
+    groups_dt = aggregate_bins(dt_log, n_show)
+    groups_n = aggregate_bins(n_log, n_show)
+    groups_mu = aggregate_bins(mu_fit, n_show)
+    pearson = (groups_n - groups_mu) / np.sqrt(groups_mu)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Інтервалів", f"{n_log.size:,}")
+    col2.metric("Усього відліків", f"{n_log.sum():.4g}")
+    col3.metric("χ² / ступені свободи", f"{np.sum(pearson**2) / max(groups_n.size - n_params, 1):.3f}",
+                help=f"По {groups_n.size} групах інтервалів; ≈ 1 для адекватної моделі.")
+
+    columns = st.columns(n_components + with_background)
+    for k in range(n_components):
+        lam_fit = np.exp(theta[2 * k + 1])
+        sigma_log_lam = np.sqrt(covariance[2 * k + 1, 2 * k + 1])
+        half_life = np.log(2) / lam_fit
+        amplitude = np.exp(theta[2 * k])
+        columns[k].metric(f"T½ компоненти {k + 1}" if n_components > 1 else "T½",
+                          f"{half_life:.5g} ± {half_life * sigma_log_lam:.2g} с",
+                          help=f"Початкова швидкість відліків A = {amplitude:.5g} ± "
+                               f"{amplitude * np.sqrt(covariance[2 * k, 2 * k]):.2g} 1/с; "
+                               f"N₀ (з точністю до ефективності) = A/λ = {amplitude / lam_fit:.4g}")
+    if with_background:
+        background = np.exp(theta[-1])
+        columns[-1].metric("Фон", f"{background:.4g} ± {background * np.sqrt(covariance[-1, -1]):.2g} 1/с")
+
+    fig_fit = go.Figure()
+    fig_fit.add_trace(go.Scattergl(x=groups_t, y=groups_n / groups_dt, mode='markers', name='Виміряно',
+                                   marker=dict(size=3, color='gray'),
+                                   error_y=dict(type='data', array=np.sqrt(groups_n) / groups_dt, visible=True,
+                                                thickness=0.5, width=0)))
+    fig_fit.add_trace(go.Scattergl(x=groups_t, y=groups_mu / groups_dt, mode='lines', name='Модель',
+                                   line=dict(color='red', width=2)))
+    fig_fit.update_layout(
+        title="Швидкість відліків і модель (по згрупованих інтервалах)",
+        xaxis_title="Час (t), с",
+        yaxis=dict(title="Відліків за секунду", type="log"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_fit, use_container_width=True)
+
+    fig_res = go.Figure()
+    fig_res.add_trace(go.Scattergl(x=groups_t, y=pearson, mode='markers',
+                                   marker=dict(size=3, color='royalblue'), name='(n - μ)/√μ'))
+    fig_res.add_hline(y=0, line_color="black")
+    fig_res.add_hrect(y0=-2, y1=2, fillcolor="green", opacity=0.1, line_width=0)
+    fig_res.update_layout(
+        title="Нормовані залишки Пірсона: ~95% точок мають бути в смузі ±2",
+        xaxis_title="Час (t), с",
+        yaxis_title="(n - μ) / √μ"
+    )
+    st.plotly_chart(fig_res, use_container_width=True)
 
-else:
-    st.error("Період напіврозпаду має бути > 0")
\ No newline at end of file
@@ -1,10 +1,93 @@
 import streamlit as st
 import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pa_parquet
 import scipy.constants as const # Використовуємо наукові константи з SciPy
+import io
 
 st.title("⚛️ Атомні калькулятори")
 st.write("Розрахунки за формулами з вступу до квантової механіки.")
 
+# --- Таблиця спектральних ліній воднеподібного іона ---
+N_MAX_TABLE = 200
+SERIES_NAMES = ("Лаймана", "Бальмера", "Пашена", "Брекета", "Пфунда", "Гемфрі")
+
+def series_name(n_f):
+    return f"Серія {SERIES_NAMES[n_f - 1]}" if n_f <= len(SERIES_NAMES) else f"n_f = {n_f}"
+
+@st.cache_data(ttl=3600, max_entries=10)
+def rydberg_lines(Z, n_max=N_MAX_TABLE):
+    # Усі переходи n_i → n_f (n_f < n_i ≤ n_max) одним виразом: пари рівнів - верхній трикутник матриці
+    n_f, n_i = np.triu_indices(n_max, k=1)
+    n_f, n_i = n_f + 1, n_i + 1
+    term = 1.0 / n_f**2 - 1.0 / n_i**2
+    inv_lambda = const.Rydberg * Z**2 * term
+    nu = const.c * inv_lambda
+    # Сила осцилятора поглинання n_f → n_i за Крамерсом і коефіцієнт Ейнштейна для випромінювання
+    # A = 2π e² ν² / (ε₀ m_e c³) · (g_f / g_i) · f, g_n = 2n²
+    f_kramers = 32 / (3 * np.sqrt(3) * np.pi) / (n_f**5 * n_i**3 * term**3)
+    einstein_a = (2 * np.pi * const.e**2 * nu**2 / (const.epsilon_0 * const.m_e * const.c**3)
+                  * (n_f / n_i)**2 * f_kramers)
+    return {
+        "n_i": n_i.astype(np.int16),
+        "n_f": n_f.astype(np.int16),
+        "lambda_nm": 1e9 / inv_lambda,
+        "energy_eV": const.h * nu / const.e,
+        "A": einstein_a,
+    }
+
+def synthetic_spectrum(wavelengths, intensity, lambda_min, lambda_max, resolving_power, n_grid=4000):
+    log_edges = np.linspace(np.log(max(lambda_min, 1e-6)), np.log(max(lambda_max, 2 * lambda_min, 1e-5)), n_grid + 1)
+    step = log_edges[1] - log_edges[0]
+    binned, _ = np.histogram(np.log(wavelengths), bins=log_edges, weights=intensity)
+    sigma = 1 / (2.355 * resolving_power) / step # FWHM = λ/R, у вузлах сітки
+    half = int(min(4 * sigma + 1, n_grid))
+    kernel = np.exp(-0.5 * (np.arange(-half, half + 1) / max(sigma, 1e-3))**2)
+    spectrum = np.convolve(binned, kernel, mode="same")
+    centers = np.exp(0.5 * (log_edges[:-1] + log_edges[1:]))
+    return centers.astype(np.float32), (spectrum / max(spectrum.max(), 1e-300)).astype(np.float32)
+
+# --- Релятивістська хвиля де Бройля ---
+# Частинка: (маса, кг; заряд у одиницях e)
+PARTICLES = {
+    "Електрон": (const.electron_mass, 1),
+    "Протон": (const.proton_mass, 1),
+    "Нейтрон": (const.neutron_mass, 0),
+}
+
+def de_broglie_sweep(sweep, by_voltage):
+    # sweep (N,) - енергії в еВ або напруги у В; результат - масиви (частинка, точка) для всіх частинок одразу.
+    # pc = √(E_k² + 2E_k·mc²) без віднімання близьких чисел, тож точно і при E_k ≪ mc²
+    mass = np.array([props[0] for props in PARTICLES.values()])[:, None]
+    charge = np.array([props[1] for props in PARTICLES.values()], dtype=float)[:, None]
+    kinetic = sweep * const.e * (charge if by_voltage else 1.0)
+    kinetic = np.where(kinetic > 0, kinetic, np.nan) # нейтрон при розгортці за напругою
+    rest_energy = mass * const.c**2
+    pc = np.sqrt(kinetic * (kinetic + 2 * rest_energy))
+    return kinetic, pc / const.c, const.h * const.c / pc, pc / (kinetic + rest_energy)
+
+@st.cache_data(ttl=3600, max_entries=2)
+def export_sweep(e_min, e_max, n_points, by_voltage, file_format):
+    sweep = np.geomspace(e_min, e_max, n_points)
+    _, momentum, wavelength, beta = de_broglie_sweep(sweep, by_voltage)
+    columns = {"voltage_V" if by_voltage else "kinetic_energy_eV": sweep}
+    for k, name in enumerate(("electron", "proton", "neutron")):
+        if by_voltage and PARTICLES[list(PARTICLES)[k]][1] == 0:
+            continue
+        columns[f"{name}_p_kg_m_s"] = momentum[k]
+        columns[f"{name}_lambda_m"] = wavelength[k]
+        columns[f"{name}_beta"] = beta[k]
+    table = pa.table(columns)
+    buffer = io.BytesIO()
+    if file_format == "csv":
+        pa_csv.write_csv(table, buffer)
+    else:
+        pa_parquet.write_table(table, buffer)
+    return buffer.getvalue()
+
 # Створюємо дві вкладки
 tab1, tab2 = st.tabs(["Формула Рідберга (Л.1)", "Хвиля де Бройля (Л.2)"])
 
@@ -14,58 +97,211 @@ with tab1:
     st.write("Розраховує довжину хвилі фотона, що випромінюється при переході електрона в атомі водню.")
     st.latex(r"\frac{1}{\lambda} = R \left( \frac{1}{n_f^2} - \frac{1}{n_i^2} \right)")
     
-    col1, col2 = st.columns(2)
-    n_i = col1.number_input("Початковий рівень (n_i)", min_value=2, value=3, step=1, 
-                             help="Вищий енергетичний рівень")
-    n_f = col2.number_input("Кінцевий рівень (n_f)", min_value=1, value=2, step=1,
-                             help="Нижчий енергетичний рівень")
-
-    if n_i <= n_f:
-        st.error("Початковий рівень (n_i) має бути більшим за кінцевий (n_f) для випромінювання.")
-    else:
-        # R = 1.097373e7 1/m (стала Рідберга)
-        R = const.Rydberg
+    rydberg_mode = st.radio("Режим", ("Один перехід", "Таблиця ліній і спектр"), horizontal=True,
+                            help="Таблиця: усі переходи між рівнями n ≤ 200 воднеподібного іона із зарядом ядра Z.")
+
+    if rydberg_mode == "Один перехід":
+        col1, col2 = st.columns(2)
+        n_i = col1.number_input("Початковий рівень (n_i)", min_value=2, value=3, step=1, 
+                                 help="Вищий енергетичний рівень")
+        n_f = col2.number_input("Кінцевий рівень (n_f)", min_value=1, value=2, step=1,
+                                 help="Нижчий енергетичний рівень")
+
+        if n_i <= n_f:
+            st.error("Початковий рівень (n_i) має бути більшим за кінцевий (n_f) для випромінювання.")
+        else:
+            # R = 1.097373e7 1/m (стала Рідберга)
+            R = const.Rydberg
         
-        # Розрахунок
-        inv_lambda = R * (1/n_f**2 - 1/n_i**2)
-        lambda_meters = 1 / inv_lambda
-        lambda_nm = lambda_meters * 1e9 # Переводимо в нанометри
+            # Розрахунок
+            inv_lambda = R * (1/n_f**2 - 1/n_i**2)
+            lambda_meters = 1 / inv_lambda
+            lambda_nm = lambda_meters * 1e9 # Переводимо в нанометри
         
-        st.metric("Довжина хвилі (λ)", f"{lambda_nm:.2f} нм")
+            st.metric("Довжина хвилі (λ)", f"{lambda_nm:.2f} нм")
         
-        if lambda_nm >= 380 and lambda_nm <= 750:
-            st.success("Ця хвиля знаходиться у видимому діапазоні!")
+            if lambda_nm >= 380 and lambda_nm <= 750:
+                st.success("Ця хвиля знаходиться у видимому діапазоні!")
+            else:
+                st.info("Ця хвиля знаходиться поза видимим діапазоном (УФ або ІЧ).")
+
+    else:
+        col1, col2, col3 = st.columns(3)
+        Z = col1.number_input("Заряд ядра (Z)", min_value=1, max_value=100, value=1, step=1,
+                              help="Воднеподібний іон: H (1), He⁺ (2), Li²⁺ (3), ...")
+        n_max = col2.slider("Найвищий рівень (n_max)", min_value=2, max_value=N_MAX_TABLE, value=N_MAX_TABLE)
+        temperature = col3.number_input("Температура збудження, К", min_value=1000.0, max_value=1e9,
+                                        value=20000.0, step=1000.0,
+                                        help="Заселеність рівнів за Больцманом: g_n · exp(-E_n / kT).")
+        lines = rydberg_lines(Z)
+
+        # Вікно за замовчуванням: від межі серії Лаймана до ~2 мкм (для іонів усе стискається як 1/Z²)
+        limit_nm = 1e9 / (const.Rydberg * Z**2)
+        col1, col2, col3 = st.columns(3)
+        lambda_min = col1.number_input("λ від, нм", min_value=0.0, value=float(f"{0.9 * limit_nm:.3g}"), format="%g")
+        lambda_max = col2.number_input("λ до, нм", min_value=0.0, value=float(f"{2000 / Z**2:.3g}"), format="%g")
+        series_names = [series_name(k) for k in range(1, N_MAX_TABLE)]
+        chosen_series = col3.multiselect("Серії", series_names[:6], default=[],
+                                         help="Порожньо - усі серії (включно з n_f > 6).")
+
+        # Відносна інтенсивність лінії ∝ N_i · A · hν, N_i ∝ 2n_i² · exp(-(E_i - E_1)/kT).
+        # Рахуємо логарифм: для важких іонів при низькій T самі больцманівські множники зникають у нулі
+        excitation = const.Rydberg * const.h * const.c * Z**2 * (1 - 1 / lines["n_i"].astype(float)**2)
+        log_intensity = (np.log(2.0 * lines["n_i"].astype(float)**2 * lines["A"] * lines["energy_eV"])
+                         - excitation / (const.k * temperature))
+
+        mask = (lines["lambda_nm"] >= lambda_min) & (lines["lambda_nm"] <= lambda_max) & (lines["n_i"] <= n_max)
+        if chosen_series:
+            mask &= np.isin(lines["n_f"], [series_names.index(name) + 1 for name in chosen_series])
+        if not mask.any():
+            st.warning("У вибраному вікні немає жодної лінії.")
         else:
-            st.info("Ця хвиля знаходиться поза видимим діапазоном (УФ або ІЧ).")
+            intensity = np.exp(log_intensity[mask] - log_intensity[mask].max())
+
+            table = pd.DataFrame({
+                "Серія": np.array(series_names)[lines["n_f"][mask] - 1],
+                "n_i": lines["n_i"][mask],
+                "n_f": lines["n_f"][mask],
+                "λ, нм": lines["lambda_nm"][mask],
+                "Енергія фотона, еВ": lines["energy_eV"][mask],
+                "A, 1/с": lines["A"][mask],
+                "Відносна інтенсивність": intensity,
+            })
+            st.write(f"Ліній у вікні: **{len(table):,}** з {lines['n_i'].size:,}. "
+                     "Довжини хвиль - у вакуумі; таблицю можна сортувати клацанням по заголовку стовпця.")
+            st.dataframe(table, use_container_width=True, hide_index=True, height=320,
+                         column_config={"λ, нм": st.column_config.NumberColumn(format="%.4f"),
+                                        "Енергія фотона, еВ": st.column_config.NumberColumn(format="%.5f"),
+                                        "A, 1/с": st.column_config.NumberColumn(format="%.3e"),
+                                        "Відносна інтенсивність": st.column_config.NumberColumn(format="%.3e")})
+
+            # --- Синтетичний спектр ---
+            # Лінії розкладаємо по рівномірній сітці ln λ і згортаємо з гаусовим профілем приладу:
+            # при сталій роздільній здатності λ/Δλ ширина профілю в ln λ однакова для всієї сітки.
+            resolving_power = st.select_slider("Роздільна здатність спектрометра (λ/Δλ)",
+                                               options=[100, 300, 1000, 3000, 10000, 30000], value=1000)
+            wl_grid, spectrum = synthetic_spectrum(lines["lambda_nm"][mask], intensity, lambda_min, lambda_max,
+                                                   resolving_power)
+            fig_spec = go.Figure()
+            fig_spec.add_trace(go.Scattergl(x=wl_grid, y=spectrum, mode='lines', line=dict(color='black', width=1),
+                                            name='Спектр'))
+            if lambda_min < 750 and lambda_max > 380:
+                fig_spec.add_vrect(x0=max(380, lambda_min), x1=min(750, lambda_max), fillcolor="gold", opacity=0.15,
+                                   line_width=0, annotation_text="видимий діапазон", annotation_position="top left")
+            fig_spec.update_layout(
+                title=f"Синтетичний спектр випромінювання (Z = {Z}, T = {temperature:,.0f} К)",
+                xaxis=dict(title="Довжина хвилі (λ), нм", type="log" if lambda_max > 4 * max(lambda_min, 1e-9) else "linear"),
+                yaxis_title="Інтенсивність (відн. од.)"
+            )
+            st.plotly_chart(fig_spec, use_container_width=True)
+            st.caption("Ймовірності переходів A - за квазікласичною формулою Крамерса (усереднено по підрівнях l), "
+                       "тому відносні інтенсивності правильні з точністю до ~20-30%.")
 
 # --- Вкладка 2: Хвиля де Бройля ---
 with tab2:
     st.header("Довжина хвилі де Бройля")
     st.write("Розраховує довжину хвилі, асоційовану з частинкою, що рухається.")
-    st.latex(r"\lambda = \frac{h}{p} = \frac{h}{m \cdot v}")
-    
-    st.subheader("Оберіть частинку")
-    particle = st.selectbox("Тип частинки", 
-                            ("Електрон", "Протон", "Нейтрон", "Інша (ввести масу)"))
-    
-    if particle == "Електрон":
-        m = const.electron_mass
-    elif particle == "Протон":
-        m = const.proton_mass
-    elif particle == "Нейтрон":
-        m = const.neutron_mass
+    de_broglie_mode = st.radio("Розрахунок", ("Одна частинка", "Розгортка за енергією"), horizontal=True,
+                               help="Розгортка: λ(E) для всіх частинок одразу в широкому діапазоні енергій "
+                                    "або прискорювальних напруг.")
+
+    if de_broglie_mode == "Одна частинка":
+        st.latex(r"\lambda = \frac{h}{p} = \frac{h}{\gamma m v}, \qquad \gamma = \frac{1}{\sqrt{1 - v^2/c^2}}")
+
+        st.subheader("Оберіть частинку")
+        particle = st.selectbox("Тип частинки",
+                                tuple(PARTICLES) + ("Інша (ввести масу)",))
+
+        if particle in PARTICLES:
+            m = PARTICLES[particle][0]
+        else:
+            m = st.number_input("Маса частинки (m), кг", min_value=1e-31, value=1.0, format="%e")
+
+        st.write(f"Маса (m) = {m:.2e} кг")
+
+        v = st.number_input("Швидкість частинки (v), м/с", min_value=0.01, value=1e6)
+
+        if v >= const.c:
+            st.error("Швидкість частинки має бути меншою за швидкість світла c ≈ 2.998·10⁸ м/с.")
+        else:
+            # Розрахунок
+            h = const.h # Стала Планка
+            gamma = 1 / np.sqrt(1 - (v / const.c)**2)
+            p = gamma * m * v
+            lambda_de_broglie = h / p
+            lambda_pm = lambda_de_broglie * 1e12 # Переводимо в пікометри
+
+            st.metric("Імпульс (p)", f"{p:.3e} кг·м/с")
+            st.metric("Довжина хвилі де Бройля (λ)", f"{lambda_pm:.3f} пм (пікометрів)")
+            if gamma > 1.001:
+                st.info(f"Релятивістський множник γ = {gamma:.4f}: формула h/(m·v) дала б "
+                        f"{lambda_pm * gamma:.3f} пм.")
+
     else:
-        m = st.number_input("Маса частинки (m), кг", min_value=1e-31, value=1.0, format="%e")
-    
-    st.write(f"Маса (m) = {m:.2e} кг")
-    
-    v = st.number_input("Швидкість частинки (v), м/с", min_value=0.01, value=1e6)
-    
-    # Розрахунок
-    h = const.h # Стала Планка
-    p = m * v
-    lambda_de_broglie = h / p
-    lambda_pm = lambda_de_broglie * 1e12 # Переводимо в пікометри
-    
-    st.metric("Імпульс (p)", f"{p:.3e} кг·м/с")
-    st.metric("Довжина хвилі де Бройля (λ)", f"{lambda_pm:.3f} пм (пікометрів)")
\ No newline at end of file
+        st.latex(r"pc = \sqrt{E_k^2 + 2 E_k m c^2}, \qquad \lambda = \frac{hc}{pc}")
+        col1, col2, col3, col4 = st.columns(4)
+        sweep_variable = col1.selectbox("Змінна", ("Кінетична енергія, еВ", "Прискорювальна напруга, В"),
+                                        help="Для напруги E_k = |q|·U; нейтрон не прискорюється полем.")
+        e_min = col2.number_input("Від", min_value=1e-6, value=1.0, format="%g")
+        e_max = col3.number_input("До", min_value=1e-6, value=1e7, format="%g")
+        n_points = col4.select_slider("Точок", options=[10**3, 10**4, 10**5, 10**6], value=10**5,
+                                      format_func=lambda n: f"{n:,}")
+
+        if e_max <= e_min:
+            st.error("Верхня межа діапазону має бути більшою за нижню.")
+        else:
+            by_voltage = sweep_variable.startswith("Прискорювальна")
+            sweep = np.geomspace(e_min, e_max, n_points)
+            kinetic, _, wavelength, beta = de_broglie_sweep(sweep, by_voltage)
+            # Для нерелятивістської формули p = √(2mE_k): відносна похибка λ - √(1 + E_k / 2mc²) - 1
+            rest_energy = np.array([props[0] for props in PARTICLES.values()])[:, None] * const.c**2
+            wavelength_classic = const.h / np.sqrt(2 * rest_energy / const.c**2 * kinetic)
+
+            # На графік - не більше 2000 точок на криву (крива гладка в логарифмічному масштабі)
+            show = slice(None, None, max(1, n_points // 2000))
+            colors = ("royalblue", "crimson", "seagreen")
+            fig_lambda = go.Figure()
+            fig_error = go.Figure()
+            for k, name in enumerate(PARTICLES):
+                if np.all(np.isnan(wavelength[k])):
+                    continue
+                fig_lambda.add_trace(go.Scattergl(x=sweep[show], y=wavelength[k, show], mode='lines', name=name,
+                                                  line=dict(color=colors[k], width=2)))
+                fig_lambda.add_trace(go.Scattergl(x=sweep[show], y=wavelength_classic[k, show], mode='lines',
+                                                  name=f"{name}, h/√(2mE)", line=dict(color=colors[k], dash='dash')))
+                fig_error.add_trace(go.Scattergl(x=sweep[show], y=100 * (wavelength_classic[k, show] / wavelength[k, show] - 1),
+                                                 mode='lines', name=name, line=dict(color=colors[k], width=2)))
+            fig_lambda.update_layout(
+                title="Довжина хвилі де Бройля: релятивістська (суцільна) і класична (пунктир)",
+                xaxis=dict(title=sweep_variable, type="log"),
+                yaxis=dict(title="λ, м", type="log", exponentformat="power"),
+                legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+            )
+            st.plotly_chart(fig_lambda, use_container_width=True)
+            fig_error.update_layout(
+                title="Похибка нерелятивістської формули h/√(2mE_k)",
+                xaxis=dict(title=sweep_variable, type="log"),
+                yaxis=dict(title="(λ_класична / λ - 1), %", type="log"),
+            )
+            st.plotly_chart(fig_error, use_container_width=True)
+            if by_voltage:
+                st.caption("Нейтрон не має заряду, тому для розгортки за напругою його не показано.")
+
+            # Короткий зріз таблиці: по точці на кожну декаду діапазону
+            # (сітка логарифмічна, тож рівномірні індекси - це рівномірні кроки в log E)
+            decades = np.unique(np.linspace(0, n_points - 1, int(np.log10(e_max / e_min)) + 2).round().astype(int))
+            preview = {sweep_variable: sweep[decades]}
+            for k, name in enumerate(PARTICLES):
+                if np.all(np.isnan(wavelength[k])):
+                    continue
+                preview[f"λ ({name}), пм"] = wavelength[k, decades] * 1e12
+                preview[f"v/c ({name})"] = beta[k, decades]
+            st.dataframe(pd.DataFrame(preview), use_container_width=True, hide_index=True)
+
+            st.write(f"Повна таблиця: {n_points:,} рядків (імпульс, довжина хвилі та v/c для кожної частинки).")
+            col_csv, col_parquet = st.columns(2)
+            col_csv.download_button("Завантажити CSV", lambda: export_sweep(e_min, e_max, n_points, by_voltage, "csv"),
+                                    file_name="de_broglie_sweep.csv", mime="text/csv")
+            col_parquet.download_button("Завантажити Parquet",
+                                        lambda: export_sweep(e_min, e_max, n_points, by_voltage, "parquet"),
+                                        file_name="de_broglie_sweep.parquet", mime="application/octet-stream")
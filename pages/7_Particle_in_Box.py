@@ -1,89 +1,532 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
+import pandas as pd
 import scipy.constants as const
+from scipy.linalg import eigh_tridiagonal
 
 st.title("🔳 Частинка у 1D потенціальному ящику")
-st.write("Візуалізація хвильових функцій (Ψ) та густини ймовірності (Ψ²) для стаціонарного рівняння Шредінгера (тема Л.5).")
+st.write("Візуалізація хвильових функцій (Ψ) та густини ймовірності (Ψ²) для стаціонарного рівняння Шредінгера (тема Л.5): "
+         "аналітично для нескінченної ями та чисельно для довільного потенціалу V(x), "
+         "еволюції суперпозицій цих станів у часі, а також рівні й густина станів прямокутного ящика у 2D та 3D.")
 
 # --- Бічна панель ---
-st.sidebar.header("Параметри ящика")
-L_pm = st.sidebar.slider("Ширина ящика (L), пікометри", 50, 1000, 100, step=10)
-L = L_pm * 1e-12 # Переводимо в метри
+st.sidebar.header("Режим")
+view_mode = st.sidebar.radio(
+    "Що показуємо", ("Стаціонарні стани", "Еволюція суперпозиції Ψ(x, t)", "Ящик у 2D / 3D (виродження)"),
+    help="Еволюція: початковий стан розкладається за власними станами, кожен з яких лише обертає фазу e^(-iEₙt/ħ). "
+         "2D / 3D: рівні прямокутного ящика, їх виродження та густина станів."
+)
 
-n = st.sidebar.slider("Квантове число (n)", 1, 10, 1, step=1, 
-                      help="Основний (n=1), перший збуджений (n=2), ...")
+if view_mode == "Ящик у 2D / 3D (виродження)":
+    st.sidebar.header("Параметри ящика")
+    box_dimension = st.sidebar.radio("Вимірність", (2, 3), index=1, horizontal=True)
+    box_lengths = tuple(
+        st.sidebar.slider(f"Довжина {axis}, пікометри", 50, 1000, 100, step=10)
+        for axis in ("Lx", "Ly", "Lz")[:box_dimension]
+    )
+    n_states_total = st.sidebar.select_slider("Станів у гістограмі (≈)", options=[10**4, 10**5, 10**6, 10**7, 10**8],
+                                              value=10**6, format_func=lambda v: f"{v:.0e}")
+    n_levels_table = st.sidebar.slider("Рівнів у таблиці виродження", 5, 100, 30)
+else:
+    st.sidebar.header("Потенціал")
+    potential_kind = st.sidebar.radio(
+        "Форма V(x)",
+        ("Нескінченна яма (аналітично)", "Скінченна яма", "Гармонічний осцилятор", "Подвійна яма",
+         "Кусково-лінійний (таблиця)", "Завантажений V(x) (CSV)"),
+        help="Усі варіанти, крім першого, розв'язуються чисельно (скінченні різниці) "
+             "всередині ящика з непроникними стінками на краях."
+    )
 
-# Використовуємо масу електрона
-m = const.electron_mass
-hbar = const.hbar
+    st.sidebar.header("Параметри ящика")
+    if potential_kind == "Нескінченна яма (аналітично)":
+        L_pm = st.sidebar.slider("Ширина ящика (L), пікометри", 50, 1000, 100, step=10)
+    else:
+        # Для ям всередині ящика потрібен запас місця, тож і діапазон, і типове значення більші
+        L_pm = st.sidebar.slider("Ширина ящика (L), пікометри", 50, 5000, 1000, step=10)
+    L = L_pm * 1e-12 # Переводимо в метри
 
-# --- Розрахункова частина ---
+    if potential_kind == "Нескінченна яма (аналітично)":
+        if view_mode == "Стаціонарні стани":
+            n = st.sidebar.slider("Квантове число (n)", 1, 10, 1, step=1, 
+                                  help="Основний (n=1), перший збуджений (n=2), ...")
+    else:
+        if potential_kind == "Скінченна яма":
+            well_depth = st.sidebar.number_input("Глибина ями (V₀), еВ", min_value=0.0, value=100.0, step=10.0)
+            well_width = st.sidebar.slider("Ширина ями (a), % від L", 5, 100, 40, step=5)
+        elif potential_kind == "Гармонічний осцилятор":
+            hbar_omega = st.sidebar.number_input("Енергія кванта (ħω), еВ", min_value=0.01, value=20.0, step=5.0)
+        elif potential_kind == "Подвійна яма":
+            barrier_height = st.sidebar.number_input("Висота бар'єра (V₀), еВ", min_value=0.0, value=50.0, step=10.0)
+            well_separation = st.sidebar.slider("Відстань між мінімумами, % від L", 10, 90, 40, step=5)
+        # Для еволюції зберігаємо до 500 власних функцій, тож сітку обмежуємо
+        grid_options = [1000, 2000, 5000, 10000, 20000, 50000, 100000] if view_mode == "Стаціонарні стани" else [1000, 2000, 5000]
+        n_grid = st.sidebar.select_slider("Точок сітки (N)", options=grid_options,
+                                          value=2000, format_func=lambda v: f"{v:,}")
+        if view_mode == "Стаціонарні стани":
+            n_states = st.sidebar.slider("Кількість рівнів (k)", 2, 100, 20,
+                                         help="Розв'язувач шукає лише k найнижчих станів.")
+            n = st.sidebar.slider("Квантове число (n)", 1, n_states, 1, step=1,
+                                  help="Номер рівня, для якого показано Ψ (1 - основний стан).")
 
-# 1. Розрахунок енергії
-# E_n = (n^2 * pi^2 * hbar^2) / (2 * m * L^2)
-E_joules = (n**2 * np.pi**2 * hbar**2) / (2 * m * L**2)
-E_eV = E_joules / const.electron_volt # Переводимо в електрон-вольти
+if view_mode == "Еволюція суперпозиції Ψ(x, t)":
+    st.sidebar.header("Початковий стан")
+    initial_state = st.sidebar.radio("Ψ(x, 0)", ("Суперпозиція рівнів", "Гаусів хвильовий пакет"))
+    if initial_state == "Суперпозиція рівнів":
+        superposed_levels = st.sidebar.multiselect("Рівні (однакові амплітуди)", list(range(1, 11)), default=[1, 2])
+        n_basis = max(superposed_levels, default=1)
+    else:
+        packet_x0 = st.sidebar.slider("Центр пакета x₀, % від L", 5, 95, 30)
+        packet_sigma = st.sidebar.slider("Ширина пакета σ, % від L", 1, 20, 5)
+        packet_k0 = st.sidebar.slider("Хвильове число k₀, в одиницях π/L", 0, 200, 30,
+                                      help="Для нескінченної ями пакет складається переважно з рівнів n ≈ k₀L/π.")
+        n_basis = st.sidebar.slider("Базисних станів (K)", 10, 500, 200,
+                                    help="На скільки найнижчих власних станів проєктуємо пакет.")
+    st.sidebar.header("Анімація")
+    t_periods = st.sidebar.slider("Тривалість, у T = 2πħ / (E₂ - E₁)", 0.5, 10.0, 3.0, step=0.5,
+                                  help="Для нескінченної ями при t = 3T відбувається повне відродження пакета.")
+    n_frames = st.sidebar.slider("Кадрів", 30, 300, 150, step=10)
 
-st.header(f"Рівень n = {n}")
-st.metric("Енергія рівня (Eₙ)", f"{E_eV:.3f} еВ (електрон-вольт)")
+# --- Чисельний розв'язок для довільного V(x) ---
+# -ħ²/2m Ψ'' + V Ψ = E Ψ на сітці x_j = j·Δx (j = 1..N), Ψ(0) = Ψ(L) = 0. Центральна різниця для Ψ''
+# дає симетричну тридіагональну матрицю: на діагоналі ħ²/(mΔx²) + V_j, поруч -ħ²/(2mΔx²).
+# eigh_tridiagonal(select='i') знаходить лише k найнижчих станів (бісекція + обернені ітерації) -
+# O(N·k) замість O(N³) для повної діагоналізації: N = 10⁵ і k = 20 - менше секунди.
+HBAR2_2M = const.hbar**2 / (2 * const.electron_mass) / const.electron_volt * 1e24 # ħ²/2m, еВ·пм²
 
-# 2. Розрахунок для графіка
-x = np.linspace(0, L, 500) # 500 точок всередині ящика
+@st.cache_data(max_entries=8, show_spinner="Розв'язуємо рівняння Шредінгера...")
+def solve_schrodinger(V, L_pm, n_states):
+    # V - потенціал у вузлах сітки (еВ). Кеш ключується вмістом масиву, тож перемикання n не перераховує.
+    dx = L_pm / (V.size + 1)
+    kinetic = HBAR2_2M / dx**2
+    energies, vectors = eigh_tridiagonal(2 * kinetic + V, np.full(V.size - 1, -kinetic),
+                                         select='i', select_range=(0, min(n_states, V.size) - 1))
+    # Дискретна нормування Σψ² = 1 → неперервна ∫|Ψ|² dx = 1; знак - щоб найбільший пік був додатним
+    vectors /= np.sqrt(dx)
+    peak = np.abs(vectors).argmax(axis=0)
+    vectors *= np.sign(vectors[peak, np.arange(vectors.shape[1])])
+    return energies, vectors.T.astype(np.float32)
 
-# Хвильова функція: Psi(x) = sqrt(2/L) * sin(n * pi * x / L)
-psi = np.sqrt(2/L) * np.sin(n * np.pi * x / L)
+def potential_on_grid(x_pm):
+    # V(x) у вузлах для вибраного варіанта (еВ); None, якщо даних ще немає
+    center = L_pm / 2
+    if potential_kind == "Скінченна яма":
+        return np.where(np.abs(x_pm - center) <= well_width / 200 * L_pm, 0.0, well_depth)
+    if potential_kind == "Гармонічний осцилятор":
+        # V = ½mω²(x - L/2)² = (ħω)²/(4·ħ²/2m) · (x - L/2)²
+        return hbar_omega**2 / (4 * HBAR2_2M) * (x_pm - center)**2
+    if potential_kind == "Подвійна яма":
+        b = well_separation / 200 * L_pm
+        return barrier_height * (((x_pm - center) / b)**2 - 1)**2
+    if potential_kind == "Кусково-лінійний (таблиця)":
+        nodes = st.data_editor(
+            pd.DataFrame({"x, пм": [0.0, 0.3 * L_pm, 0.3 * L_pm, 0.7 * L_pm, 0.7 * L_pm, float(L_pm)],
+                          "V, еВ": [50.0, 50.0, 0.0, 20.0, 50.0, 50.0]}),
+            num_rows="dynamic", use_container_width=True, key="potential_nodes")
+        nodes = nodes.dropna().sort_values("x, пм", kind="stable")
+        if len(nodes) < 2:
+            st.warning("Задайте щонайменше два вузли (x, V).")
+            return None
+        # Два вузли з однаковим x дають сходинку
+        return np.interp(x_pm, nodes["x, пм"].to_numpy(float), nodes["V, еВ"].to_numpy(float))
+    uploaded = st.file_uploader("Файл V(x): два стовпці - x (пм) і V (еВ)", type=["csv", "txt"])
+    if uploaded is None:
+        return None
+    try:
+        table = pd.read_csv(uploaded, sep=r"[,;\s]+", engine="python", header=None, comment="#")
+        table = table.apply(pd.to_numeric, errors="coerce").dropna()
+    except (ValueError, pd.errors.ParserError) as err:
+        st.error(f"Не вдалося прочитати файл: {err}")
+        return None
+    if table.shape[1] < 2 or len(table) < 2:
+        st.error("Потрібно щонайменше два рядки з двома числовими стовпцями.")
+        return None
+    table = table.sort_values(table.columns[0], kind="stable")
+    return np.interp(x_pm, table.iloc[:, 0].to_numpy(float), table.iloc[:, 1].to_numpy(float))
 
-# Густина ймовірності: |Psi(x)|^2
-prob_density = psi**2
+if view_mode == "Стаціонарні стани" and potential_kind == "Нескінченна яма (аналітично)":
+    # Використовуємо масу електрона
+    m = const.electron_mass
+    hbar = const.hbar
 
-# --- Графіки ---
+    # --- Розрахункова частина ---
 
-# Конвертуємо x в пікометри для гарного відображення
-x_pm = x * 1e12
+    # 1. Розрахунок енергії
+    # E_n = (n^2 * pi^2 * hbar^2) / (2 * m * L^2)
+    E_joules = (n**2 * np.pi**2 * hbar**2) / (2 * m * L**2)
+    E_eV = E_joules / const.electron_volt # Переводимо в електрон-вольти
 
-# Графік 1: Хвильова функція
-st.subheader("Хвильова функція (Ψ)")
-fig_psi = go.Figure()
+    st.header(f"Рівень n = {n}")
+    st.metric("Енергія рівня (Eₙ)", f"{E_eV:.3f} еВ (електрон-вольт)")
 
-# Потенціальні стінки (для візуалізації)
-fig_psi.add_trace(go.Scatter(x=[0, 0], y=[-np.max(np.abs(psi))*1.2, np.max(np.abs(psi))*1.2], 
-                            mode='lines', line=dict(color='black', width=3), name='Стінка'))
-fig_psi.add_trace(go.Scatter(x=[L_pm, L_pm], y=[-np.max(np.abs(psi))*1.2, np.max(np.abs(psi))*1.2], 
-                            mode='lines', line=dict(color='black', width=3), name='Стінка'))
+    # 2. Розрахунок для графіка
+    x = np.linspace(0, L, 500) # 500 точок всередині ящика
 
-# Сама хвильова функція
-fig_psi.add_trace(go.Scatter(x=x_pm, y=psi, mode='lines', 
-                            line=dict(color='blue', width=3), name=f"Ψ (n={n})"))
-# Нульова лінія
-fig_psi.add_trace(go.Scatter(x=x_pm, y=np.zeros_like(x_pm), mode='lines', 
-                            line=dict(color='gray', width=1, dash='dot'), name='y=0'))
+    # Хвильова функція: Psi(x) = sqrt(2/L) * sin(n * pi * x / L)
+    psi = np.sqrt(2/L) * np.sin(n * np.pi * x / L)
 
-fig_psi.update_layout(
-    xaxis_title="Позиція (x), пм",
-    yaxis_title="Амплітуда (Ψ)",
-    showlegend=False
-)
-st.plotly_chart(fig_psi, use_container_width=True)
-
-# Графік 2: Густина ймовірності
-st.subheader("Густина ймовірності (Ψ²)")
-st.write("Показує, де найімовірніше знайти частинку.")
-fig_prob = go.Figure()
-
-# Стінки
-fig_prob.add_trace(go.Scatter(x=[0, 0], y=[0, np.max(prob_density)*1.2], 
-                             mode='lines', line=dict(color='black', width=3), name='Стінка'))
-fig_prob.add_trace(go.Scatter(x=[L_pm, L_pm], y=[0, np.max(prob_density)*1.2], 
-                             mode='lines', line=dict(color='black', width=3), name='Стінка'))
-
-# Густина ймовірності
-fig_prob.add_trace(go.Scatter(x=x_pm, y=prob_density, mode='lines', 
-                             line=dict(color='red', width=3), name=f"|Ψ|² (n={n})"))
-
-fig_prob.update_layout(
-    xaxis_title="Позиція (x), пм",
-    yaxis_title="Ймовірність (|Ψ|²)",
-    showlegend=False
-)
-st.plotly_chart(fig_prob, use_container_width=True)
\ No newline at end of file
+    # Густина ймовірності: |Psi(x)|^2
+    prob_density = psi**2
+
+    # --- Графіки ---
+
+    # Конвертуємо x в пікометри для гарного відображення
+    x_pm = x * 1e12
+
+    # Графік 1: Хвильова функція
+    st.subheader("Хвильова функція (Ψ)")
+    fig_psi = go.Figure()
+
+    # Потенціальні стінки (для візуалізації)
+    fig_psi.add_trace(go.Scatter(x=[0, 0], y=[-np.max(np.abs(psi))*1.2, np.max(np.abs(psi))*1.2], 
+                                mode='lines', line=dict(color='black', width=3), name='Стінка'))
+    fig_psi.add_trace(go.Scatter(x=[L_pm, L_pm], y=[-np.max(np.abs(psi))*1.2, np.max(np.abs(psi))*1.2], 
+                                mode='lines', line=dict(color='black', width=3), name='Стінка'))
+
+    # Сама хвильова функція
+    fig_psi.add_trace(go.Scatter(x=x_pm, y=psi, mode='lines', 
+                                line=dict(color='blue', width=3), name=f"Ψ (n={n})"))
+    # Нульова лінія
+    fig_psi.add_trace(go.Scatter(x=x_pm, y=np.zeros_like(x_pm), mode='lines', 
+                                line=dict(color='gray', width=1, dash='dot'), name='y=0'))
+
+    fig_psi.update_layout(
+        xaxis_title="Позиція (x), пм",
+        yaxis_title="Амплітуда (Ψ)",
+        showlegend=False
+    )
+    st.plotly_chart(fig_psi, use_container_width=True)
+
+    # Графік 2: Густина ймовірності
+    st.subheader("Густина ймовірності (Ψ²)")
+    st.write("Показує, де найімовірніше знайти частинку.")
+    fig_prob = go.Figure()
+
+    # Стінки
+    fig_prob.add_trace(go.Scatter(x=[0, 0], y=[0, np.max(prob_density)*1.2], 
+                                 mode='lines', line=dict(color='black', width=3), name='Стінка'))
+    fig_prob.add_trace(go.Scatter(x=[L_pm, L_pm], y=[0, np.max(prob_density)*1.2], 
+                                 mode='lines', line=dict(color='black', width=3), name='Стінка'))
+
+    # Густина ймовірності
+    fig_prob.add_trace(go.Scatter(x=x_pm, y=prob_density, mode='lines', 
+                                 line=dict(color='red', width=3), name=f"|Ψ|² (n={n})"))
+
+    fig_prob.update_layout(
+        xaxis_title="Позиція (x), пм",
+        yaxis_title="Ймовірність (|Ψ|²)",
+        showlegend=False
+    )
+    st.plotly_chart(fig_prob, use_container_width=True)
+
+elif view_mode == "Стаціонарні стани":
+    x_num = L_pm * np.arange(1, n_grid + 1) / (n_grid + 1)
+    V = potential_on_grid(x_num)
+    if V is None:
+        st.info("Задайте потенціал, щоб розв'язати рівняння Шредінгера.")
+        st.stop()
+    energies, states = solve_schrodinger(V, L_pm, n_states)
+    n = min(n, energies.size)
+    E_n = energies[n - 1]
+
+    st.header(f"{potential_kind}: рівень n = {n}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Енергія рівня (Eₙ)", f"{E_n:.4f} еВ")
+    if n > 1:
+        col2.metric("Eₙ - Eₙ₋₁", f"{E_n - energies[n - 2]:.4f} еВ")
+    if potential_kind == "Гармонічний осцилятор":
+        exact = hbar_omega * (n - 0.5)
+        col3.metric("Аналітично ħω(n - ½)", f"{exact:.4f} еВ", f"{E_n - exact:+.2e} еВ", delta_color="off",
+                    help="Відхилення - від скінченного кроку сітки та від стінок ящика (для високих рівнів).")
+    elif potential_kind == "Скінченна яма":
+        col3.metric("Зв'язаних рівнів (E < V₀) серед знайдених", f"{int(np.sum(energies < well_depth))}")
+
+    # На графік - не більше 2000 точок на криву
+    show = slice(None, None, max(1, n_grid // 2000))
+    x_show = x_num[show]
+    V_show = V[show]
+    span = max(energies[-1], V_show.max()) - min(energies[0], V_show.min())
+
+    # Графік 1: потенціал, рівні (одна лінія з розривами) та Ψₙ, зміщена на висоту Eₙ
+    st.subheader("Потенціал, рівні енергії та хвильова функція")
+    level_x = np.tile([0.0, float(L_pm), np.nan], energies.size)
+    level_y = np.repeat(energies, 3)
+    psi_n = states[n - 1, show]
+    psi_scale = 0.3 * span / max(np.abs(psi_n).max(), 1e-30)
+    fig_levels = go.Figure()
+    fig_levels.add_trace(go.Scattergl(x=x_show, y=V_show, mode='lines', name='V(x)', line=dict(color='black', width=2)))
+    fig_levels.add_trace(go.Scattergl(x=level_x, y=level_y, mode='lines', name='Рівні Eₙ',
+                                      line=dict(color='lightgray', width=1)))
+    fig_levels.add_trace(go.Scattergl(x=x_show, y=E_n + psi_scale * psi_n, mode='lines', name=f"Ψ (n={n})",
+                                      line=dict(color='blue', width=2)))
+    fig_levels.update_layout(
+        xaxis_title="Позиція (x), пм",
+        yaxis=dict(title="Енергія, еВ", range=[min(energies[0], V_show.min()) - 0.05 * span,
+                                                max(energies[-1], E_n) + 0.35 * span]),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_levels, use_container_width=True)
+
+    # Графік 2: густина ймовірності
+    st.subheader("Густина ймовірності (Ψ²)")
+    fig_prob = go.Figure()
+    fig_prob.add_trace(go.Scattergl(x=x_show, y=psi_n**2, mode='lines', line=dict(color='red', width=3),
+                                    name=f"|Ψ|² (n={n})"))
+    fig_prob.update_layout(
+        xaxis_title="Позиція (x), пм",
+        yaxis_title="Ймовірність (|Ψ|²), 1/пм",
+        showlegend=False
+    )
+    st.plotly_chart(fig_prob, use_container_width=True)
+
+    with st.expander("Таблиця рівнів"):
+        st.dataframe(pd.DataFrame({"n": np.arange(1, energies.size + 1), "Eₙ, еВ": energies}),
+                     use_container_width=True, hide_index=True)
+
+# --- Еволюція суперпозиції ---
+# Ψ(x, t) = Σ cₙ e^(-iEₙt/ħ) φₙ(x), cₙ = ∫ φₙ Ψ(x, 0) dx. Власні функції - одна матриця Φ (K × N),
+# тож проєкція - це Φ·Ψ₀, а всі кадри одразу - добуток матриці фаз (кадри × K) на Φ.
+HBAR_EV_FS = const.hbar / const.electron_volt * 1e15 # ħ, еВ·фс
+
+@st.cache_data(ttl=3600, max_entries=20)
+def evolution_frames(energies, states, coefficients, t_end, n_frames):
+    # Густина |Ψ|² для всіх кадрів (float32 - для передачі в браузер) і середнє положення за індексом вузла
+    t = np.linspace(0, t_end, n_frames)
+    phases = np.exp(-1j * np.outer(t, energies) / HBAR_EV_FS) * coefficients
+    density = np.abs(phases @ states)**2
+    return t, density.astype(np.float32)
+
+if view_mode == "Еволюція суперпозиції Ψ(x, t)":
+    if potential_kind == "Нескінченна яма (аналітично)":
+        # Синуси на сітці x_j = jL/(N+1) точно ортогональні (це базис дискретного синус-перетворення)
+        n_grid = 2000
+        x_num = L_pm * np.arange(1, n_grid + 1) / (n_grid + 1)
+        levels = np.arange(1, n_basis + 1)
+        energies = levels**2 * np.pi**2 * HBAR2_2M / L_pm**2
+        states = np.sqrt(2 / L_pm) * np.sin(np.outer(levels, np.pi * x_num / L_pm))
+    else:
+        x_num = L_pm * np.arange(1, n_grid + 1) / (n_grid + 1)
+        V = potential_on_grid(x_num)
+        if V is None:
+            st.info("Задайте потенціал, щоб розв'язати рівняння Шредінгера.")
+            st.stop()
+        energies, states = solve_schrodinger(V, L_pm, max(n_basis, 2))
+        states = states.astype(np.float64)
+    dx = L_pm / (n_grid + 1)
+
+    if initial_state == "Суперпозиція рівнів":
+        if not superposed_levels:
+            st.info("Виберіть хоча б один рівень.")
+            st.stop()
+        coefficients = np.zeros(energies.size, dtype=complex)
+        coefficients[np.array(superposed_levels) - 1] = 1 / np.sqrt(len(superposed_levels))
+        psi0 = coefficients[:states.shape[0]] @ states
+    else:
+        x0, sigma = packet_x0 / 100 * L_pm, packet_sigma / 100 * L_pm
+        psi0 = np.exp(-((x_num - x0) / (2 * sigma))**2 + 1j * packet_k0 * np.pi / L_pm * x_num)
+        psi0 /= np.sqrt(np.sum(np.abs(psi0)**2) * dx)
+        coefficients = states @ psi0 * dx
+    captured = float(np.sum(np.abs(coefficients)**2))
+
+    T_unit = 2 * np.pi * HBAR_EV_FS / (energies[1] - energies[0]) if energies.size > 1 else 1.0
+    # На графік - не більше 1000 точок (густина гладка, а кадрів сотні)
+    show = slice(None, None, max(1, n_grid // 1000))
+    t_frames, density = evolution_frames(energies, states[:, show], coefficients, t_periods * T_unit, n_frames)
+    x_show = x_num[show]
+    mean_x = density @ x_show / density.sum(axis=1)
+
+    st.header(f"Еволюція Ψ(x, t): {potential_kind.lower()}")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Базисних станів", f"{energies.size}")
+    col2.metric("Захоплена норма Σ|cₙ|²", f"{captured:.6f}",
+                help="Частка початкового стану, що лежить у просторі K найнижчих власних станів.")
+    col3.metric("T = 2πħ / (E₂ - E₁)", f"{T_unit:.4g} фс")
+    if captured < 0.99:
+        st.warning("Пакет погано описується вибраними станами - збільште K або зменште k₀.")
+
+    fig_anim = go.Figure()
+    fig_anim.add_trace(go.Scatter(x=x_show, y=density[0], mode='lines', line=dict(color='red', width=3),
+                                  name='|Ψ(x, t)|²'))
+    fig_anim.add_trace(go.Scatter(x=x_show, y=density[0], mode='lines', line=dict(color='gray', width=1, dash='dot'),
+                                  name='|Ψ(x, 0)|²'))
+    # Кадри лише з першим трейсом: браузер підміняє y, сервер більше нічого не надсилає
+    fig_anim.frames = [go.Frame(data=[go.Scatter(y=density[i])], traces=[0], name=f"{t_frames[i]:.3g}")
+                       for i in range(n_frames)]
+    play_args = dict(frame=dict(duration=40, redraw=False), transition=dict(duration=0), fromcurrent=True)
+    fig_anim.update_layout(
+        title="Густина ймовірності (анімація, t у фс)",
+        xaxis=dict(title="Позиція (x), пм", range=[0, L_pm]),
+        yaxis=dict(title="|Ψ|², 1/пм", range=[0, 1.05 * float(density.max())]),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        updatemenus=[dict(
+            type="buttons", direction="left", x=0, y=-0.15, xanchor="left", yanchor="top",
+            buttons=[
+                dict(label="▶ Відтворити", method="animate", args=[None, play_args]),
+                dict(label="⏸ Пауза", method="animate",
+                     args=[[None], dict(frame=dict(duration=0, redraw=False), mode="immediate")]),
+            ]
+        )],
+        sliders=[dict(
+            x=0.25, len=0.75, y=-0.1, currentvalue=dict(prefix="t = ", suffix=" фс"),
+            steps=[dict(label=f.name, method="animate",
+                        args=[[f.name], dict(mode="immediate", frame=dict(duration=0, redraw=False))])
+                   for f in fig_anim.frames]
+        )]
+    )
+    st.plotly_chart(fig_anim, use_container_width=True)
+
+    col_left, col_right = st.columns(2)
+    fig_mean = go.Figure()
+    fig_mean.add_trace(go.Scatter(x=t_frames / T_unit, y=mean_x, mode='lines', line=dict(color='royalblue', width=2)))
+    fig_mean.update_layout(title="Середнє положення ⟨x⟩(t)", xaxis_title="t / T", yaxis_title="⟨x⟩, пм",
+                           yaxis_range=[0, L_pm])
+    col_left.plotly_chart(fig_mean, use_container_width=True)
+
+    fig_weights = go.Figure()
+    fig_weights.add_trace(go.Bar(x=np.arange(1, energies.size + 1), y=np.abs(coefficients)**2,
+                                 marker_color='seagreen'))
+    fig_weights.update_layout(title="Заселеності рівнів |cₙ|²", xaxis_title="n", yaxis_title="|cₙ|²")
+    col_right.plotly_chart(fig_weights, use_container_width=True)
+
+# --- Прямокутний ящик у 2D / 3D ---
+# E = E₀ · Σ (nᵢ/Lᵢ)², E₀ = π²ħ²/2m, nᵢ = 1, 2, ... Стани з E ≤ E - точки ґратки всередині
+# чверті (восьмої частини) еліпса (еліпсоїда). Перебираємо ґратку по всіх осях, крім найдовшої, порціями,
+# а кількість nᵢ вздовж найдовшої осі до кожної межі гістограми - точно: ⌊L·√(ΔE/E₀)⌋.
+# Так 10⁸ станів рахуються за частки секунди, а пам'ять обмежена розміром порції.
+E0_BOX = np.pi**2 * HBAR2_2M # еВ·пм²
+
+@st.cache_data(ttl=3600, max_entries=10, show_spinner="Підрахунок станів...")
+def count_box_states(lengths, e_max, n_bins=200, chunk=4096):
+    lengths = sorted(lengths) # найдовша вісь - остання, вздовж неї найбільше рівнів
+    edges = np.linspace(0, e_max, n_bins + 1)
+    axis_energies = [E0_BOX * (np.arange(1, int(L * np.sqrt(e_max / E0_BOX)) + 1) / L)**2 for L in lengths[:-1]]
+    e_outer = axis_energies[0]
+    for e_axis in axis_energies[1:]:
+        e_outer = (e_outer[:, None] + e_axis[None, :]).ravel()
+        e_outer = e_outer[e_outer < e_max]
+    cumulative = np.zeros(n_bins + 1, dtype=np.int64)
+    for start in range(0, e_outer.size, chunk):
+        rest = np.clip(edges - e_outer[start:start + chunk, None], 0, None)
+        cumulative += np.floor(lengths[-1] * np.sqrt(rest / E0_BOX)).astype(np.int64).sum(axis=0)
+    return edges, cumulative
+
+def weyl_count(energies, lengths, with_corrections=True):
+    # Асимптотика Вейля для ящика з непроникними стінками, k = √(2mE)/ħ:
+    #   2D: N ≈ A·k²/4π - P·k/4π + 1/4,   3D: N ≈ V·k³/6π² - S·k²/16π + Lₑ·k/16π
+    # (P - периметр, S - площа поверхні, Lₑ - сума довжин усіх ребер)
+    k = np.sqrt(energies / HBAR2_2M)
+    if len(lengths) == 2:
+        a, b = lengths
+        count = a * b * k**2 / (4 * np.pi)
+        if with_corrections:
+            count += -2 * (a + b) * k / (4 * np.pi) + 0.25
+    else:
+        a, b, c = lengths
+        count = a * b * c * k**3 / (6 * np.pi**2)
+        if with_corrections:
+            count += -2 * (a * b + b * c + a * c) * k**2 / (16 * np.pi) + 4 * (a + b + c) * k / (16 * np.pi)
+    return np.where(energies > 0, count, 0.0)
+
+def enumerate_box_states(lengths, e_cut):
+    # Усі стани з E ≤ E_cut, відсортовані за енергією
+    axes = [np.arange(1, int(L * np.sqrt(e_cut / E0_BOX)) + 1) for L in lengths]
+    grids = np.meshgrid(*axes, indexing="ij")
+    quantum = np.stack([g.ravel() for g in grids], axis=1)
+    energies = E0_BOX * np.sum((quantum / np.array(lengths))**2, axis=1)
+    inside = energies <= e_cut
+    quantum, energies = quantum[inside], energies[inside]
+    order = np.argsort(energies, kind="stable")
+    return quantum[order], energies[order]
+
+@st.cache_data(ttl=3600, max_entries=10)
+def box_levels(lengths, n_levels):
+    # Найнижчі рівні повним перебором станів з E ≤ E_cut. Перебір повний, тож усі рівні нижче E_cut
+    # знайдено разом з усіма виродженими станами; E_cut збільшуємо, доки різних рівнів не менше n_levels.
+    # Стартове E_cut - з оцінки Вейля на n_levels станів (рівнів не більше, ніж станів)
+    e_cut = E0_BOX * sum(1 / L**2 for L in lengths)
+    while weyl_count(np.array([e_cut]), lengths)[0] < n_levels + 20:
+        e_cut *= 1.5
+    while True:
+        quantum, energies = enumerate_box_states(lengths, e_cut)
+        # Межі рівнів - там, де енергія змінюється більш ніж на похибку округлення
+        starts = np.flatnonzero(np.diff(energies, prepend=-1.0) > 1e-9 * energies)
+        if starts.size >= n_levels:
+            break
+        e_cut *= 1.5
+    level_states = [states[np.lexsort(states.T[::-1])] for states in np.split(quantum, starts[1:])]
+    return energies[starts], np.diff(starts, append=energies.size), level_states
+
+if view_mode == "Ящик у 2D / 3D (виродження)":
+    axes_names = ("n_x", "n_y", "n_z")[:box_dimension]
+    sum_terms = " + ".join(f"\\frac{{{n}^2}}{{L_{n[-1]}^2}}" for n in axes_names)
+    st.header(f"Прямокутний ящик у {box_dimension}D")
+    st.latex(rf"E_{{{' '.join(axes_names)}}} = \frac{{\pi^2 \hbar^2}}{{2m}} \left( {sum_terms} \right)")
+
+    # Таблиця виродження найнижчих рівнів
+    level_energies, degeneracy, level_states = box_levels(box_lengths, n_levels_table)
+    n_show = min(n_levels_table, level_energies.size)
+    st.subheader("Найнижчі рівні та їх виродження")
+    st.dataframe(pd.DataFrame({
+        "Рівень": np.arange(1, n_show + 1),
+        "E, еВ": level_energies[:n_show],
+        "E / E₁": level_energies[:n_show] / level_energies[0],
+        "Виродження g": degeneracy[:n_show],
+        f"Стани ({', '.join(axes_names)})": [
+            "; ".join(str(tuple(int(v) for v in state)) for state in states[:8]) + (" ..." if len(states) > 8 else "")
+            for states in level_states[:n_show]
+        ],
+    }), use_container_width=True, hide_index=True,
+        column_config={"E, еВ": st.column_config.NumberColumn(format="%.4f"),
+                       "E / E₁": st.column_config.NumberColumn(format="%.4f")})
+    if len(set(box_lengths)) < box_dimension:
+        st.caption("Однакові сторони дають виродження за симетрією (перестановки nᵢ); у кубі трапляється і "
+                   "«випадкове» виродження, напр. (1, 1, 5) і (3, 3, 3) з однаковою сумою n² = 27.")
+
+    # Гістограма густини станів до E_max, за якої (за головним членом Вейля) станів ≈ n_states_total
+    volume = np.prod(box_lengths)
+    if box_dimension == 2:
+        e_max = HBAR2_2M * 4 * np.pi * n_states_total / volume
+    else:
+        e_max = HBAR2_2M * (6 * np.pi**2 * n_states_total / volume)**(2 / 3)
+    edges, cumulative = count_box_states(box_lengths, e_max)
+    centers = 0.5 * (edges[:-1] + edges[1:])
+    width = edges[1] - edges[0]
+    weyl_full = weyl_count(edges, box_lengths)
+    weyl_leading = weyl_count(edges, box_lengths, with_corrections=False)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Станів до E_max", f"{cumulative[-1]:,}")
+    col2.metric("E_max", f"{e_max:.4g} еВ")
+    col3.metric("Відхилення від формули Вейля", f"{(cumulative[-1] - weyl_full[-1]) / cumulative[-1]:+.2e}",
+                help="Відносна різниця точного підрахунку і трьох членів асимптотики Вейля при E_max.")
+
+    st.subheader("Густина станів g(E) = dN/dE")
+    fig_dos = go.Figure()
+    fig_dos.add_trace(go.Bar(x=centers, y=np.diff(cumulative) / width, width=width, name='Точний підрахунок',
+                             marker_color='lightsteelblue'))
+    fig_dos.add_trace(go.Scatter(x=centers, y=np.diff(weyl_full) / width, mode='lines', name='Вейль (з поправками)',
+                                 line=dict(color='red', width=2)))
+    fig_dos.add_trace(go.Scatter(x=centers, y=np.diff(weyl_leading) / width, mode='lines', name='Вейль (головний член)',
+                                 line=dict(color='black', width=1, dash='dash')))
+    fig_dos.update_layout(
+        xaxis_title="Енергія (E), еВ",
+        yaxis_title="Станів на 1 еВ",
+        bargap=0,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_dos, use_container_width=True)
+
+    st.subheader("Кількість станів N(E): відхилення від асимптотики")
+    valid = cumulative[1:] > 0
+    fig_weyl = go.Figure()
+    fig_weyl.add_trace(go.Scatter(x=edges[1:][valid], y=(cumulative[1:] - weyl_leading[1:])[valid] / cumulative[1:][valid],
+                                  mode='lines', name='Головний член', line=dict(color='black', dash='dash')))
+    fig_weyl.add_trace(go.Scatter(x=edges[1:][valid], y=(cumulative[1:] - weyl_full[1:])[valid] / cumulative[1:][valid],
+                                  mode='lines', name='З поправками', line=dict(color='red', width=2)))
+    fig_weyl.add_hline(y=0, line_color="gray")
+    fig_weyl.update_layout(
+        xaxis_title="Енергія (E), еВ",
+        yaxis_title="(N - N_Вейля) / N",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_weyl, use_container_width=True)
@@ -2,16 +2,29 @@ import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
 from scipy.integrate import solve_ivp
+import time
+from duffing_sweep import bifurcation_sweep, duffing_windows, fastest_omega, MAX_OMEGA_DT
+from streaming_integration import linear_windows, StreamingStats
 
 st.title("📈 Вимушені коливання та Резонанс")
 st.write("Модель осцилятора з затуханням та зовнішньою синусоїдальною силою.")
-st.latex(r"m \ddot{x} + b \dot{x} + k x = F_0 \cos(\omega_d t)")
+st.latex(r"m \ddot{x} + b \dot{x} + k x + \beta x^3 = F_0 \cos(\omega_d t)")
 
 # --- Бічна панель ---
+st.sidebar.header("Режим")
+view_mode = st.sidebar.radio(
+    "Що показуємо",
+    ("Часова залежність", "Біфуркаційна діаграма", "Довгий прогін (потоково)"),
+    help="Біфуркаційна діаграма: перетини Пуанкаре (x раз за період сили) для тисяч значень параметра. "
+         "Довгий прогін: інтегрування вікнами до 10⁶ с зі сталою пам'яттю."
+)
+
 st.sidebar.header("Параметри осцилятора")
 m = st.sidebar.slider("Маса (m), кг", 0.1, 10.0, 1.0, key="m_res")
 k = st.sidebar.slider("Жорсткість пружини (k), Н/м", 0.1, 50.0, 10.0, key="k_res")
 b = st.sidebar.slider("Коефіцієнт затухання (b)", 0.0, 5.0, 0.5, key="b_res")
+beta = st.sidebar.slider("Нелінійна жорсткість (β), Н/м³", 0.0, 10.0, 0.0, 0.1,
+                         help="β = 0: лінійний осцилятор. β > 0: осцилятор Дуффінга (жорстка пружина).")
 
 st.sidebar.header("Зовнішня сила")
 F0 = st.sidebar.slider("Амплітуда сили (F₀), Н", 0.0, 50.0, 10.0)
@@ -19,12 +32,29 @@ omega_d = st.sidebar.slider("Частота сили (ω_d), рад/с", 0.1, 10
 
 t_max = st.sidebar.slider("Час симуляції (T), с", 10.0, 200.0, 50.0)
 
+if view_mode == "Біфуркаційна діаграма":
+    st.sidebar.header("Біфуркаційна діаграма")
+    sweep_param = st.sidebar.radio("Параметр розгортки", ("Частота сили (ω_d)", "Амплітуда сили (F₀)"))
+    if sweep_param == "Частота сили (ω_d)":
+        sweep_range = st.sidebar.slider("Діапазон ω_d, рад/с", 0.1, 10.0, (0.5, 6.0), 0.1)
+    else:
+        sweep_range = st.sidebar.slider("Діапазон F₀, Н", 0.0, 100.0, (1.0, 50.0), 0.5)
+    n_sweep = st.sidebar.select_slider("Кількість значень параметра", options=[200, 500, 1000, 2000], value=500)
+    n_transient = st.sidebar.slider("Періодів на перехідний процес", 50, 500, 200, 10)
+    n_record = st.sidebar.slider("Періодів для запису (точок Пуанкаре)", 10, 100, 50, 5)
+elif view_mode == "Довгий прогін (потоково)":
+    st.sidebar.header("Довгий прогін")
+    t_long = st.sidebar.number_input("Тривалість прогону, с", min_value=100.0, max_value=1e6, value=1e4,
+                                     step=1000.0, format="%.0f")
+    n_bins = st.sidebar.select_slider("Точок на графіку", options=[500, 1000, 2000, 5000], value=1000)
+
 # --- Розрахункова частина ---
 
 # 1. Власна частота
 omega0 = np.sqrt(k / m)
 # 2. Резонансна частота (трохи зміщується через затухання)
-omega_res = np.sqrt(omega0**2 - (b/(2*m))**2) if (b/(2*m)) < omega0 else 0
+# Максимум амплітуди вимушених коливань: ω_res = √(ω₀² - 2γ²), γ = b/(2m)
+omega_res = np.sqrt(omega0**2 - 2 * (b/(2*m))**2) if 2 * (b/(2*m))**2 < omega0**2 else 0
 
 st.subheader("Ключові частоти системи")
 col1, col2 = st.columns(2)
@@ -36,39 +66,271 @@ if np.isclose(omega_d, omega_res, atol=0.1):
     st.success("Ви близько до резонансу! Амплітуда має бути великою.")
 
 # --- Розв'язок ДР ---
-# m*x'' + b*x' + k*x = F0*cos(w_d*t)
+# m*x'' + b*x' + k*x + beta*x^3 = F0*cos(w_d*t)
 # y[0] = x
 # y[1] = x' (швидкість)
 # y[0]' = y[1]
-# y[1]' = (F0*cos(w_d*t) - b*y[1] - k*y[0]) / m
+# y[1]' = (F0*cos(w_d*t) - b*y[1] - k*y[0] - beta*y[0]^3) / m
 def model(t, y):
     x, v = y
     dxdt = v
-    dvdt = (F0 * np.cos(omega_d * t) - b * v - k * x) / m
+    dvdt = (F0 * np.cos(omega_d * t) - b * v - k * x - beta * x**3) / m
     return [dxdt, dvdt]
 
-# Початкові умови (зі стану спокою)
-y0 = [0, 0]
-t_span = [0, t_max]
-t_eval = np.linspace(t_span[0], t_span[1], 1000)
-
-sol = solve_ivp(model, t_span, y0, t_eval=t_eval)
-x_values = sol.y[0]
-t_values = sol.t
-
-# --- Графік ---
-st.header("Графік руху x(t)")
-st.write("Спробуйте встановити 'Частоту сили' (ω_d) рівною 'Резонансній частоті' (ω_res).")
-
-fig = go.Figure()
-fig.add_trace(go.Scatter(x=t_values, y=x_values, mode='lines', name='Зміщення (x)'))
-fig.update_layout(
-    title="Залежність зміщення від часу x(t)",
-    xaxis_title="Час (t), с",
-    yaxis_title="Зміщення (x), м"
-)
+# --- Усталений режим (аналітично) ---
+# Після згасання перехідного процесу x(t) = A cos(ω_d t - φ), де
+# A(ω_d) = F₀ / √((k - mω_d²)² + (bω_d)²),  φ(ω_d) = atan2(bω_d, k - mω_d²)
+# Формули працюють з масивами, тому вся резонансна крива - один виклик.
+def steady_state_response(omega_d, m, k, b, F0):
+    re = k - m * omega_d**2
+    im = b * omega_d
+    with np.errstate(divide="ignore"):
+        amplitude = F0 / np.hypot(re, im)
+    phase = np.arctan2(im, re) # Відставання зміщення від сили, від 0 до π
+    return amplitude, phase
+
+if view_mode == "Часова залежність":
+    A_ss, phi_ss = steady_state_response(omega_d, m, k, b, F0)
+    if beta != 0:
+        st.warning("Формули усталеного режиму та резонансна крива - для лінійного осцилятора (β = 0). "
+                   "Нелінійний відгук показує чисельний графік x(t) та біфуркаційна діаграма.")
+
+    st.subheader("Усталений режим")
+    col1, col2 = st.columns(2)
+    col1.metric("Усталена амплітуда", f"{A_ss:.3f} м")
+    col2.metric("Зсув фази (φ)", f"{np.rad2deg(phi_ss):.1f}°",
+                help="На скільки зміщення відстає від зовнішньої сили. На резонансі φ ≈ 90°.")
+
+    # Густа сітка частот + точно ω_res, щоб не пропустити вузький пік
+    omega_curve = np.linspace(0.01, max(10.0, 2 * omega0), 5000)
+    if omega_res > 0:
+        omega_curve = np.union1d(omega_curve, [omega_res])
+    A_curve, phi_curve = steady_state_response(omega_curve, m, k, b, F0)
+    A_curve = np.where(np.isfinite(A_curve), A_curve, np.nan) # b = 0: нескінченний пік на ω₀
+
+    st.header("Резонансна крива A(ω_d)")
+    fig_res = go.Figure()
+    fig_res.add_trace(go.Scatter(x=omega_curve, y=A_curve, mode='lines', name='A(ω_d)',
+                                 line=dict(color='royalblue', width=3)))
+    fig_res.add_trace(go.Scatter(x=[omega_d], y=[A_ss], mode='markers', name='Поточна ω_d',
+                                 marker=dict(color='red', size=12)))
+    if omega_res > 0:
+        fig_res.add_vline(x=omega_res, line=dict(color='gray', dash='dash'),
+                          annotation_text="ω_res", annotation_position="top")
+    fig_res.update_layout(
+        xaxis_title="Частота сили (ω_d), рад/с",
+        yaxis_title="Амплітуда (A), м",
+        yaxis_type="log" if b == 0 else "linear"
+    )
+    st.plotly_chart(fig_res, use_container_width=True)
+
+    fig_phase = go.Figure()
+    fig_phase.add_trace(go.Scatter(x=omega_curve, y=np.rad2deg(phi_curve), mode='lines', name='φ(ω_d)',
+                                   line=dict(color='darkorange', width=3)))
+    fig_phase.add_trace(go.Scatter(x=[omega_d], y=[np.rad2deg(phi_ss)], mode='markers', name='Поточна ω_d',
+                                   marker=dict(color='red', size=12)))
+    fig_phase.update_layout(
+        title="Фазо-частотна характеристика φ(ω_d)",
+        xaxis_title="Частота сили (ω_d), рад/с",
+        yaxis_title="Зсув фази (φ), градуси",
+        yaxis=dict(range=[0, 180])
+    )
+    st.plotly_chart(fig_phase, use_container_width=True)
+
+    # --- Розв'язок ДР ---
+    # Чисельне інтегрування потрібне лише для перехідного процесу (вихід на усталений режим)
+    # Початкові умови (зі стану спокою)
+    y0 = [0, 0]
+    t_span = [0, t_max]
+    t_eval = np.linspace(t_span[0], t_span[1], 1000)
+
+    sol = solve_ivp(model, t_span, y0, t_eval=t_eval)
+    x_values = sol.y[0]
+    t_values = sol.t
+
+    # --- Графік ---
+    st.header("Графік руху x(t): перехідний процес")
+    st.write("Спробуйте встановити 'Частоту сили' (ω_d) рівною 'Резонансній частоті' (ω_res).")
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=t_values, y=x_values, mode='lines', name='Зміщення (x)'))
+    fig.add_trace(go.Scatter(x=t_values, y=A_ss * np.cos(omega_d * t_values - phi_ss), mode='lines',
+                             name='Усталений режим (аналітично)', line=dict(color='gray', dash='dot')))
+    fig.update_layout(
+        title="Залежність зміщення від часу x(t)",
+        xaxis_title="Час (t), с",
+        yaxis_title="Зміщення (x), м",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+# --- Біфуркаційна діаграма (Дуффінг) ---
+# Для кожного значення параметра інтегруємо рівняння з нульових початкових умов,
+# пропускаємо перехідний процес і записуємо x раз за період сили (перетин Пуанкаре).
+# 1 точка на значення - період 1, 2 точки - подвоєння періоду, хмара - хаос.
+# Розгортка ділиться між ядрами (duffing_sweep), а результат кешується за набором параметрів.
+# fixed_value - параметр, що не розгортається (F₀ при розгортці за ω_d і навпаки): положення
+# повзунка розгорнутого параметра лише зсуває червону лінію і кеш не скидає.
+@st.cache_data(ttl=3600, max_entries=20)
+def cached_bifurcation(sweep_param, lo, hi, n_sweep, m, k, b, beta, fixed_value, n_transient, n_record):
+    values = np.linspace(lo, hi, n_sweep)
+    if sweep_param == "Частота сили (ω_d)":
+        section, workers = bifurcation_sweep(values, fixed_value, m, k, b, beta, n_transient, n_record,
+                                             steps_per_period=60)
+    else:
+        section, workers = bifurcation_sweep(fixed_value, values, m, k, b, beta, n_transient, n_record,
+                                             steps_per_period=60)
+    return values, section, workers
+
+if view_mode == "Біфуркаційна діаграма":
+    st.header("Біфуркаційна діаграма")
+    if beta == 0:
+        st.info("При β = 0 осцилятор лінійний: на кожне значення параметра припадає одна точка. "
+                "Збільште β (і F₀), щоб побачити подвоєння періоду та хаос.")
+
+    t_start = time.perf_counter()
+    with st.spinner(f"Інтегрування {n_sweep} осциляторів на {n_transient + n_record} періодів..."):
+        values, section, workers = cached_bifurcation(
+            sweep_param, sweep_range[0], sweep_range[1], n_sweep,
+            m, k, b, beta, F0 if sweep_param == "Частота сили (ω_d)" else omega_d, n_transient, n_record
+        )
+    elapsed = time.perf_counter() - t_start
+    st.caption(f"{n_sweep} значень × {n_transient + n_record} періодів, процесів: {workers}, {elapsed:.2f} с")
+    diverged = ~np.isfinite(section).all(axis=1)
+    if diverged.any():
+        st.warning(f"Для {diverged.sum()} значень параметра розв'язок розбігся навіть зі зменшеним кроком; "
+                   "на діаграмі їх немає, а в частках нижче вони не враховуються.")
+
+    # Кількість різних точок Пуанкаре - оцінка періоду руху
+    rounded = np.round(section, 4)
+    n_distinct = np.array([np.unique(row).size for row in rounded[~diverged]])
+
+    fig_bif = go.Figure()
+    fig_bif.add_trace(go.Scattergl(
+        x=np.repeat(values, n_record), y=section.ravel(),
+        mode='markers', marker=dict(size=2, color='black', opacity=0.5), name='x (перетин Пуанкаре)'
+    ))
+    current = omega_d if sweep_param == "Частота сили (ω_d)" else F0
+    fig_bif.add_vline(x=current, line=dict(color='red', dash='dash'))
+    fig_bif.update_layout(
+        title="x у моменти t = n·2π/ω_d",
+        xaxis_title="Частота сили (ω_d), рад/с" if sweep_param == "Частота сили (ω_d)" else "Амплітуда сили (F₀), Н",
+        yaxis_title="Зміщення (x), м",
+        height=600
+    )
+    st.plotly_chart(fig_bif, use_container_width=True)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Період 1 (одна точка)", f"{np.mean(n_distinct == 1) * 100:.0f} %")
+    col2.metric("Періоди 2–8", f"{np.mean((n_distinct >= 2) & (n_distinct <= 8)) * 100:.0f} %")
+    col3.metric("Складний рух / хаос", f"{np.mean(n_distinct > 8) * 100:.0f} %")
+
+# --- Довгий прогін: потокове інтегрування вікнами ---
+# solve_ivp на весь інтервал тримав би в пам'яті весь t_eval і розв'язок.
+# Тут кожне вікно (~1000 періодів) інтегрується окремо (RK4, 60 кроків на період, але не довше
+# за межу стійкості MAX_OMEGA_DT для найшвидшої частоти з урахуванням β x³), стан переноситься
+# у наступне, а зберігаються лише зведення по бінах (обвідна, енергія) - пам'ять стала.
+# При β = 0 система лінійна: додамо до стану (c, s) = (cos ω_d t, sin ω_d t), і крок RK4 стає
+# множенням на сталу матрицю, яке рахується векторизовано. Нелінійний випадок - скалярний RK4
+# (duffing_windows, ~10⁶ кроків/с): за замовчуванням 10⁶ с проходить за ~40 с, а для дуже жорстких
+# параметрів кількість кроків обмежуємо, щоб прогін не тривав хвилинами.
+MAX_RK4_STEPS = 40_000_000
+
+def driven_step_matrix(m, k, b, F0, omega_d, dt):
+    # Крок для стану [x, v, c, s]. Рядки x, v - той самий RK4, що й у скалярному циклі (сила в моменти
+    # t, t + dt/2, t + dt виражена через c, s), а (c, s) повертаються точно на кут ω_d·dt -
+    # якби їх теж інтегрував RK4, фаза й амплітуда сили повільно дрейфували б.
+    A = np.array([[0.0, 1.0], [-k / m, -b / m]])
+
+    def force(tau):
+        # Внесок у (x', v') від F₀cos(ω_d(t + τ)) = F₀(c·cos ω_dτ - s·sin ω_dτ)
+        return np.array([[0.0, 0.0], [F0 / m * np.cos(omega_d * tau), -F0 / m * np.sin(omega_d * tau)]])
+
+    y = np.hstack((np.eye(2), np.zeros((2, 2)))) # (x, v) як лінійна функція повного стану
+    k1 = A @ y + np.hstack((np.zeros((2, 2)), force(0)))
+    k2 = A @ (y + 0.5 * dt * k1) + np.hstack((np.zeros((2, 2)), force(0.5 * dt)))
+    k3 = A @ (y + 0.5 * dt * k2) + np.hstack((np.zeros((2, 2)), force(0.5 * dt)))
+    k4 = A @ (y + dt * k3) + np.hstack((np.zeros((2, 2)), force(dt)))
+    c, s = np.cos(omega_d * dt), np.sin(omega_d * dt)
+    rotation = np.hstack((np.zeros((2, 2)), [[c, -s], [s, c]]))
+    return np.vstack((y + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4), rotation))
+
+if view_mode == "Довгий прогін (потоково)":
+    st.header("Довгий прогін (потокове інтегрування)")
+    period = 2 * np.pi / max(omega_d, omega0)
+    dt = min(period / 60, MAX_OMEGA_DT / fastest_omega(F0, m, k, beta))
+    t_run = t_long if beta == 0 else min(t_long, MAX_RK4_STEPS * dt)
+    window = min(t_run, 1000 * period)
+    n_windows = int(np.ceil(t_run / window))
+    st.write(f"{n_windows} вікон по {window:.1f} с, крок {dt:.4f} с, записуємо кожну третю точку "
+             "(~20 на період). Результат залишається на сторінці, доки не зміните параметри.")
+    if t_run < t_long:
+        st.warning(f"Нелінійний осцилятор (β ≠ 0) інтегрується скалярним RK4 (~10⁶ кроків/с), тому прогін "
+                   f"обмежено {MAX_RK4_STEPS:,} кроками: {t_run:.0f} с замість {t_long:.0f} с. "
+                   "При β = 0 система лінійна і рахується векторизовано на всю тривалість.")
+
+    run_params = (m, k, b, beta, F0, omega_d, t_long, n_bins)
+    if st.button("Запустити прогін"):
+        if beta == 0:
+            windows = linear_windows(driven_step_matrix(m, k, b, F0, omega_d, dt), [0.0, 0.0, 1.0, 0.0],
+                                     t_run, window, dt, record_every=3)
+        else:
+            windows = duffing_windows(m, k, b, beta, F0, omega_d, [0.0, 0.0], t_run, window, dt, record_every=3)
+        stats = StreamingStats(t_run, n_bins)
+        progress = st.progress(0.0, text="Інтегрування...")
+        t_start = time.perf_counter()
+        for i, (t_w, y_w) in enumerate(windows):
+            x_w, v_w = y_w[:2]
+            if not (np.abs(x_w) < 1e100).all():
+                progress.empty()
+                st.error(f"Розв'язок розбігся біля t ≈ {t_w[0]:.0f} с (крок {dt:.2e} с). "
+                         "Зменшіть F₀ або β.")
+                st.stop()
+            energy_w = 0.5 * m * v_w**2 + 0.5 * k * x_w**2 + 0.25 * beta * x_w**4
+            stats.update(t_w, x_w, energy_w)
+            progress.progress(min((i + 1) / n_windows, 1.0),
+                              text=f"Інтегрування... t = {t_w[-1]:.0f} / {t_run:.0f} с")
+        progress.empty()
+        st.session_state["resonance_stream"] = (run_params, stats, time.perf_counter() - t_start)
+
+    saved = st.session_state.get("resonance_stream")
+    if saved is not None and saved[0] == run_params:
+        _, stats, elapsed = saved
+        t_bins = stats.bin_centers()
+        envelope = stats.envelope()
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Макс. амплітуда", f"{stats.abs_max:.3f} м", help=f"Досягнута при t = {stats.t_abs_max:.1f} с")
+        col2.metric("Амплітуда в кінці прогону", f"{envelope[np.isfinite(envelope)][-1]:.3f} м")
+        col3.metric("Енергія в кінці прогону", f"{stats.energy_last:.3f} Дж")
+        if beta == 0:
+            A_ss, _ = steady_state_response(omega_d, m, k, b, F0)
+            st.info(f"Аналітична усталена амплітуда (β = 0): {A_ss:.3f} м")
+        st.caption(f"Оброблено {stats.n_samples:,} точок за {elapsed:.1f} с; "
+                   f"у пам'яті зберігається {stats.stored_values():,} чисел.")
+
+        fig_env = go.Figure()
+        fig_env.add_trace(go.Scatter(x=t_bins, y=stats.x_max, mode='lines', line=dict(width=0),
+                                     showlegend=False, hoverinfo='skip'))
+        fig_env.add_trace(go.Scatter(x=t_bins, y=stats.x_min, mode='lines', line=dict(width=0),
+                                     fill='tonexty', fillcolor='rgba(65, 105, 225, 0.4)', name='Діапазон x у біні'))
+        fig_env.add_trace(go.Scatter(x=t_bins, y=envelope, mode='lines', line=dict(color='royalblue', width=2),
+                                     name='Обвідна |x|'))
+        fig_env.update_layout(
+            title="Обвідна коливань x(t)",
+            xaxis_title="Час (t), с",
+            yaxis_title="Зміщення (x), м",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fig_env, use_container_width=True)
+
+        fig_energy = go.Figure()
+        fig_energy.add_trace(go.Scatter(x=t_bins, y=np.where(np.isfinite(stats.energy), stats.energy, np.nan),
+                                        mode='lines', line=dict(color='darkorange', width=2), name='Енергія'))
+        fig_energy.update_layout(
+            title="Макс. механічна енергія в біні E(t)",
+            xaxis_title="Час (t), с",
+            yaxis_title="Енергія (E), Дж"
+        )
+        st.plotly_chart(fig_energy, use_container_width=True)
 
-# Знаходимо "сталу" амплітуду (після перехідного процесу)
-# Беремо останню третину симуляції
-steady_state_amplitude = np.max(np.abs(x_values[int(len(x_values) * 2/3):]))
-st.metric("Усталена амплітуда", f"{steady_state_amplitude:.3f} м")
\ No newline at end of file
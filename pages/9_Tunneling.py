@@ -1,93 +1,542 @@
 import streamlit as st
 import numpy as np
 import plotly.graph_objects as go
+import pandas as pd
 import scipy.constants as const
+from scipy.linalg.lapack import zgttrf, zgttrs
+import time
 
 st.title("👻 Квантове тунелювання через бар'єр")
-st.write("Візуалізація хвильової функції частинки, що налітає на потенційний бар'єр.")
+st.write("Візуалізація хвильової функції частинки, що налітає на потенційний бар'єр, "
+         "і точний розв'язок для довільних профілів зі сталих шарів (подвійні бар'єри, надґратки).")
 
 # --- Введення даних ---
-st.sidebar.header("Параметри")
-E_eV = st.sidebar.slider("Енергія частинки (E), еВ", 0.1, 10.0, 5.0, 0.1)
-V0_eV = st.sidebar.slider("Висота бар'єру (V₀), еВ", E_eV + 0.1, 20.0, 10.0, 0.1,
-                          help="V₀ має бути більшим за E для тунелювання.")
-L_pm = st.sidebar.slider("Ширина бар'єру (L), пм", 10, 200, 50, 5)
-
-m = const.electron_mass # Маса електрона
-
-# Переводимо все в СІ
-E = E_eV * const.electron_volt
-V0 = V0_eV * const.electron_volt
-L = L_pm * 1e-12
-hbar = const.hbar
-
-# --- Розрахункова частина ---
-
-# 1. Хвильові числа
-k1 = np.sqrt(2 * m * E) / hbar             # Область I (зліва, x < 0)
-k2 = np.sqrt(2 * m * (V0 - E)) / hbar    # Область II (бар'єр, 0 < x < L)
-k3 = k1                                    # Область III (справа, x > L)
-
-# 2. Розрахунок коефіцієнта проходження (T)
-# Формула Гріфітса для T
-numerator = (2 * k1 * k2)**2
-denominator = (k2**2 - k1**2)**2 * np.sinh(k2 * L)**2 + (2 * k1 * k2)**2 * np.cosh(k2 * L)**2
-T = numerator / denominator
-
-st.header("Ймовірність тунелювання")
-st.metric("Коефіцієнт проходження (T)", f"{T:.3e}",
-          help="Ймовірність того, що частинка пройде крізь бар'єр.")
-
-# --- Графік ---
-st.header("Візуалізація хвильової функції (Re[Ψ])")
-
-# 3. Розрахунок амплітуд для графіка (дуже спрощено, лише для візуалізації!)
-# Ми не будемо точно розв'язувати систему, а покажемо загальний вигляд:
-# A * e^(ik1*x) + B * e^(-ik1*x) | C * e^(-k2*x) + D * e^(k2*x) | F * e^(ik1*x)
-# Це складно. Для візуалізації ми просто покажемо затухаючу експоненту та синусоїди
-x_left = np.linspace(-L*2, 0, 100)
-x_barrier = np.linspace(0, L, 50)
-x_right = np.linspace(L, L*3, 100)
-
-# Амплітуди (приблизні, для красивої картинки)
-A = 1 # Вхідна хвиля
-F = np.sqrt(T) # Хвиля, що пройшла
-R = np.sqrt(1 - T) # Відбита хвиля
-
-psi_left = A * np.cos(k1 * x_left) + R * np.cos(-k1 * x_left + np.pi) # Стояча хвиля
-psi_barrier = (A+R)/2 * np.exp(-k2 * x_barrier) # Затухання (дуже грубе спрощення)
-psi_right = F * np.cos(k1 * (x_right - L)) # Біжуча хвиля
-
-# Переводимо x в пікометри
-x_plot = np.concatenate((x_left, x_barrier, x_right)) * 1e12
-psi_plot = np.concatenate((psi_left, psi_barrier, psi_right))
-
-fig = go.Figure()
-
-# Хвильова функція
-fig.add_trace(go.Scatter(x=x_plot, y=psi_plot, mode='lines', name='Re[Ψ(x)]',
-                         line=dict(color='blue', width=3)))
-
-# Потенційний бар'єр
-fig.add_trace(go.Scatter(
-    x=[0, 0, L_pm, L_pm],
-    y=[0, V0_eV, V0_eV, 0],
-    fill="tozeroy",
-    fillcolor="rgba(255, 0, 0, 0.2)",
-    line=dict(color="red", width=2, dash='dot'),
-    name='Бар\'єр (V₀)'
-))
-
-# Енергія частинки
-fig.add_trace(go.Scatter(x=[np.min(x_plot), np.max(x_plot)], y=[E_eV, E_eV],
-                         mode='lines', line=dict(color='green', width=2, dash='dash'),
-                         name='Енергія (E)'))
-
-fig.update_layout(
-    title="Реальна частина хвильової функції",
-    xaxis_title="Позиція (x), пм",
-    yaxis_title="Енергія (умовні одиниці)",
-    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+st.sidebar.header("Режим")
+page_mode = st.sidebar.radio(
+    "Що розраховуємо",
+    ("Один бар'єр (формула)", "Кусково-сталий профіль (матриці переносу)", "Спектр T(E) (адаптивна сітка)",
+     "Хвильовий пакет (Кранк-Ніколсон)"),
+    help="Матриці переносу: точний Ψ(x) і T(E) для будь-якої послідовності шарів зі сталим потенціалом. "
+         "Спектр: T(E) нижче й вище бар'єра з точками, що згущуються біля резонансів. "
+         "Пакет: гаусів хвильовий пакет налітає на бар'єр (нестаціонарне рівняння Шредінгера)."
 )
-st.plotly_chart(fig, use_container_width=True)
-st.info("Примітка: Графік хвильової функції є спрощеною візуалізацією і не є точним розв'язком рівняння Шредінгера, але якісно показує ефект затухання та проходження.")
\ No newline at end of file
+
+st.sidebar.header("Параметри")
+if page_mode == "Один бар'єр (формула)":
+    E_eV = st.sidebar.slider("Енергія частинки (E), еВ", 0.1, 10.0, 5.0, 0.1)
+    V0_eV = st.sidebar.slider("Висота бар'єру (V₀), еВ", 0.1, 20.0, 10.0, 0.1,
+                              help="При E < V₀ частинка тунелює, при E > V₀ проходить над бар'єром, "
+                                   "але частково відбивається.")
+    L_pm = st.sidebar.slider("Ширина бар'єру (L), пм", 10, 200, 50, 5)
+elif page_mode == "Спектр T(E) (адаптивна сітка)":
+    spectrum_profile = st.sidebar.radio("Профіль", ("Один бар'єр", "Подвійний бар'єр"),
+                                        help="Подвійний бар'єр має дуже вузькі резонанси нижче V₀.")
+    V0_eV = st.sidebar.slider("Висота бар'єру (V₀), еВ", 0.5, 30.0, 10.0, 0.5)
+    L_pm = st.sidebar.slider("Ширина бар'єру (L), пм", 10, 2000, 500, 10)
+    if spectrum_profile == "Подвійний бар'єр":
+        well_width = st.sidebar.slider("Ширина ями між бар'єрами (w), пм", 10, 1000, 200, 10)
+    E_max_ratio = st.sidebar.slider("Енергії до, у V₀", 1.1, 10.0, 3.0, 0.1)
+    point_budget = st.sidebar.select_slider("Бюджет точок", options=[500, 1000, 2000, 5000, 10000, 20000], value=5000)
+    refine_tol = st.sidebar.select_slider("Допуск уточнення", options=[3e-2, 1e-2, 3e-3, 1e-3, 3e-4], value=3e-3,
+                                          help="Інтервал ділиться навпіл, поки зміна T, зміна lg T (/10) "
+                                               "або відхилення від лінійної інтерполяції на ньому більші за допуск.")
+    compare_uniform = st.sidebar.checkbox("Порівняти з рівномірною сіткою 10⁶ точок")
+elif page_mode == "Хвильовий пакет (Кранк-Ніколсон)":
+    V0_eV = st.sidebar.slider("Висота бар'єру (V₀), еВ", 0.5, 30.0, 10.0, 0.5)
+    L_pm = st.sidebar.slider("Ширина бар'єру (L), пм", 10, 500, 50, 5)
+    packet_E = st.sidebar.slider("Середня енергія пакета (E₀), еВ", 0.5, 30.0, 5.0, 0.5)
+    packet_sigma = st.sidebar.slider("Ширина пакета (σ), пм", 50, 1000, 300, 10,
+                                     help="Ширший пакет має вужчий розподіл за енергією, і його T ближче до T(E₀).")
+    n_grid = st.sidebar.select_slider("Точок сітки (N)", options=[10**4, 2 * 10**4, 5 * 10**4, 10**5],
+                                      value=2 * 10**4, format_func=lambda v: f"{v:,}")
+    n_frames = st.sidebar.slider("Кадрів", 20, 300, 100, 10)
+else:
+    E_eV = st.sidebar.slider("Енергія частинки (E), еВ", 0.1, 30.0, 5.0, 0.1)
+    profile_kind = st.sidebar.radio("Профіль V(x)", ("Подвійний бар'єр", "Надґратка (N бар'єрів)",
+                                                      "Таблиця шарів", "Завантажений профіль (CSV)"))
+    if profile_kind in ("Подвійний бар'єр", "Надґратка (N бар'єрів)"):
+        n_barriers = 2 if profile_kind == "Подвійний бар'єр" else st.sidebar.slider("Кількість бар'єрів (N)", 2, 50, 10)
+        barrier_V = st.sidebar.slider("Висота бар'єрів (V₀), еВ", 0.5, 30.0, 10.0, 0.5)
+        barrier_width = st.sidebar.slider("Ширина бар'єра (b), пм", 5, 200, 30, 5)
+        well_width = st.sidebar.slider("Ширина ями між бар'єрами (w), пм", 5, 500, 100, 5)
+    V_right = st.sidebar.number_input("Потенціал праворуч від структури (V_R), еВ", value=0.0, step=0.5,
+                                      help="Ненульове значення - сходинка потенціалу на виході.")
+    n_energies = st.sidebar.select_slider("Точок для T(E)", options=[10**3, 10**4, 10**5], value=10**4,
+                                          format_func=lambda v: f"{v:,}")
+
+# --- Матриці переносу ---
+# У шарі j зі сталим V_j розв'язок переносить вектор (Ψ, Ψ') через товщину d множенням на
+# L_j = [[cos k_j d, sin(k_j d)/k_j], [-k_j sin k_j d, cos k_j d]], k_j = √(2m(E - V_j))/ħ
+# (у бар'єрі k_j уявне, тож тунелювання й надбар'єрний рух описуються однаково, а при E = V_j
+# це точно лінійний розв'язок [[1, d], [0, 1]]). Ψ і Ψ' неперервні на межах, тож окремих матриць
+# меж немає: M = L_(N-2)···L_1. Для масиву енергій це пакетні добутки матриць 2×2 (по масиву на елемент);
+# цикл - лише по шарах. Зростаючий множник e^(|Im k|d) виносимо з кожного шару, а після множення
+# матрицю ще й нормуємо - масштаб накопичуємо в логарифмі, тож товсті бар'єри не переповнюються.
+HBAR2_2M = const.hbar**2 / (2 * const.electron_mass) / const.electron_volt * 1e24 # ħ²/2m, еВ·пм²
+
+def wave_numbers(E, V):
+    # (n_E, n_regions), 1/пм
+    return np.sqrt((np.asarray(E, dtype=float)[..., None] - V + 0j) / HBAR2_2M)
+
+def layer_matrix(k, length):
+    # Елементи L(length) = ((cos, sin/k), (-k·sin, cos)), поділені на e^g, і сам показник g = |Im k|·|length|.
+    # length може бути від'ємною: L(-d) - точна обернена до L(d)
+    growth = np.abs(k.imag * length)
+    forward, backward = np.exp(1j * k * length - growth), np.exp(-1j * k * length - growth)
+    cosine = 0.5 * (forward + backward)
+    # sin(kd)/k при малому kd - ряд Тейлора (різниця експонент втратила б точність, а при k = 0 - 0/0)
+    small = np.abs(k * length) < 1e-3
+    k_safe = np.where(small, 1.0, k)
+    sine_over_k = np.where(small, length * (1 - (k * length)**2 / 6) * np.exp(-growth),
+                           (forward - backward) / (2j * k_safe))
+    return cosine, sine_over_k, 0.5j * k * (forward - backward), growth
+
+def transfer_amplitudes(E, widths, V):
+    # Амплітуди відбиття r і проходження t (падаюча хвиля зліва з амплітудою 1) для масиву енергій.
+    # Добуток 2×2 розписаний поелементно: так пам'ять - кілька масивів (n_E,), а не (n_E, шари, 2, 2)
+    k = wave_numbers(E, V)
+    m11, m12 = np.ones(k.shape[:-1], dtype=complex), np.zeros(k.shape[:-1], dtype=complex)
+    m21, m22 = m12.copy(), m11.copy()
+    log_scale = np.zeros(k.shape[:-1])
+    for j in range(1, V.size - 1):
+        c, s, q, growth = layer_matrix(k[..., j], widths[j - 1])
+        m11, m12, m21, m22 = c * m11 + s * m21, c * m12 + s * m22, q * m11 + c * m21, q * m12 + c * m22
+        scale = np.maximum(np.maximum(np.abs(m11), np.abs(m12)), np.maximum(np.abs(m21), np.abs(m22)))
+        m11, m12, m21, m22 = m11 / scale, m12 / scale, m21 / scale, m22 / scale
+        log_scale += growth + np.log(scale)
+    # Зліва (Ψ, Ψ') = (1 + r, ik_0(1 - r)), справа (t, ik_N t); det L = 1 дає t = 2ik_0 / знаменник
+    k0, kN = k[..., 0], k[..., -1]
+    incoming = 1j * kN * m11 - m21
+    outgoing = 1j * k0 * m22 + k0 * kN * m12
+    r = (outgoing - incoming) / (outgoing + incoming)
+    t = 2j * k0 / (outgoing + incoming) * np.exp(-log_scale)
+    return k, r, t
+
+def transmission(E, widths, V):
+    # T = (k_N/k_0)|t|² - потік, що пройшов; якщо праворуч E < V_N, хвиля там не поширюється і T = 0
+    k, r, t = transfer_amplitudes(E, widths, V)
+    propagating = (k[..., -1].real > 1e-9) & (k[..., 0].real > 1e-9)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        T = np.where(propagating, k[..., -1].real / k[..., 0].real * np.abs(t)**2, 0.0)
+    return T, np.abs(r)**2
+
+@st.cache_data(ttl=3600, max_entries=20)
+def transmission_curve(widths, V, E_max, n_energies):
+    energies = np.linspace(E_max / n_energies, E_max, n_energies)
+    return energies, transmission(energies, widths, V)[0]
+
+def barrier_wavefunction(E, widths, V, x):
+    # Ψ(x) для однієї енергії. Рахуємо справа наліво від розв'язку (1, ik_N) за межею структури:
+    # у цьому напрямку зростає фізична експонента, тож точність не втрачається і в товстих бар'єрах.
+    # На правій межі кожного шару зберігаємо (Ψ, Ψ') і логарифм масштабу, а в кінці нормуємо на
+    # амплітуду падаючої хвилі в x = 0
+    k = wave_numbers(np.array([E]), V)[0]
+    edges = np.concatenate(([0.0], np.cumsum(widths))) # межі шарів
+    right_states = np.empty((V.size, 2), dtype=complex)
+    right_logs = np.zeros(V.size)
+    state, log_scale = np.array([1.0, 1j * k[-1]]), 0.0
+    for j in range(V.size - 2, 0, -1):
+        right_states[j], right_logs[j] = state, log_scale
+        c, s, q, growth = layer_matrix(k[j], -widths[j - 1])
+        state = np.array([c * state[0] + s * state[1], q * state[0] + c * state[1]])
+        scale = np.abs(state).max()
+        state, log_scale = state / scale, log_scale + growth + np.log(scale)
+    # Зліва Ψ = A e^(ik_0 x) + B e^(-ik_0 x)
+    incident = 0.5 * (state[0] + state[1] / (1j * k[0]))
+    reflected = 0.5 * (state[0] - state[1] / (1j * k[0]))
+
+    region = np.searchsorted(edges, x, side="right")
+    psi = np.empty(x.size, dtype=complex)
+    left = region == 0
+    psi[left] = np.exp(1j * k[0] * x[left]) + reflected / incident * np.exp(-1j * k[0] * x[left])
+    right = region == V.size - 1
+    psi[right] = np.exp(1j * k[-1] * (x[right] - edges[-1]) - log_scale) / incident
+    for j in range(1, V.size - 1):
+        inside = region == j
+        c, s, _, growth = layer_matrix(k[j], x[inside] - edges[j])
+        psi[inside] = ((c * right_states[j, 0] + s * right_states[j, 1])
+                       * np.exp(right_logs[j] + growth - log_scale) / incident)
+    return psi
+
+def layers_from_table(table):
+    # Таблиця (ширина, V) → масиви шарів; нечислові рядки та шари з ширинами ≤ 0 відкидаємо
+    if table.shape[1] < 2:
+        raise ValueError("потрібні два стовпці: ширина шару (пм) і V (еВ)")
+    table = table.apply(pd.to_numeric, errors="coerce").dropna()
+    table = table[table.iloc[:, 0] > 0]
+    return table.iloc[:, 0].to_numpy(float), table.iloc[:, 1].to_numpy(float)
+
+# --- Адаптивна сітка енергій ---
+# Рівномірна сітка або пропускає вузькі резонанси T(E), або витрачає більшість точок на гладкі ділянки.
+# Починаємо з рівномірної «затравки» (~4 точки на очікуване коливання T над бар'єром і на рівень у ямі)
+# і раундами ділимо навпіл інтервали з найбільшою оцінкою похибки: зміною T, зміною lg T
+# (видно хвости вузьких піків, де саме T ще ≈ 0) і відхиленням середини від лінійної інтерполяції.
+def refinement_scores(E, T):
+    log_T = np.log10(np.maximum(T, 1e-300))
+    change = np.maximum(np.abs(np.diff(T)), np.abs(np.diff(log_T)) / 10)
+    # Кривизна: наскільки внутрішня точка відхиляється від прямої через сусідів (для обох її інтервалів)
+    weight = (E[1:-1] - E[:-2]) / (E[2:] - E[:-2])
+    bend = np.abs(T[1:-1] - (T[:-2] + weight * (T[2:] - T[:-2])))
+    curvature = np.zeros(E.size - 1)
+    curvature[:-1] = bend
+    curvature[1:] = np.maximum(curvature[1:], bend)
+    return np.maximum(change, curvature)
+
+@st.cache_data(ttl=3600, max_entries=20, show_spinner="Уточнення сітки енергій...")
+def adaptive_transmission(widths, V, e_min, e_max, n_seed, budget, tol):
+    E = np.linspace(e_min, e_max, n_seed)
+    T = transmission(E, widths, V)[0]
+    min_width = (e_max - e_min) * 1e-12
+    rounds = 0
+    while E.size < budget:
+        scores = refinement_scores(E, T)
+        scores[np.diff(E) < min_width] = 0.0
+        candidates = np.flatnonzero(scores > tol)
+        if candidates.size == 0:
+            break
+        # Не більше, ніж дозволяє бюджет, - найгірші інтервали першими
+        candidates = candidates[np.argsort(scores[candidates])[::-1][:budget - E.size]]
+        midpoints = 0.5 * (E[candidates] + E[candidates + 1])
+        E = np.concatenate((E, midpoints))
+        T = np.concatenate((T, transmission(midpoints, widths, V)[0]))
+        order = np.argsort(E, kind="stable")
+        E, T = E[order], T[order]
+        rounds += 1
+    return E, T, rounds
+
+if page_mode == "Один бар'єр (формула)":
+    m = const.electron_mass # Маса електрона
+
+    # Переводимо все в СІ
+    E = E_eV * const.electron_volt
+    V0 = V0_eV * const.electron_volt
+    L = L_pm * 1e-12
+    hbar = const.hbar
+
+    # --- Розрахункова частина ---
+
+    # 1. Хвильові числа
+    k1 = np.sqrt(2 * m * E) / hbar             # Область I (зліва, x < 0)
+    k2 = np.sqrt(2 * m * abs(V0 - E)) / hbar # Область II (бар'єр, 0 < x < L): κ при E < V₀, k при E > V₀
+    k3 = k1                                    # Область III (справа, x > L)
+
+    # 2. Розрахунок коефіцієнта проходження (T)
+    # Формула Гріфітса для T; над бар'єром sinh → sin, cosh → cos (k₂ стає дійсним)
+    numerator = (2 * k1 * k2)**2
+    if E < V0:
+        denominator = (k2**2 - k1**2)**2 * np.sinh(k2 * L)**2 + (2 * k1 * k2)**2 * np.cosh(k2 * L)**2
+        T = numerator / denominator
+    elif E > V0:
+        denominator = (k2**2 - k1**2)**2 * np.sin(k2 * L)**2 + (2 * k1 * k2)**2
+        T = numerator / denominator
+    else:
+        T = 1 / (1 + (k1 * L / 2)**2) # Межа E → V₀ обох формул
+
+    st.header("Ймовірність тунелювання" if E < V0 else "Ймовірність проходження над бар'єром")
+    st.metric("Коефіцієнт проходження (T)", f"{T:.3e}",
+              help="Ймовірність того, що частинка пройде крізь бар'єр.")
+
+    # --- Графік ---
+    st.header("Візуалізація хвильової функції (Re[Ψ])")
+
+    # 3. Точна хвильова функція (матриці переносу, див. нижче) з амплітудою падаючої хвилі 1
+    x_plot = np.linspace(-2 * L_pm, 3 * L_pm, 600)
+    psi_plot = barrier_wavefunction(E_eV, np.array([L_pm]), np.array([0.0, V0_eV, 0.0]), x_plot).real
+
+    fig = go.Figure()
+
+    # Хвильова функція
+    fig.add_trace(go.Scatter(x=x_plot, y=psi_plot, mode='lines', name='Re[Ψ(x)]',
+                             line=dict(color='blue', width=3)))
+
+    # Потенційний бар'єр
+    fig.add_trace(go.Scatter(
+        x=[0, 0, L_pm, L_pm],
+        y=[0, V0_eV, V0_eV, 0],
+        fill="tozeroy",
+        fillcolor="rgba(255, 0, 0, 0.2)",
+        line=dict(color="red", width=2, dash='dot'),
+        name='Бар\'єр (V₀)'
+    ))
+
+    # Енергія частинки
+    fig.add_trace(go.Scatter(x=[np.min(x_plot), np.max(x_plot)], y=[E_eV, E_eV],
+                             mode='lines', line=dict(color='green', width=2, dash='dash'),
+                             name='Енергія (E)'))
+
+    fig.update_layout(
+        title="Реальна частина хвильової функції",
+        xaxis_title="Позиція (x), пм",
+        yaxis_title="Енергія (умовні одиниці)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.info("Ψ(x) - точний розв'язок рівняння Шредінгера: біжуча хвиля з амплітудою 1 зліва, відбита хвиля, "
+            "затухання в бар'єрі та хвиля, що пройшла, з амплітудою |t| = √T.")
+
+elif page_mode == "Кусково-сталий профіль (матриці переносу)":
+    # --- Профіль з шарів ---
+    if profile_kind in ("Подвійний бар'єр", "Надґратка (N бар'єрів)"):
+        widths = np.tile([barrier_width, well_width], n_barriers)[:-1].astype(float)
+        potentials = np.tile([barrier_V, 0.0], n_barriers)[:-1]
+    elif profile_kind == "Таблиця шарів":
+        layers = st.data_editor(
+            pd.DataFrame({"Ширина, пм": [30.0, 60.0, 30.0], "V, еВ": [8.0, 2.0, 8.0]}),
+            num_rows="dynamic", use_container_width=True, key="tunneling_layers")
+        widths, potentials = layers_from_table(layers)
+    else:
+        uploaded = st.file_uploader("Профіль: два стовпці - ширина шару (пм) і V (еВ), по рядку на шар",
+                                    type=["csv", "txt"])
+        if uploaded is None:
+            st.stop()
+        try:
+            widths, potentials = layers_from_table(pd.read_csv(uploaded, sep=r"[,;\s]+", engine="python",
+                                                               header=None, comment="#"))
+        except (ValueError, pd.errors.ParserError) as err:
+            st.error(f"Не вдалося прочитати файл: {err}")
+            st.stop()
+    if widths.size == 0:
+        st.warning("Задайте хоча б один шар з додатною шириною.")
+        st.stop()
+    V_regions = np.concatenate(([0.0], potentials, [V_right]))
+    total_width = widths.sum()
+
+    T_E, R_E = transmission(np.array([E_eV]), widths, V_regions)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Коефіцієнт проходження (T)", f"{T_E[0]:.4e}")
+    col2.metric("Коефіцієнт відбиття (R)", f"{R_E[0]:.4e}")
+    col3.metric("T + R", f"{T_E[0] + R_E[0]:.12f}", help="Збереження потоку ймовірності: має дорівнювати 1.")
+
+    # Хвильова функція: структура і по кілька довжин хвиль з обох боків
+    k_left = np.sqrt(E_eV / HBAR2_2M)
+    margin = max(0.5 * total_width, 4 * np.pi / k_left)
+    x_plot = np.linspace(-margin, total_width + margin, 3000)
+    psi = barrier_wavefunction(E_eV, widths, V_regions, x_plot)
+    x_profile = np.concatenate(([-margin], np.repeat(np.cumsum(np.concatenate(([0.0], widths))), 2), [total_width + margin]))
+    V_profile = np.repeat(V_regions, 2)
+
+    st.header("Хвильова функція")
+    fig_psi = go.Figure()
+    fig_psi.add_trace(go.Scatter(x=x_profile, y=V_profile, mode='lines', name='V(x), еВ', yaxis='y2',
+                                 line=dict(color='red', width=2), fill='tozeroy', fillcolor='rgba(255, 0, 0, 0.1)'))
+    fig_psi.add_trace(go.Scatter(x=x_plot, y=psi.real, mode='lines', name='Re Ψ', line=dict(color='blue', width=2)))
+    fig_psi.add_trace(go.Scatter(x=x_plot, y=np.abs(psi), mode='lines', name='|Ψ|', line=dict(color='black', width=1)))
+    fig_psi.update_layout(
+        xaxis_title="Позиція (x), пм",
+        yaxis=dict(title="Ψ (падаюча хвиля з амплітудою 1)"),
+        yaxis2=dict(title="V, еВ", overlaying='y', side='right', showgrid=False),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    st.plotly_chart(fig_psi, use_container_width=True)
+
+    # T(E) для всіх енергій одним пакетним розрахунком
+    st.header("Коефіцієнт проходження T(E)")
+    # Межа повзунка з профілю: таблиця і V_R не обмежені, а T(E) цікаве й над найвищим бар'єром
+    E_top = float(max(100.0, np.ceil(2 * V_regions.max())))
+    E_max = st.slider("Енергії до, еВ", 1.0, E_top, float(max(30.0, 1.5 * V_regions.max())), 1.0)
+    energies, T_curve = transmission_curve(widths, V_regions, E_max, n_energies)
+    fig_T = go.Figure()
+    fig_T.add_trace(go.Scattergl(x=energies, y=np.maximum(T_curve, 1e-30), mode='lines', name='T(E)',
+                                 line=dict(color='royalblue', width=1)))
+    fig_T.add_vline(x=E_eV, line_dash="dash", line_color="green", annotation_text="E")
+    fig_T.update_layout(xaxis_title="Енергія (E), еВ", yaxis=dict(title="T", type="log", range=[-12, 0.1]))
+    st.plotly_chart(fig_T, use_container_width=True)
+    st.caption(f"{n_energies:,} енергій, {widths.size} шарів - пакетні добутки матриць 2×2 без циклу по енергіях. "
+               "Гострі піки - резонансне тунелювання через квазізв'язані стани між бар'єрами.")
+
+if page_mode == "Спектр T(E) (адаптивна сітка)":
+    if spectrum_profile == "Один бар'єр":
+        widths, V_regions = np.array([float(L_pm)]), np.array([0.0, V0_eV, 0.0])
+        well_span = 0.0
+    else:
+        widths, V_regions = np.array([float(L_pm), well_width, L_pm]), np.array([0.0, V0_eV, 0.0, V0_eV, 0.0])
+        well_span = well_width
+    e_min, e_max = 1e-3 * V0_eV, E_max_ratio * V0_eV
+    # Затравка: над бар'єром T осцилює з періодом π/L за k = √((E - V₀)/(ħ²/2m)); у ямі - по рівню на π/w за k
+    n_oscillations = (L_pm * np.sqrt((e_max - V0_eV) / HBAR2_2M) + well_span * np.sqrt(e_max / HBAR2_2M)) / np.pi
+    n_seed = int(min(max(200, 4 * n_oscillations), point_budget // 4))
+    E_grid, T_grid, n_rounds = adaptive_transmission(widths, V_regions, e_min, e_max, n_seed, point_budget, refine_tol)
+
+    st.header("Спектр проходження T(E)")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Обчислень T", f"{E_grid.size:,}", help=f"Затравка {n_seed} точок + {n_rounds} раундів уточнення.")
+    smallest_step = np.diff(E_grid).min()
+    col2.metric("Найменший крок", f"{smallest_step:.2e} еВ")
+    col3.metric("Рівномірна сітка з таким кроком", f"{(e_max - e_min) / smallest_step:,.0f} точок")
+    if E_grid.size >= point_budget:
+        st.warning("Бюджет точок вичерпано до досягнення допуску - збільште бюджет або послабте допуск.")
+
+    log_scale = st.checkbox("Логарифмічна шкала T", value=spectrum_profile == "Подвійний бар'єр")
+    fig_spec = go.Figure()
+    fig_spec.add_trace(go.Scattergl(x=E_grid, y=np.maximum(T_grid, 1e-30), mode='lines+markers', name='T(E)',
+                                    line=dict(color='royalblue', width=1), marker=dict(size=3, color='black')))
+    fig_spec.add_vline(x=V0_eV, line_dash="dash", line_color="red", annotation_text="V₀")
+    fig_spec.update_layout(
+        title="Точки - місця, де обчислено T: вони згущуються біля резонансів",
+        xaxis_title="Енергія (E), еВ",
+        yaxis=dict(title="T", type="log", range=[-12, 0.1]) if log_scale else dict(title="T", range=[0, 1.05])
+    )
+    st.plotly_chart(fig_spec, use_container_width=True)
+
+    # Густина точок по енергії - видно, куди пішов бюджет
+    fig_density = go.Figure()
+    fig_density.add_trace(go.Histogram(x=E_grid, nbinsx=200, marker_color='gray'))
+    fig_density.update_layout(title="Розподіл точок сітки", xaxis_title="Енергія (E), еВ", yaxis_title="Точок")
+    st.plotly_chart(fig_density, use_container_width=True)
+
+    if compare_uniform:
+        E_dense, T_dense = transmission_curve(widths, V_regions, e_max, 10**6)
+        inside = E_dense >= e_min
+        error = np.abs(np.interp(E_dense[inside], E_grid, T_grid) - T_dense[inside])
+        col1, col2 = st.columns(2)
+        col1.metric("Макс. похибка лінійної інтерполяції", f"{error.max():.2e}")
+        col2.metric("Пік T на рівномірній сітці / на адаптивній", f"{T_dense.max():.6f} / {T_grid.max():.6f}",
+                    help="Вузькі резонанси, яких не зачепила рівномірна сітка, мають пік T < 1.")
+
+# --- Хвильовий пакет: схема Кранка-Ніколсон ---
+# (1 + iΔt·H/2ħ) ψ^(n+1) = (1 - iΔt·H/2ħ) ψ^n, H - тридіагональна матриця скінченних різниць.
+# Схема унітарна (норма зберігається) і стійка за будь-якого Δt. Матриця ліворуч від часу не залежить,
+# тож LU-розклад (LAPACK gttrf) робимо один раз, а на кожному кроці лише підстановки gttrs - O(N)
+# без повторної факторизації, яка інакше забирає більшу частину часу кроку.
+HBAR_EV_FS = const.hbar / const.electron_volt * 1e15 # ħ, еВ·фс
+
+def packet_geometry(packet_E, packet_sigma, L_pm):
+    # Пакет стартує за 5σ ліворуч від бар'єра. Розрахунок іде, доки повільні компоненти (k₀ - 3Δk, Δk = 1/2σ,
+    # але не менше k₀/4) не відійдуть на 5σ праворуч. Поле [-D, L + D] таке, щоб швидкі (k₀ + 3Δk)
+    # за цей час не дійшли до стінок
+    k0 = np.sqrt(packet_E / HBAR2_2M)
+    dk = 1 / (2 * packet_sigma)
+    v_slow = 2 * HBAR2_2M * max(k0 - 3 * dk, k0 / 4) / HBAR_EV_FS # групова швидкість, пм/фс
+    v_fast = 2 * HBAR2_2M * (k0 + 3 * dk) / HBAR_EV_FS
+    t_end = (10 * packet_sigma + L_pm) / v_slow
+    return k0, t_end, v_fast * t_end + 5 * packet_sigma
+
+def crank_nicolson_frames(V0_eV, L_pm, packet_E, packet_sigma, n_grid, n_frames):
+    # Генератор кадрів: кожен кадр віддається одразу після розрахунку
+    k0, t_end, margin = packet_geometry(packet_E, packet_sigma, L_pm)
+    x = np.linspace(-margin, L_pm + margin, n_grid)
+    dx = x[1] - x[0]
+    # Частка комірки [x - dx/2, x + dx/2], зайнята бар'єром: ширина не округлюється до кратної dx
+    V = V0_eV * np.clip(np.minimum(x + dx / 2, L_pm) - np.maximum(x - dx / 2, 0), 0, dx) / dx
+    psi = np.exp(-((x + 5 * packet_sigma) / (2 * packet_sigma))**2 + 1j * k0 * x)
+    psi /= np.sqrt(np.sum(np.abs(psi)**2) * dx)
+
+    # Крок: фаза найшвидших помітних компонент пакета (k₀ + 4Δk, Δk = 1/2σ) за крок не більше 0.1 рад
+    E_high = HBAR2_2M * (k0 + 2 / packet_sigma)**2
+    steps_per_frame = max(1, int(np.ceil(t_end / n_frames / (0.1 * HBAR_EV_FS / E_high))))
+    dt = t_end / (n_frames * steps_per_frame)
+
+    a = HBAR2_2M / dx**2
+    beta = 1j * dt / (2 * HBAR_EV_FS)
+    diag_H = 2 * a + V # Hψ_j = -a ψ_(j-1) + (2a + V_j) ψ_j - a ψ_(j+1)
+    off = np.full(n_grid - 1, -beta * a)
+    lu = zgttrf(off, 1 + beta * diag_H, off)[:5]
+    rhs_diag = 1 - beta * diag_H
+
+    show = slice(None, None, max(1, n_grid // 2000))
+    right = x > L_pm
+    left = x < 0
+    for frame in range(n_frames + 1):
+        if frame:
+            for _ in range(steps_per_frame):
+                # Права частина (1 - iΔt·H/2ħ)ψ зсувами масиву, далі лише підстановки з готовим LU
+                rhs = rhs_diag * psi
+                rhs[1:] += beta * a * psi[:-1]
+                rhs[:-1] += beta * a * psi[1:]
+                psi = zgttrs(*lu, rhs)[0]
+        density = np.abs(psi)**2
+        yield {
+            "t": frame * steps_per_frame * dt,
+            "x": x[show].astype(np.float32),
+            "density": density[show].astype(np.float32),
+            "norm": np.sum(density) * dx,
+            "transmitted": np.sum(density[right]) * dx,
+            "reflected": np.sum(density[left]) * dx,
+            "steps": frame * steps_per_frame,
+            "dt": dt,
+        }
+
+def packet_figure(frame, V0_eV, L_pm, y_max):
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=frame["x"], y=frame["density"], mode='lines', name='|Ψ(x, t)|²',
+                               line=dict(color='blue', width=2)))
+    fig.add_vrect(x0=0, x1=L_pm, fillcolor="red", opacity=0.2, line_width=0,
+                  annotation_text=f"V₀ = {V0_eV:g} еВ", annotation_position="top left")
+    fig.update_layout(
+        title=f"Хвильовий пакет, t = {frame['t']:.3f} фс",
+        xaxis_title="Позиція (x), пм",
+        yaxis=dict(title="|Ψ|², 1/пм", range=[0, y_max]),
+        showlegend=False
+    )
+    return fig
+
+def packet_averaged_transmission(V0_eV, L_pm, packet_E, packet_sigma):
+    # Аналітичне T(E), усереднене за розподілом пакета за імпульсами |φ(k)|² ∝ exp(-2σ²(k - k₀)²);
+    # компоненти з k ≤ 0 до бар'єра не доходять
+    k0 = np.sqrt(packet_E / HBAR2_2M)
+    k = np.linspace(k0 - 3 / packet_sigma, k0 + 3 / packet_sigma, 4001)
+    weights = np.exp(-2 * packet_sigma**2 * (k - k0)**2)
+    T_k = np.zeros_like(k)
+    moving = k > 0
+    T_k[moving] = transmission(HBAR2_2M * k[moving]**2, np.array([float(L_pm)]), np.array([0.0, V0_eV, 0.0]))[0]
+    return np.sum(weights * T_k) / np.sum(weights)
+
+if page_mode == "Хвильовий пакет (Кранк-Ніколсон)":
+    st.header("Гаусів пакет налітає на бар'єр")
+    st.write("Нестаціонарне рівняння Шредінгера розв'язується за схемою Кранка-Ніколсон. Кадри з'являються "
+             "по мірі розрахунку; результат лишається на сторінці, доки не зміните параметри.")
+
+    run_params = (V0_eV, L_pm, packet_E, packet_sigma, n_grid, n_frames)
+    y_max = 1.1 / (np.sqrt(2 * np.pi) * packet_sigma) # з запасом над піком початкової густини
+    if st.button("Запустити моделювання"):
+        progress = st.progress(0.0, text="Розрахунок...")
+        slot = st.empty()
+        history = []
+        t_start = time.perf_counter()
+        for i, frame in enumerate(crank_nicolson_frames(*run_params)):
+            history.append((frame["t"], frame["transmitted"], frame["reflected"], frame["norm"]))
+            slot.plotly_chart(packet_figure(frame, V0_eV, L_pm, y_max), use_container_width=True, key=f"packet_{i}")
+            progress.progress(i / n_frames, text=f"Кадр {i} з {n_frames}, t = {frame['t']:.3f} фс")
+        progress.empty()
+        slot.empty()
+        st.session_state["tunneling_packet"] = (run_params, frame, np.array(history), time.perf_counter() - t_start)
+
+    saved = st.session_state.get("tunneling_packet")
+    if saved is None or saved[0] != run_params:
+        st.info("Натисніть «Запустити моделювання».")
+    else:
+        _, frame, history, elapsed = saved
+        t_hist, transmitted, reflected, norm = history.T
+        T_centre = transmission(np.array([packet_E]), np.array([float(L_pm)]), np.array([0.0, V0_eV, 0.0]))[0][0]
+        T_packet = packet_averaged_transmission(V0_eV, L_pm, packet_E, packet_sigma)
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Пройшло (чисельно)", f"{transmitted[-1]:.4f}",
+                    help="∫|Ψ|² dx праворуч від бар'єра в останньому кадрі.")
+        col2.metric("T, усереднене за пакетом", f"{T_packet:.4f}",
+                    help="Аналітичне T(E) з вагою розподілу пакета за енергіями; має збігатися з чисельним.")
+        col3.metric("T(E₀) для центральної енергії", f"{T_centre:.4f}",
+                    help="Пакет має ненульову ширину за енергією, тому вузькому пакету відповідає усереднене T.")
+        if np.sqrt(packet_E / HBAR2_2M) * packet_sigma < 2:
+            st.warning("Пакет вузький (k₀σ < 2): у ньому багато повільних компонент, частина з яких ще не "
+                       "дійшла до бар'єра, тому чисельне значення може помітно відрізнятися від усередненого T.")
+        st.caption(f"Норма: {norm[0]:.8f} → {norm[-1]:.8f}. {frame['steps']:,} кроків Δt = {frame['dt']:.2e} фс "
+                   f"на {n_grid:,} точках за {elapsed:.1f} с разом з відмальовкою кадрів.")
+
+        st.plotly_chart(packet_figure(frame, V0_eV, L_pm, y_max), use_container_width=True)
+
+        fig_split = go.Figure()
+        fig_split.add_trace(go.Scatter(x=t_hist, y=transmitted, mode='lines', name='Праворуч (пройшло)',
+                                       line=dict(color='seagreen', width=2)))
+        fig_split.add_trace(go.Scatter(x=t_hist, y=reflected, mode='lines', name='Ліворуч (відбито)',
+                                       line=dict(color='crimson', width=2)))
+        fig_split.add_trace(go.Scatter(x=t_hist, y=norm - transmitted - reflected, mode='lines', name="У бар'єрі",
+                                       line=dict(color='gray', width=1)))
+        fig_split.add_hline(y=T_packet, line_dash="dash", line_color="seagreen", annotation_text="T пакета")
+        fig_split.update_layout(
+            title="Розподіл імовірності з часом",
+            xaxis_title="Час (t), фс",
+            yaxis_title="Імовірність",
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+        )
+        st.plotly_chart(fig_split, use_container_width=True)
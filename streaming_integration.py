@@ -0,0 +1,89 @@
+# Потокове (віконне) інтегрування довгих прогонів з обмеженою пам'яттю.
+# Замість одного solve_ivp на весь інтервал із величезним t_eval рахуємо вікно за вікном,
+# передаючи кінцевий стан вікна як початковий для наступного. Від кожного вікна
+# зберігаємо лише зведення у фіксованій кількості бінів для графіка, тож пам'ять
+# не залежить від тривалості прогону.
+
+import numpy as np
+
+
+def rk4_step_matrix(A, dt):
+    # Для лінійної автономної системи y' = A y крок RK4 - множення на сталу матрицю
+    # M = I + hA + (hA)²/2 + (hA)³/6 + (hA)⁴/24 (h = dt): розклад k1..k4 дає саме цей поліном.
+    hA = dt * np.asarray(A, dtype=float)
+    M = np.eye(hA.shape[0])
+    term = np.eye(hA.shape[0])
+    for n in range(1, 5):
+        term = term @ hA / n
+        M = M + term
+    return M
+
+
+def linear_windows(M, y0, t_max, window, dt, record_every=1):
+    # Генератор: на кожне вікно повертає (t, y) лише цього вікна - кожну record_every-ту точку
+    # з кроком dt. Крок - множення на сталу матрицю M (напр. rk4_step_matrix). Записані стани вікна - y_j = Q^j y_0, Q = M^record_every;
+    # рахуємо їх подвоєнням (y_(n..2n-1) = Q^n · y_(0..n-1)) - log₂(n) матричних множень замість
+    # циклу по кроках. Результат - той самий дискретний розв'язок RK4 з його похибкою (напр. дрейфом енергії).
+    Q = np.linalg.matrix_power(M, record_every)
+    y = np.asarray(y0, dtype=float)
+    t0 = 0.0
+    steps_per_window = max(1, int(round(window / dt)))
+    while t0 < t_max - 0.5 * dt:
+        n_steps = min(steps_per_window, int(round((t_max - t0) / dt)))
+        n_rec = n_steps // record_every + 1
+        ys = np.empty((y.size, n_rec))
+        ys[:, 0] = y
+        filled, power = 1, Q
+        while filled < n_rec:
+            n_new = min(filled, n_rec - filled)
+            ys[:, filled:filled + n_new] = power @ ys[:, :n_new]
+            filled += n_new
+            power = power @ power
+        ts = t0 + np.arange(n_rec) * (record_every * dt)
+        # Кінець вікна може не збігатися із записаною точкою - доганяємо залишок кроків
+        y = np.linalg.matrix_power(M, n_steps % record_every) @ ys[:, -1]
+        t0 += n_steps * dt
+        yield ts, ys
+
+
+class StreamingStats:
+    # Накопичує статистики потоку вікон у n_bins бінах на [0, t_max]:
+    # мінімум і максимум x (обвідна), максимум енергії в біні та глобальний максимум |x|.
+
+    def __init__(self, t_max, n_bins=1000):
+        self.edges = np.linspace(0, t_max, n_bins + 1)
+        self.x_min = np.full(n_bins, np.inf)
+        self.x_max = np.full(n_bins, -np.inf)
+        self.energy = np.full(n_bins, -np.inf)
+        self.abs_max = 0.0
+        self.t_abs_max = 0.0
+        self.n_samples = 0
+        self.t_last = 0.0
+        self.energy_last = np.nan
+
+    def update(self, t, x, energy):
+        idx = np.clip(np.searchsorted(self.edges, t, side="right") - 1, 0, self.x_min.size - 1)
+        # t відсортований, тому бін - це суцільний відрізок: reduceat замість циклу
+        starts = np.flatnonzero(np.diff(idx, prepend=-1))
+        bins = idx[starts]
+        self.x_min[bins] = np.minimum(self.x_min[bins], np.minimum.reduceat(x, starts))
+        self.x_max[bins] = np.maximum(self.x_max[bins], np.maximum.reduceat(x, starts))
+        self.energy[bins] = np.maximum(self.energy[bins], np.maximum.reduceat(energy, starts))
+
+        i = np.argmax(np.abs(x))
+        if abs(x[i]) > self.abs_max:
+            self.abs_max, self.t_abs_max = abs(x[i]), t[i]
+        self.n_samples += t.size
+        self.t_last, self.energy_last = t[-1], energy[-1]
+
+    def bin_centers(self):
+        return 0.5 * (self.edges[:-1] + self.edges[1:])
+
+    def envelope(self):
+        # Обвідна |x| по бінах (NaN там, куди ще не дійшли)
+        env = np.maximum(np.abs(self.x_min), np.abs(self.x_max))
+        return np.where(np.isfinite(env), env, np.nan)
+
+    def stored_values(self):
+        # Скільки чисел зберігається незалежно від тривалості прогону
+        return self.x_min.size + self.x_max.size + self.energy.size + self.edges.size